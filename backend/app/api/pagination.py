@@ -0,0 +1,95 @@
+"""
+Keyset (cursor) pagination for the listing endpoints.
+
+A page is ordered by (timestamp, id) and the next page starts strictly after
+the last row returned, so each page is one index range scan however deep the
+client pages. The position is handed to the client as an opaque cursor in the
+X-Next-Cursor response header; the header is absent on the last page.
+"""
+import base64
+import binascii
+import json
+from datetime import datetime
+from typing import Optional
+from uuid import UUID
+
+from fastapi import HTTPException, Query, Response
+from pydantic import BaseModel
+from sqlalchemy import Select, tuple_
+
+NEXT_CURSOR_HEADER = "X-Next-Cursor"
+DEFAULT_PAGE_SIZE = 50
+MAX_PAGE_SIZE = 500
+
+
+class PageParams:
+    """Query parameters shared by paginated endpoints (use as a dependency)."""
+
+    def __init__(
+        self,
+        cursor: Optional[str] = Query(None, description=f"Value of the previous page's {NEXT_CURSOR_HEADER} header"),
+        limit: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE)
+    ):
+        self.cursor = cursor
+        self.limit = limit
+
+
+def encode_cursor(timestamp: datetime, row_id: UUID) -> str:
+    raw = json.dumps([timestamp.isoformat(), str(row_id)]).encode("utf-8")
+    return base64.urlsafe_b64encode(raw).decode("ascii").rstrip("=")
+
+
+def decode_cursor(cursor: str) -> tuple[datetime, UUID]:
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4))
+        timestamp, row_id = json.loads(raw)
+        return datetime.fromisoformat(timestamp), UUID(row_id)
+    except (binascii.Error, ValueError, TypeError):
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+
+
+def columns_for(model, schema: type[BaseModel], *extra) -> list:
+    """The model's columns a response schema needs, so listings skip everything else."""
+    return [getattr(model, field) for field in schema.model_fields] + list(extra)
+
+
+async def fetch_page(
+    db,
+    query: Select,
+    timestamp_column,
+    id_column,
+    page: PageParams,
+    response: Response,
+    descending: bool = True
+) -> list:
+    """
+    Run one page of a query ordered by (timestamp, id).
+
+    Args:
+        db: Async database session
+        query: Filtered select; it must return both key columns
+        timestamp_column: Column the listing is ordered by
+        id_column: Primary key column breaking timestamp ties
+        page: Cursor and page size from the request
+        response: Response to set the next-page header on
+        descending: Newest first (default) or oldest first
+
+    Returns:
+        Rows of the page
+    """
+    key = tuple_(timestamp_column, id_column)
+    if page.cursor:
+        position = tuple_(*decode_cursor(page.cursor))
+        query = query.where(key < position if descending else key > position)
+    if descending:
+        query = query.order_by(timestamp_column.desc(), id_column.desc())
+    else:
+        query = query.order_by(timestamp_column.asc(), id_column.asc())
+
+    # One extra row tells whether another page exists
+    rows = (await db.execute(query.limit(page.limit + 1))).all()
+    if len(rows) > page.limit:
+        rows = rows[:page.limit]
+        last = rows[-1]._mapping
+        response.headers[NEXT_CURSOR_HEADER] = encode_cursor(last[timestamp_column], last[id_column])
+    return rows
@@ -5,9 +5,10 @@ from sqlalchemy import select, or_
 from uuid import UUID
 
 from app.core.database import get_db
-from app.core.security import verify_password, get_password_hash, create_access_token
+from app.core.security import aget_password_hash, averify_and_update_password, create_access_token
 from app.models.database import User
 from app.models.schemas import UserCreate, UserLogin, UserResponse, Token
+from app.services.user_cache import user_cache
 
 router = APIRouter(prefix="/auth", tags=["Authentication"])
 
@@ -33,7 +34,7 @@ async def register(user_data: UserCreate, db: AsyncSession = Depends(get_db)):
                 detail="Username already taken"
             )
     
-    hashed_password = get_password_hash(user_data.password)
+    hashed_password = await aget_password_hash(user_data.password)
     new_user = User(
         email=user_data.email,
         username=user_data.username,
@@ -67,12 +68,18 @@ async def login(user_credentials: UserLogin, db: AsyncSession = Depends(get_db))
             detail="Invalid credentials"
         )
     
-    if not verify_password(user_credentials.password, user.hashed_password):
+    valid, new_hash = await averify_and_update_password(user_credentials.password, user.hashed_password)
+    if not valid:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Invalid credentials"
         )
     
+    if new_hash:
+        # BCRYPT_ROUNDS changed since this hash was made
+        user.hashed_password = new_hash
+        await db.commit()
+    
     if not user.is_active:
         raise HTTPException(
             status_code=status.HTTP_403_FORBIDDEN,
@@ -97,7 +104,13 @@ async def get_current_user(
     credentials: HTTPAuthorizationCredentials = Depends(security),
     db: AsyncSession = Depends(get_db)
 ) -> User:
-    """Get current authenticated user from JWT token."""
+    """
+    Get current authenticated user from JWT token.
+    
+    The user is served from user_cache when possible. It is then a transient
+    User carrying the row's columns; load it in the request session before
+    changing it.
+    """
     token = credentials.credentials
     
     payload = verify_token(token)
@@ -115,16 +128,23 @@ async def get_current_user(
         )
     
     try:
-        result = await db.execute(
-            select(User).where(User.id == UUID(user_id))
-        )
-        user = result.scalar_one_or_none()
+        user_uuid = UUID(user_id)
     except ValueError:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Invalid user ID"
         )
     
+    user = user_cache.get(user_uuid)
+    if user is None:
+        generation = user_cache.generation(user_uuid)
+        result = await db.execute(
+            select(User).where(User.id == user_uuid)
+        )
+        user = result.scalar_one_or_none()
+        if user is not None:
+            user_cache.set(user, generation)
+    
     if user is None:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
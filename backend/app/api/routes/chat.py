@@ -1,11 +1,17 @@
+import asyncio
+import json
+from datetime import datetime
 from uuid import UUID, uuid4
 from typing import Optional
 
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, HTTPException, Response
+from fastapi.responses import StreamingResponse
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy import select
+from sqlalchemy.orm import selectinload
 
-from app.core.database import get_db
+from app.api.pagination import PageParams, columns_for, fetch_page
+from app.core.database import get_db, async_session
 from app.models.database import Workflow, ChatSession, ChatMessage, Document
 from app.models.schemas import (
     ChatExecuteRequest,
@@ -13,25 +19,39 @@ from app.models.schemas import (
     ChatMessageResponse
 )
 from app.workflow import WorkflowGraphBuilder
-from app.services import VectorStore
+from app.ingestion import SEARCHABLE_STATUSES
 
 router = APIRouter()
 
 
-@router.post("/execute", response_model=ChatExecuteResponse)
-async def execute_chat(
-    request: ChatExecuteRequest,
-    db: AsyncSession = Depends(get_db)
-):
-    """Execute a query through the workflow."""
+async def _load_workflow(request: ChatExecuteRequest, db: AsyncSession):
+    """
+    Resolve the nodes/edges to run from the live config or the saved workflow.
+    
+    The workflow's ready documents are fetched along with it (one SELECT ... IN
+    query) so knowledge base nodes can be resolved without further round trips.
     
+    Returns:
+        Tuple of (nodes, edges, workflow_id, ready documents)
+    """
     if request.workflow_config:
         nodes = request.workflow_config.get("nodes", [])
         edges = request.workflow_config.get("edges", [])
         workflow_id = request.workflow_id
+        documents = []
+        if workflow_id and any(node.get("type") == "knowledgeBase" for node in nodes):
+            doc_result = await db.execute(
+                select(Document).where(
+                    Document.workflow_id == workflow_id,
+                    Document.status.in_(SEARCHABLE_STATUSES)
+                )
+            )
+            documents = doc_result.scalars().all()
     elif request.workflow_id:
         result = await db.execute(
-            select(Workflow).where(Workflow.id == request.workflow_id)
+            select(Workflow)
+            .where(Workflow.id == request.workflow_id)
+            .options(selectinload(Workflow.documents.and_(Document.status.in_(SEARCHABLE_STATUSES))))
         )
         workflow = result.scalar_one_or_none()
         
@@ -41,31 +61,75 @@ async def execute_chat(
         nodes = workflow.nodes
         edges = workflow.edges
         workflow_id = workflow.id
+        documents = workflow.documents
     else:
         raise HTTPException(status_code=400, detail="Either workflow_id or workflow_config is required")
     
-    session = None
+    return nodes, edges, workflow_id, documents
+
+
+async def _resolve_session(
+    request: ChatExecuteRequest,
+    workflow_id,
+    db: AsyncSession
+) -> tuple[Optional[UUID], bool]:
+    """
+    Find the chat session to append to, or pick the id of a new one.
+    
+    Nothing is written here; the session and both messages are stored by
+    _record_exchange in one transaction once the reply is known.
+    
+    Returns:
+        Tuple of (session id or None when nothing can be stored, whether the
+        session still has to be created)
+    """
     if request.session_id:
         session_result = await db.execute(
-            select(ChatSession).where(ChatSession.id == request.session_id)
+            select(ChatSession.id).where(ChatSession.id == request.session_id)
         )
-        session = session_result.scalar_one_or_none()
-    
-    if not session and workflow_id:
-        session = ChatSession(workflow_id=workflow_id)
-        db.add(session)
-        await db.commit()
-        await db.refresh(session)
-    
-    if session:
-        user_message = ChatMessage(
-            session_id=session.id,
-            role="user",
-            content=request.query
-        )
-        db.add(user_message)
-        await db.commit()
+        session_id = session_result.scalar_one_or_none()
+        if session_id:
+            return session_id, False
+    
+    if workflow_id:
+        return uuid4(), True
+    
+    return None, False
+
+
+async def _record_exchange(
+    db: AsyncSession,
+    session_id: Optional[UUID],
+    new_session: bool,
+    workflow_id,
+    query: str,
+    asked_at: datetime,
+    response: Optional[str]
+):
+    """Store the session (if new), the user's message and the reply with a single commit."""
+    if not session_id:
+        return
     
+    if new_session:
+        db.add(ChatSession(id=session_id, workflow_id=workflow_id, created_at=asked_at))
+    db.add(ChatMessage(
+        session_id=session_id,
+        role="user",
+        content=query,
+        created_at=asked_at
+    ))
+    if response:
+        db.add(ChatMessage(
+            session_id=session_id,
+            role="assistant",
+            content=response,
+            created_at=datetime.utcnow()
+        ))
+    await db.commit()
+
+
+def _build_node_configs(nodes: list[dict], workflow_id, documents: list[Document]) -> dict:
+    """Collect per-node configs, resolving knowledge base documents to collections."""
     node_configs = {}
     print(f"\n=== DEBUG: Building node configs ===")
     print(f"Received {len(nodes)} nodes")
@@ -88,10 +152,6 @@ async def execute_chat(
             print(f"Target file path from config: {target_path}")
 
             if workflow_id:
-                doc_result = await db.execute(
-                    select(Document).where(Document.workflow_id == workflow_id)
-                )
-                documents = doc_result.scalars().all()
                 print(f"Found {len(documents)} total documents for workflow")
                 
                 selected_doc = None
@@ -120,46 +180,64 @@ async def execute_chat(
                                 print(f"Fallback success: Found matching DB record by filename: {doc.filename}")
                                 break
                 
-                # Strategy 3: (NEW) Fallback to any document linked to this workflow
-                # The user explicitly requested this to handle cases where config might be incomplete but the workflow context implies the doc.
-                if not selected_doc and documents:
-                    # Default to the most recent one (documents are typically fetched in order, or we can sort)
-                    # The previous query: select(Document).where(Document.workflow_id == workflow_id)
-                    # We should probably sort by created_at desc to get the latest, but for now taking the last one uploaded (or first in list depending on DB return order)
-                    # Let's assume the user wants *a* document.
-                    selected_doc = documents[0] # Just pick one if we have any
-                    print(f"Implicitly selecting document based on workflow_id: {selected_doc.filename}")
-
                 if selected_doc:
-                    try:
-                        vector_store = VectorStore()
-                        if vector_store.collection_exists(selected_doc.collection_name):
-                            print(f"Valid collection confirmed: {selected_doc.collection_name}")
-                            config["collection_name"] = selected_doc.collection_name
-                            config["file_path"] = selected_doc.file_path
-                        else:
-                            print(f"CRITICAL: Collection '{selected_doc.collection_name}' for file '{selected_doc.filename}' IS MISSING in Pinecone.")
-                    except Exception as e:
-                        print(f"Error checking vector store: {str(e)}")
-                else:
-                    print("WARNING: No database record found matching the configured file path or filename, and no documents found for this workflow.")
+                    config["collection_name"] = selected_doc.collection_name
+                    config["file_path"] = selected_doc.file_path
+                
+                # Retrieval searches every ready document of the workflow that was
+                # embedded with this node's model, the configured one first.
+                # Documents sharing content share a collection, so names are deduplicated.
+                provider = config.get("embedding_provider", "openai")
+                model = config.get("embedding_model", "text-embedding-3-small")
+                ordered = ([selected_doc] if selected_doc else []) + [doc for doc in documents if doc is not selected_doc]
+                config["collection_names"] = list(dict.fromkeys(
+                    doc.collection_name
+                    for doc in ordered
+                    if (doc.embedding_provider or "openai") == provider
+                    and (doc.embedding_model or "text-embedding-3-small") == model
+                ))
+                print(f"Knowledge Base collections: {len(config['collection_names'])} of {len(documents)} documents")
+                if not config["collection_names"]:
+                    print("WARNING: No ready documents with this embedding model found for this workflow.")
             
             node_configs["knowledgeBase"] = config
+            node_configs[node["id"]] = config
         
         elif node_type == "llmEngine":
             node_configs["llmEngine"] = config
+            node_configs[node["id"]] = config
             print(f"LLM Engine config: api_key present = {'api_key' in config and bool(config.get('api_key'))}")
+        
+        elif node_type == "output":
+            node_configs["output"] = config
+            node_configs[node["id"]] = config
     
     print(f"Final node_configs: {list(node_configs.keys())}")
     print(f"=== END DEBUG ===\n")
     
+    return node_configs
+
+
+@router.post("/execute", response_model=ChatExecuteResponse)
+async def execute_chat(
+    request: ChatExecuteRequest,
+    db: AsyncSession = Depends(get_db)
+):
+    """Execute a query through the workflow."""
+    asked_at = datetime.utcnow()
+    nodes, edges, workflow_id, documents = await _load_workflow(request, db)
+    session_id, new_session = await _resolve_session(request, workflow_id, db)
+    node_configs = _build_node_configs(nodes, workflow_id, documents)
+    
     graph_builder = WorkflowGraphBuilder()
+    metadata = {}
     try:
-        response = await graph_builder.execute(
+        response, metadata = await graph_builder.execute(
             nodes=nodes,
             edges=edges,
             query=request.query,
-            node_configs=node_configs
+            node_configs=node_configs,
+            workflow_id=workflow_id
         )
     except Exception as e:
         print(f"Workflow execution error: {str(e)}")
@@ -170,33 +248,95 @@ async def execute_chat(
     if response is None:
         response = "Sorry, there was an error processing your request."
     
-    if session:
-        assistant_message = ChatMessage(
-            session_id=session.id,
-            role="assistant",
-            content=response
-        )
-        db.add(assistant_message)
-        await db.commit()
+    await _record_exchange(db, session_id, new_session, workflow_id, request.query, asked_at, response)
     
     return ChatExecuteResponse(
         response=response,
-        session_id=session.id if session else uuid4()
+        session_id=session_id or uuid4(),
+        metadata=metadata
+    )
+
+
+def _sse(event: dict) -> str:
+    """Encode an event as a Server-Sent Events frame."""
+    return f"event: {event['event']}\ndata: {json.dumps(event, default=str)}\n\n"
+
+
+async def _save_exchange(session_id, new_session, workflow_id, query, asked_at, content):
+    """Persist the exchange with a fresh DB session (the request session is closed by now)."""
+    async with async_session() as db:
+        await _record_exchange(db, session_id, new_session, workflow_id, query, asked_at, content)
+
+
+@router.post("/execute/stream")
+async def execute_chat_stream(
+    request: ChatExecuteRequest,
+    db: AsyncSession = Depends(get_db)
+):
+    """
+    Execute a query through the workflow, streaming progress as Server-Sent Events.
+    
+    Emits a "session" event first, then node_start/node_end/token events as the
+    graph runs, and finally a "done" event carrying the full response. The
+    session and both messages are persisted once the stream closes.
+    """
+    asked_at = datetime.utcnow()
+    nodes, edges, workflow_id, documents = await _load_workflow(request, db)
+    stored_session_id, new_session = await _resolve_session(request, workflow_id, db)
+    node_configs = _build_node_configs(nodes, workflow_id, documents)
+    session_id = stored_session_id or uuid4()
+    
+    async def event_stream():
+        response = None
+        # Tokens of the LLM Engine node that streamed last
+        tokens = []
+        token_node = None
+        try:
+            yield _sse({"event": "session", "session_id": session_id})
+            async for event in WorkflowGraphBuilder().stream(
+                nodes=nodes,
+                edges=edges,
+                query=request.query,
+                node_configs=node_configs,
+                workflow_id=workflow_id
+            ):
+                if event["event"] == "token":
+                    if event["node"] != token_node:
+                        token_node, tokens = event["node"], []
+                    tokens.append(event["content"])
+                elif event["event"] == "done":
+                    response = event["response"]
+                yield _sse(event)
+        finally:
+            # Client disconnects cancel the generator; keep the last LLM's partial answer.
+            content = response or "".join(tokens)
+            await asyncio.shield(_save_exchange(
+                stored_session_id, new_session, workflow_id, request.query, asked_at, content
+            ))
+    
+    return StreamingResponse(
+        event_stream(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
     )
 
 
 @router.get("/sessions/{workflow_id}", response_model=list[dict])
 async def get_chat_sessions(
     workflow_id: UUID,
+    response: Response,
+    page: PageParams = Depends(),
     db: AsyncSession = Depends(get_db)
 ):
-    """Get all chat sessions for a workflow."""
-    result = await db.execute(
-        select(ChatSession)
-        .where(ChatSession.workflow_id == workflow_id)
-        .order_by(ChatSession.created_at.desc())
+    """Get a workflow's chat sessions, newest first, one page at a time."""
+    sessions = await fetch_page(
+        db,
+        select(ChatSession.id, ChatSession.created_at).where(ChatSession.workflow_id == workflow_id),
+        ChatSession.created_at,
+        ChatSession.id,
+        page,
+        response
     )
-    sessions = result.scalars().all()
     
     return [
         {
@@ -210,13 +350,17 @@ async def get_chat_sessions(
 @router.get("/messages/{session_id}", response_model=list[ChatMessageResponse])
 async def get_chat_messages(
     session_id: UUID,
+    response: Response,
+    page: PageParams = Depends(),
     db: AsyncSession = Depends(get_db)
 ):
-    """Get all messages in a chat session."""
-    result = await db.execute(
-        select(ChatMessage)
-        .where(ChatMessage.session_id == session_id)
-        .order_by(ChatMessage.created_at.asc())
+    """Get a chat session's messages, oldest first, one page at a time."""
+    return await fetch_page(
+        db,
+        select(*columns_for(ChatMessage, ChatMessageResponse)).where(ChatMessage.session_id == session_id),
+        ChatMessage.created_at,
+        ChatMessage.id,
+        page,
+        response,
+        descending=False
     )
-    messages = result.scalars().all()
-    return messages
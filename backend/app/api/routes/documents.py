@@ -3,16 +3,37 @@ import uuid
 from pathlib import Path
 from uuid import UUID
 
-from fastapi import APIRouter, Depends, HTTPException, UploadFile, File, Form
+from fastapi import APIRouter, Depends, HTTPException, Response, UploadFile, File, Form
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy import select
+from sqlalchemy.exc import DBAPIError
 
+from app.api.pagination import PageParams, columns_for, fetch_page
+from app.core.config import get_settings
 from app.core.database import get_db
+from app.core.security import encrypt_secret
+from app.ingestion import (
+    READY,
+    QUEUED,
+    REPLACING,
+    SEARCHABLE_STATUSES,
+    ingestion_pool,
+    remove_artifacts,
+    save_upload,
+    UploadTooLarge,
+    new_collection_name,
+    acquire_content,
+    release_content,
+    file_in_use,
+    remove_replacement_artifacts,
+)
 from app.models.database import Document, Workflow
-from app.models.schemas import DocumentResponse
-from app.services import DocumentProcessor, EmbeddingService, VectorStore
+from app.models.schemas import DocumentResponse, DocumentReplaceResponse, DocumentStatusResponse
+from app.services import EmbeddingService, get_vector_store
+from app.services.lexical_index import lexical_indexes
 
 router = APIRouter()
+settings = get_settings()
 
 UPLOAD_DIR = Path("./uploads")
 UPLOAD_DIR.mkdir(exist_ok=True)
@@ -27,10 +48,14 @@ async def upload_document(
     api_key: str = Form(default=""),
     db: AsyncSession = Depends(get_db)
 ):
-    """Upload a document for the knowledge base (embeddings will be created on first use)."""
+    """
+    Upload a document for the knowledge base.
+    
+    The file is saved and queued for background ingestion; poll
+    /documents/{id}/status until it is "ready".
+    """
     print(f"Received upload request for workflow: {workflow_id}")
     print(f"API Key received (length): {len(api_key) if api_key else 0}")
-    print(f"API Key value (first 5 chars): {api_key[:5] if api_key else 'None'}")
     result = await db.execute(
         select(Workflow).where(Workflow.id == workflow_id)
     )
@@ -38,72 +63,185 @@ async def upload_document(
     if not workflow:
         raise HTTPException(status_code=404, detail="Workflow not found")
     
+    # Fail fast on an unsupported provider instead of in the worker.
+    try:
+        EmbeddingService(provider=embedding_provider, api_key=api_key, model=embedding_model)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    
     file_id = str(uuid.uuid4())
     file_extension = Path(file.filename).suffix
-    file_path = UPLOAD_DIR / f"{file_id}{file_extension}"
-    
-    content = await file.read()
-    with open(file_path, "wb") as f:
-        f.write(content)
+    upload_path = UPLOAD_DIR / f"{file_id}{file_extension}"
     
     try:
-        collection_name = f"workflow_{workflow_id}_{file_id}"
-        
-        embedding_service = EmbeddingService(
-            provider=embedding_provider, 
-            api_key=api_key,
-            model=embedding_model
+        size_bytes, content_hash = await save_upload(
+            file,
+            upload_path,
+            max_bytes=settings.max_upload_bytes,
+            chunk_size=settings.upload_chunk_size
         )
-        processor = DocumentProcessor()
-        
-        docs = processor.process_file(str(file_path))
-        chunk_count = len(docs)
-        
-        if chunk_count > 0:
-            dimension = embedding_service.get_dimension()
-            
-            vector_store = VectorStore(
-                embeddings=embedding_service.get_embeddings_model(),
-                dimension=dimension
-            )
-            vector_store.add_documents(
-                collection_name=collection_name,
-                documents=docs,
-                embeddings=embedding_service.get_embeddings_model()
-            )
+    except UploadTooLarge as e:
+        raise HTTPException(status_code=413, detail=str(e))
+    
+    try:
+        # Identical content embedded with the same model is stored and ingested once.
+        shared = await acquire_content(db, content_hash, embedding_provider, embedding_model)
+        if shared is not None:
+            print(f"Upload matches existing content of document {shared.id}")
+            upload_path.unlink()
+            file_path = shared.file_path
+            collection_name = shared.collection_name
+            ref_count = shared.ref_count
+        else:
+            collection_name = new_collection_name(content_hash)
+            # Named after the namespace, not just the hash: the same file
+            # embedded with another model is ingested (and deleted) separately.
+            file_path = str(UPLOAD_DIR / f"{collection_name}{file_extension}")
+            os.replace(upload_path, file_path)
+            ref_count = 1
+        ready = shared is not None and shared.status in SEARCHABLE_STATUSES
         
         db_document = Document(
             workflow_id=workflow_id,
             filename=file.filename,
-            file_path=str(file_path),
+            file_path=file_path,
             collection_name=collection_name,
-            chunk_count=str(chunk_count)
+            chunk_count=shared.chunk_count if ready else "0",
+            size_bytes=size_bytes,
+            content_hash=content_hash,
+            ref_count=ref_count,
+            status=READY if ready else QUEUED,
+            progress=100 if ready else 0,
+            embedding_provider=embedding_provider,
+            embedding_model=embedding_model,
+            embedding_api_key=encrypt_secret(api_key) if api_key and not ready else None
         )
         db.add(db_document)
         await db.commit()
         await db.refresh(db_document)
-        
-        return db_document
-    
     except Exception as e:
-        if file_path.exists():
-            file_path.unlink()
+        await db.rollback()
+        if upload_path.exists():
+            upload_path.unlink()
         raise HTTPException(status_code=500, detail=str(e))
+    
+    if not ready:
+        ingestion_pool.wake()
+    return db_document
 
 
 @router.get("/", response_model=list[DocumentResponse])
 async def list_documents(
+    response: Response,
     workflow_id: UUID = None,
+    page: PageParams = Depends(),
     db: AsyncSession = Depends(get_db)
 ):
-    """List all documents, optionally filtered by workflow."""
-    query = select(Document)
+    """List documents newest first, optionally filtered by workflow, one page at a time."""
+    query = select(*columns_for(Document, DocumentResponse))
     if workflow_id:
         query = query.where(Document.workflow_id == workflow_id)
     
-    result = await db.execute(query.order_by(Document.created_at.desc()))
-    documents = result.scalars().all()
-    return documents
+    return await fetch_page(db, query, Document.created_at, Document.id, page, response)
+
+
+@router.get("/{document_id}/status", response_model=DocumentStatusResponse)
+async def get_document_status(
+    document_id: UUID,
+    db: AsyncSession = Depends(get_db)
+):
+    """Get ingestion progress for a document."""
+    result = await db.execute(
+        select(Document).where(Document.id == document_id)
+    )
+    document = result.scalar_one_or_none()
+    
+    if not document:
+        raise HTTPException(status_code=404, detail="Document not found")
+    
+    return document
+
+
+@router.post("/{document_id}/replace", response_model=DocumentReplaceResponse, status_code=202)
+async def replace_document(
+    document_id: UUID,
+    response: Response,
+    file: UploadFile = File(...),
+    api_key: str = Form(default=""),
+    db: AsyncSession = Depends(get_db)
+):
+    """
+    Replace a document with a new version of the file.
+    
+    The upload is queued for the ingestion workers (202); the document keeps
+    serving its current version with status "replacing" until the new one is
+    built, then switches over. Only chunks that changed are embedded. Poll
+    /documents/{id}/status until it is "ready" again.
+    """
+    try:
+        result = await db.execute(
+            select(Document).where(Document.id == document_id).with_for_update(nowait=True)
+        )
+    except DBAPIError:
+        raise HTTPException(status_code=409, detail="Document is being modified, try again later")
+    document = result.scalar_one_or_none()
+    
+    if not document:
+        raise HTTPException(status_code=404, detail="Document not found")
+    if document.status != READY:
+        raise HTTPException(status_code=409, detail=f"Document is not ready (status: {document.status})")
+    
+    try:
+        EmbeddingService(
+            provider=document.embedding_provider or "openai",
+            api_key=api_key,
+            model=document.embedding_model
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    
+    file_extension = Path(file.filename).suffix
+    upload_path = UPLOAD_DIR / f"{uuid.uuid4()}{file_extension}"
+    try:
+        size_bytes, content_hash = await save_upload(
+            file,
+            upload_path,
+            max_bytes=settings.max_upload_bytes,
+            chunk_size=settings.upload_chunk_size
+        )
+    except UploadTooLarge as e:
+        raise HTTPException(status_code=413, detail=str(e))
+    
+    if content_hash == document.content_hash:
+        upload_path.unlink()
+        document.filename = file.filename
+        await db.commit()
+        await db.refresh(document)
+        response.status_code = 200
+        return DocumentReplaceResponse(document=DocumentResponse.model_validate(document), mode="unchanged")
+    
+    document.status = REPLACING
+    document.error = None
+    document.attempts = 0
+    document.locked_at = None
+    document.embedding_api_key = encrypt_secret(api_key) if api_key else None
+    document.replacement_path = str(upload_path)
+    document.replacement_filename = file.filename
+    document.replacement_hash = content_hash
+    document.replacement_size = size_bytes
+    document.replacement_collection = None
+    try:
+        await db.commit()
+        await db.refresh(document)
+    except Exception as e:
+        await db.rollback()
+        if upload_path.exists():
+            upload_path.unlink()
+        raise HTTPException(status_code=500, detail=str(e))
+    
+    print(f"Queued replacement of document {document_id}")
+    ingestion_pool.wake()
+    return DocumentReplaceResponse(document=DocumentResponse.model_validate(document), mode="queued")
 
 
 @router.delete("/{document_id}")
@@ -111,7 +249,7 @@ async def delete_document(
     document_id: UUID,
     db: AsyncSession = Depends(get_db)
 ):
-    """Delete a document and its embeddings."""
+    """Delete a document, and its embeddings once nothing else references them."""
     result = await db.execute(
         select(Document).where(Document.id == document_id)
     )
@@ -120,11 +258,24 @@ async def delete_document(
     if not document:
         raise HTTPException(status_code=404, detail="Document not found")
     
-    vector_store = VectorStore()
-    vector_store.delete_collection(document.collection_name)
+    # Shared content is only purged with its last reference; the reference
+    # rows stay locked until commit so a concurrent upload cannot reuse it.
+    if await release_content(db, document):
+        vector_store = get_vector_store()
+        await vector_store.adelete_collection(document.collection_name)
+        lexical_indexes.delete(document.collection_name)
+        
+        if not await file_in_use(db, document.file_path, excluding=document.id):
+            if os.path.exists(document.file_path):
+                os.remove(document.file_path)
+            remove_artifacts(document.file_path)
     
-    if os.path.exists(document.file_path):
-        os.remove(document.file_path)
+    # A queued replacement's upload; the worker discards what it built when it
+    # finds the row gone.
+    if document.replacement_path:
+        if os.path.exists(document.replacement_path):
+            os.remove(document.replacement_path)
+        remove_replacement_artifacts(document.replacement_path)
     
     await db.delete(document)
     await db.commit()
@@ -1,5 +1,10 @@
 from fastapi import APIRouter
 
+from app.core.database import pool_status
+from app.services.retrieval_cache import retrieval_cache
+from app.services.user_cache import user_cache
+from app.workflow.cache import graph_cache
+
 router = APIRouter()
 
 
@@ -11,3 +16,21 @@ async def health_check():
 @router.get("/ready")
 async def readiness_check():
     return {"status": "ready"}
+
+
+@router.get("/cache")
+async def cache_stats():
+    """Hit/miss counters for the in-process caches."""
+    return {
+        "retrieval": retrieval_cache.stats(),
+        "compiled_graphs": graph_cache.stats(),
+        "users": user_cache.stats()
+    }
+
+
+@router.get("/metrics")
+async def metrics():
+    """Database pool saturation and checkout wait times, for sizing pools per replica."""
+    return {
+        "database_pool": pool_status()
+    }
@@ -1,8 +1,9 @@
 from uuid import UUID
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, HTTPException, Response
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy import select
 
+from app.api.pagination import PageParams, columns_for, fetch_page
 from app.core.database import get_db
 from app.models.database import Workflow, User
 from app.models.schemas import (
@@ -13,23 +14,24 @@ from app.models.schemas import (
     ValidationResult
 )
 from app.api.routes.auth import get_current_user
+from app.workflow.cache import graph_cache
+from app.workflow.topology import WorkflowCycleError, reachable_nodes, topological_sort
 
 router = APIRouter()
 
 
 @router.get("/", response_model=list[WorkflowListResponse])
 async def list_workflows(
+    response: Response,
+    page: PageParams = Depends(),
     db: AsyncSession = Depends(get_db),
     current_user: User = Depends(get_current_user)
 ):
-    """List all workflows for the current user."""
-    result = await db.execute(
-        select(Workflow)
-        .where(Workflow.user_id == current_user.id)
-        .order_by(Workflow.updated_at.desc())
+    """List the current user's workflows, most recently updated first, one page at a time."""
+    query = select(*columns_for(Workflow, WorkflowListResponse, Workflow.updated_at)).where(
+        Workflow.user_id == current_user.id
     )
-    workflows = result.scalars().all()
-    return workflows
+    return await fetch_page(db, query, Workflow.updated_at, Workflow.id, page, response)
 
 
 @router.post("/", response_model=WorkflowResponse)
@@ -103,6 +105,7 @@ async def update_workflow(
     
     await db.commit()
     await db.refresh(workflow)
+    graph_cache.invalidate(workflow_id)
     return workflow
 
 
@@ -126,6 +129,7 @@ async def delete_workflow(
     
     await db.delete(workflow)
     await db.commit()
+    graph_cache.invalidate(workflow_id)
     return {"message": "Workflow deleted successfully"}
 
 
@@ -153,6 +157,14 @@ async def validate_workflow(workflow: WorkflowCreate):
         errors.append("Components must be connected to form a workflow")
     
     node_ids = {node.id for node in nodes}
+    adjacency = {}
+    for edge in edges:
+        adjacency.setdefault(edge.source, []).append(edge.target)
+    try:
+        topological_sort(adjacency)
+    except WorkflowCycleError as e:
+        errors.append(f"Components must not form a loop ({' -> '.join(e.cycle)})")
+    
     connected_targets = {edge.target for edge in edges}
     connected_sources = {edge.source for edge in edges}
     
@@ -161,6 +173,17 @@ async def validate_workflow(workflow: WorkflowCreate):
             if len(nodes) > 1:
                 warnings.append(f"Component '{node.data.label}' is not connected to the workflow")
     
+    # Only nodes reachable from the entry (the first node nothing points to) run.
+    entry = next((node for node in nodes if node.id not in connected_targets), nodes[0] if nodes else None)
+    if entry is not None:
+        reached = reachable_nodes(adjacency, entry.id)
+        for node in nodes:
+            connected = node.id in connected_targets or node.id in connected_sources
+            if connected and node.id not in reached:
+                warnings.append(
+                    f"Component '{node.data.label}' is not reachable from '{entry.data.label}' and will not run"
+                )
+    
     return ValidationResult(
         is_valid=len(errors) == 0,
         errors=errors,
@@ -1,6 +1,12 @@
+from pathlib import Path
+
+from alembic import command
+from alembic.config import Config
+from sqlalchemy import inspect
 from sqlalchemy.ext.asyncio import create_async_engine, AsyncSession, async_sessionmaker
 from sqlalchemy.orm import DeclarativeBase
 from app.core.config import get_settings
+from app.core.pool_metrics import MonitoredQueuePool, pool_metrics
 from urllib.parse import urlparse, quote_plus, urlunparse
 
 settings = get_settings()
@@ -57,11 +63,21 @@ if database_url:
             connect_args["ssl"] = ssl_context
         else:
             connect_args["ssl"] = False
+        
+        # SQLAlchemy's prepared statement LRU and asyncpg's own statement cache.
+        connect_args["prepared_statement_cache_size"] = settings.db_statement_cache_size
+        connect_args["statement_cache_size"] = settings.db_statement_cache_size
             
         engine = create_async_engine(
             database_url,
             echo=False,
-            connect_args=connect_args
+            connect_args=connect_args,
+            poolclass=MonitoredQueuePool,
+            pool_size=settings.db_pool_size,
+            max_overflow=settings.db_max_overflow,
+            pool_timeout=settings.db_pool_timeout,
+            pool_recycle=settings.db_pool_recycle,
+            pool_pre_ping=settings.db_pool_pre_ping
         )
     
     async_session = async_sessionmaker(engine, class_=AsyncSession, expire_on_commit=False)
@@ -74,6 +90,13 @@ class Base(DeclarativeBase):
     pass
 
 
+def pool_status() -> dict:
+    """Connection pool usage and checkout wait times, or None without a pooled engine."""
+    if engine is None or not isinstance(engine.pool, MonitoredQueuePool):
+        return None
+    return pool_metrics.snapshot(engine.pool, settings.db_max_overflow)
+
+
 async def get_db():
     if async_session is None:
         raise Exception("Database not configured")
@@ -85,14 +108,50 @@ async def get_db():
             await session.close()
 
 
+MIGRATIONS_DIR = Path(__file__).resolve().parents[2] / "migrations"
+# Schema that create_all produced before migrations were added
+BASELINE_REVISION = "0001"
+
+
+def alembic_config(connection) -> Config:
+    """Alembic configuration that runs the migrations on an open (sync) connection."""
+    config = Config()
+    config.set_main_option("script_location", str(MIGRATIONS_DIR))
+    config.attributes["connection"] = connection
+    return config
+
+
+def migrate(connection):
+    """
+    Bring the schema up to the latest migration.
+
+    A database created by create_all before migrations existed has tables
+    but no alembic_version; it is stamped with the baseline first so the
+    later migrations add what it is missing.
+    """
+    config = alembic_config(connection)
+    tables = inspect(connection).get_table_names()
+    if "users" in tables and "alembic_version" not in tables:
+        command.stamp(config, BASELINE_REVISION)
+    command.upgrade(config, "head")
+
+
 async def init_db():
     if engine is None:
         print("Warning: Database not configured, skipping initialization")
         return
     
+    # Not swallowed: serving with a half-migrated schema fails on every query.
     try:
         async with engine.begin() as conn:
-            await conn.run_sync(Base.metadata.create_all)
-        print("✅ Database tables created successfully")
+            await conn.run_sync(migrate)
     except Exception as e:
-        print(f"❌ Database initialization error: {e}")
+        print(f"❌ Database migration error: {e}")
+        raise
+    print("✅ Database schema up to date")
+
+
+async def close_db():
+    """Close pooled connections on shutdown."""
+    if engine is not None:
+        await engine.dispose()
@@ -0,0 +1,95 @@
+"""
+Bounded thread pool for blocking SDK calls (Pinecone, SerpAPI, file IO).
+
+Keeping these off asyncio's default executor caps how many threads slow
+network calls can occupy, and keeps the event loop free for other requests.
+CPU-bound work (PDF parsing) gets a separate process pool, and password
+hashing its own small thread pool so login bursts queue among themselves
+instead of occupying the IO threads.
+"""
+import asyncio
+import multiprocessing
+import os
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from functools import partial
+from typing import Callable, Optional, TypeVar
+
+from app.core.config import get_settings
+
+T = TypeVar("T")
+
+_executor: Optional[ThreadPoolExecutor] = None
+_process_pool: Optional[ProcessPoolExecutor] = None
+_password_pool: Optional[ThreadPoolExecutor] = None
+
+
+def get_executor() -> ThreadPoolExecutor:
+    global _executor
+    if _executor is None:
+        _executor = ThreadPoolExecutor(
+            max_workers=get_settings().blocking_pool_size,
+            thread_name_prefix="blocking-io"
+        )
+    return _executor
+
+
+async def run_blocking(fn: Callable[..., T], *args, **kwargs) -> T:
+    """Run a blocking callable in the bounded pool and await its result."""
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(get_executor(), partial(fn, *args, **kwargs))
+
+
+def process_pool_size() -> int:
+    return get_settings().parse_workers or os.cpu_count() or 1
+
+
+def get_process_pool() -> ProcessPoolExecutor:
+    """
+    Process pool for CPU-bound work, created on first use.
+
+    Uses the spawn start method: forking a process that runs an event loop
+    and SDK threads can deadlock the child.
+    """
+    global _process_pool
+    if _process_pool is None:
+        _process_pool = ProcessPoolExecutor(
+            max_workers=process_pool_size(),
+            mp_context=multiprocessing.get_context("spawn")
+        )
+    return _process_pool
+
+
+def get_password_pool() -> ThreadPoolExecutor:
+    """
+    Thread pool for bcrypt, created on first use.
+
+    bcrypt releases the GIL while hashing, so threads run in parallel; the
+    pool size bounds how many cores concurrent logins can take.
+    """
+    global _password_pool
+    if _password_pool is None:
+        _password_pool = ThreadPoolExecutor(
+            max_workers=get_settings().password_hash_workers or os.cpu_count() or 1,
+            thread_name_prefix="password-hash"
+        )
+    return _password_pool
+
+
+async def run_password_hash(fn: Callable[..., T], *args, **kwargs) -> T:
+    """Run a password hashing callable in the password pool and await its result."""
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(get_password_pool(), partial(fn, *args, **kwargs))
+
+
+def shutdown_executor():
+    """Stop the pools; called from the application lifespan."""
+    global _executor, _process_pool, _password_pool
+    if _executor is not None:
+        _executor.shutdown(wait=False, cancel_futures=True)
+        _executor = None
+    if _process_pool is not None:
+        _process_pool.shutdown(wait=False, cancel_futures=True)
+        _process_pool = None
+    if _password_pool is not None:
+        _password_pool.shutdown(wait=False, cancel_futures=True)
+        _password_pool = None
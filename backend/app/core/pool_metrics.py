@@ -0,0 +1,86 @@
+"""
+Connection pool instrumentation for the async SQLAlchemy engine.
+
+MonitoredQueuePool times every checkout (queue wait, plus connecting or
+pre-pinging when that happens) and counts pool timeouts. Together with the
+pool's own in-use / idle counts this shows whether requests are queueing for
+connections, which is what the pool size per replica should be tuned on.
+"""
+import time
+from collections import deque
+from threading import Lock
+
+from sqlalchemy import exc
+from sqlalchemy.pool import AsyncAdaptedQueuePool, QueuePool
+
+
+def _percentile(ordered: list[float], fraction: float) -> float:
+    if not ordered:
+        return 0.0
+    return ordered[min(len(ordered) - 1, int(len(ordered) * fraction))]
+
+
+class PoolMetrics:
+    """Checkout counters and a window of recent checkout times."""
+
+    def __init__(self, window: int = 1024):
+        self._lock = Lock()
+        self._recent = deque(maxlen=window)
+        self.checkouts = 0
+        self.timeouts = 0
+        self.total_wait = 0.0
+        self.max_wait = 0.0
+
+    def record(self, seconds: float):
+        with self._lock:
+            self.checkouts += 1
+            self.total_wait += seconds
+            self.max_wait = max(self.max_wait, seconds)
+            self._recent.append(seconds)
+
+    def record_timeout(self):
+        with self._lock:
+            self.timeouts += 1
+
+    def snapshot(self, pool: QueuePool, max_overflow: int) -> dict:
+        """Current pool usage and checkout wait statistics, times in milliseconds."""
+        with self._lock:
+            recent = sorted(self._recent)
+            checkouts, timeouts = self.checkouts, self.timeouts
+            total_wait, max_wait = self.total_wait, self.max_wait
+        in_use = pool.checkedout()
+        return {
+            "pool_size": pool.size(),
+            "max_overflow": max_overflow,
+            "in_use": in_use,
+            "idle": pool.checkedin(),
+            "overflow": max(0, pool.overflow()),
+            "saturated": in_use >= pool.size() + max_overflow,
+            "checkouts": checkouts,
+            "timeouts": timeouts,
+            "wait_ms": {
+                "mean": round(total_wait / checkouts * 1000, 3) if checkouts else 0.0,
+                "p50": round(_percentile(recent, 0.50) * 1000, 3),
+                "p95": round(_percentile(recent, 0.95) * 1000, 3),
+                "p99": round(_percentile(recent, 0.99) * 1000, 3),
+                "max": round(max_wait * 1000, 3),
+                "window": len(recent),
+            },
+        }
+
+
+pool_metrics = PoolMetrics()
+
+
+class MonitoredQueuePool(AsyncAdaptedQueuePool):
+    """AsyncAdaptedQueuePool that records checkout times in pool_metrics."""
+
+    def connect(self):
+        start = time.perf_counter()
+        try:
+            connection = super().connect()
+        except exc.TimeoutError:
+            pool_metrics.record_timeout()
+            raise
+        pool_metrics.record(time.perf_counter() - start)
+        return connection
@@ -1,12 +1,25 @@
+import base64
+import hashlib
 from datetime import datetime, timedelta
-from typing import Optional
+from functools import lru_cache
+from typing import Optional, Tuple
+from cryptography.fernet import Fernet, InvalidToken
 from jose import JWTError, jwt
 from passlib.context import CryptContext
 from app.core.config import get_settings
+from app.core.executor import run_password_hash
 
 settings = get_settings()
 
-pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
+# Pinning min/max to the configured cost makes needs_update() flag hashes
+# made with any other cost, so they are upgraded (or downgraded) at login.
+pwd_context = CryptContext(
+    schemes=["bcrypt"],
+    deprecated="auto",
+    bcrypt__rounds=settings.bcrypt_rounds,
+    bcrypt__min_rounds=settings.bcrypt_rounds,
+    bcrypt__max_rounds=settings.bcrypt_rounds
+)
 
 SECRET_KEY = settings.SECRET_KEY
 ALGORITHM = "HS256"
@@ -23,6 +36,44 @@ def get_password_hash(password: str) -> str:
     return pwd_context.hash(password)
 
 
+async def aget_password_hash(password: str) -> str:
+    """Hash a password in the password pool, off the event loop."""
+    return await run_password_hash(pwd_context.hash, password)
+
+
+async def averify_and_update_password(plain_password: str, hashed_password: str) -> Tuple[bool, Optional[str]]:
+    """
+    Verify a password in the password pool, off the event loop.
+    
+    Returns:
+        Tuple of (whether the password matches, new hash to store when the
+        stored one was made with a different cost factor, else None)
+    """
+    return await run_password_hash(pwd_context.verify_and_update, plain_password, hashed_password)
+
+
+@lru_cache
+def _fernet() -> Fernet:
+    key = settings.secret_encryption_key
+    if not key:
+        # Derived from SECRET_KEY so a default deployment still never stores secrets in clear
+        key = base64.urlsafe_b64encode(hashlib.sha256(SECRET_KEY.encode("utf-8")).digest())
+    return Fernet(key)
+
+
+def encrypt_secret(value: str) -> str:
+    """Encrypt a secret (e.g. a user's API key) for storage in the database."""
+    return _fernet().encrypt(value.encode("utf-8")).decode("ascii")
+
+
+def decrypt_secret(token: str) -> str:
+    """Decrypt a value from encrypt_secret; raises ValueError if it cannot be decrypted."""
+    try:
+        return _fernet().decrypt(token.encode("ascii")).decode("utf-8")
+    except InvalidToken:
+        raise ValueError("Stored secret cannot be decrypted (was SECRET_ENCRYPTION_KEY changed?)")
+
+
 def create_access_token(data: dict, expires_delta: Optional[timedelta] = None) -> str:
     """Create a JWT access token."""
     to_encode = data.copy()
@@ -0,0 +1,33 @@
+# Ingestion package
+from app.ingestion.pipeline import (
+    ACTIVE_STATUSES,
+    SEARCHABLE_STATUSES,
+    QUEUED,
+    READY,
+    REPLACING,
+    FAILED,
+    remove_artifacts,
+)
+from app.ingestion.dedup import new_collection_name, acquire_content, release_content, file_in_use
+from app.ingestion.replace import remove_replacement_artifacts
+from app.ingestion.upload import UploadTooLarge, save_upload
+from app.ingestion.worker import IngestionWorkerPool, ingestion_pool
+
+__all__ = [
+    "ACTIVE_STATUSES",
+    "SEARCHABLE_STATUSES",
+    "QUEUED",
+    "READY",
+    "REPLACING",
+    "FAILED",
+    "remove_artifacts",
+    "new_collection_name",
+    "acquire_content",
+    "release_content",
+    "file_in_use",
+    "remove_replacement_artifacts",
+    "UploadTooLarge",
+    "save_upload",
+    "IngestionWorkerPool",
+    "ingestion_pool"
+]
@@ -0,0 +1,118 @@
+"""
+Content-addressed sharing of uploaded documents.
+
+Documents with the same content hash and embedding model share one vector
+namespace, and one stored file (named after the namespace) with its ingestion
+artifacts. The same file embedded with another model gets its own namespace
+and file, so ingesting or deleting one never touches the other. Every
+Document row sharing a namespace is a reference to it; ref_count on each row
+mirrors the number of references, and the shared content is only purged when
+the last reference is deleted.
+
+Chunks are deduplicated within a file only: identical chunks in different
+files are embedded once per file. Sharing them would need a persistent
+chunk-embedding store keyed by chunk hash and model, which is out of scope.
+
+Shared content is found through the content_hash column rather than the
+namespace name, since a replaced document keeps its namespace while its
+content changes (see app.ingestion.replace).
+"""
+import uuid
+from typing import Optional
+
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.ingestion.pipeline import REPLACING, SEARCHABLE_STATUSES
+from app.models.database import Document
+
+
+def new_collection_name(content_hash: str) -> str:
+    """Unique vector namespace for newly ingested content."""
+    return f"content_{content_hash[:32]}_{uuid.uuid4().hex[:12]}"
+
+
+async def _lock_references(db: AsyncSession, collection_name: str) -> list[Document]:
+    result = await db.execute(
+        select(Document)
+        .where(Document.collection_name == collection_name)
+        .order_by(Document.created_at, Document.id)
+        .with_for_update()
+    )
+    return list(result.scalars().all())
+
+
+async def acquire_content(
+    db: AsyncSession,
+    content_hash: str,
+    provider: str,
+    model: str
+) -> Optional[Document]:
+    """
+    Register one more reference to already uploaded content, if there is any.
+
+    Locks the existing references until the caller commits, so a concurrent
+    delete cannot purge the content in between. Documents being replaced
+    are not shared.
+
+    Returns:
+        The best existing reference to share (a ready one if any), or None
+        if the content has not been uploaded with this embedding model
+    """
+    result = await db.execute(
+        select(Document.collection_name)
+        .where(
+            Document.content_hash == content_hash,
+            Document.embedding_provider == provider,
+            Document.embedding_model == model,
+            Document.status != REPLACING
+        )
+        .order_by(Document.status.in_(SEARCHABLE_STATUSES).desc(), Document.created_at)
+        .limit(1)
+    )
+    collection_name = result.scalar_one_or_none()
+    if collection_name is None:
+        return None
+    references = await _lock_references(db, collection_name)
+    # Re-check under the lock: the content may have been deleted or replaced
+    # since the lookup. A document being replaced may be rewriting its
+    # namespace in place (app.ingestion.replace), so it cannot be joined.
+    if not any(ref.content_hash == content_hash and ref.status != REPLACING for ref in references):
+        return None
+    for reference in references:
+        reference.ref_count = len(references) + 1
+    return next((ref for ref in references if ref.status in SEARCHABLE_STATUSES), references[0])
+
+
+async def release_content(db: AsyncSession, document: Document) -> bool:
+    """
+    Drop a document's reference to its namespace.
+
+    Returns:
+        True if it was the last reference and the shared content can be purged
+    """
+    references = await _lock_references(db, document.collection_name)
+    remaining = [ref for ref in references if ref.id != document.id]
+    for reference in remaining:
+        reference.ref_count = len(remaining)
+    return not remaining
+
+
+async def has_references(db: AsyncSession, collection_name: str) -> bool:
+    result = await db.execute(
+        select(Document.id).where(Document.collection_name == collection_name).limit(1)
+    )
+    return result.first() is not None
+
+
+async def file_in_use(db: AsyncSession, file_path: str, excluding: Optional[uuid.UUID] = None) -> bool:
+    """
+    Whether any document (other than excluding) still uses a stored file.
+
+    Files stored before they were named after their namespace are shared by
+    every model the same content was embedded with.
+    """
+    query = select(Document.id).where(Document.file_path == file_path)
+    if excluding is not None:
+        query = query.where(Document.id != excluding)
+    return (await db.execute(query.limit(1))).first() is not None
@@ -0,0 +1,243 @@
+"""
+Ingestion stages for uploaded documents.
+
+Each stage leaves an artifact next to the uploaded file so a restarted worker
+can resume from the last completed stage instead of starting over:
+
+    parsing   -> <file>.chunks.jsonl   (one chunk per line)
+    embedding -> <file>.vectors.jsonl  (one embedding per line, appended per batch);
+                 each batch is upserted as soon as it is embedded
+    indexing  -> all vectors re-upserted from the artifact (only reached when
+                 resuming a job recorded at this stage)
+
+Upserts use deterministic ids, so re-running any stage is idempotent.
+
+Chunks are identified by the SHA-256 of their text: repeated chunks within a
+file are embedded once, and vector ids are stable across re-ingestion.
+"""
+import hashlib
+import json
+import os
+from collections import deque
+from itertools import islice
+from pathlib import Path
+from typing import AsyncIterator, Awaitable, Callable, Iterable, Iterator
+
+from app.services import DocumentProcessor, VectorBackend
+from app.services.embedding_scheduler import EmbeddingScheduler
+
+QUEUED = "queued"
+PARSING = "parsing"
+EMBEDDING = "embedding"
+INDEXING = "indexing"
+READY = "ready"
+FAILED = "failed"
+# Ready, with a new version being built by a worker (see app.ingestion.replace)
+REPLACING = "replacing"
+
+ACTIVE_STATUSES = (QUEUED, PARSING, EMBEDDING, INDEXING)
+# Statuses whose namespace holds complete, servable content
+SEARCHABLE_STATUSES = (READY, REPLACING)
+
+
+def chunks_path(file_path: str) -> Path:
+    return Path(f"{file_path}.chunks.jsonl")
+
+
+def vectors_path(file_path: str) -> Path:
+    return Path(f"{file_path}.vectors.jsonl")
+
+
+def remove_artifacts(file_path: str):
+    """Delete the intermediate stage files for an upload."""
+    for path in (chunks_path(file_path), vectors_path(file_path)):
+        if path.exists():
+            path.unlink()
+
+
+def chunk_hash(text: str) -> str:
+    return hashlib.sha256(text.encode("utf-8")).hexdigest()
+
+
+def read_jsonl(path: Path) -> Iterator:
+    with open(path, "r", encoding="utf-8") as f:
+        for line in f:
+            if line.strip():
+                yield json.loads(line)
+
+
+def _completed_lines(path: Path, block_size: int = 1024 * 1024) -> int:
+    """Count complete lines, truncating a partial line left by a crash mid-write."""
+    if not path.exists():
+        return 0
+    count, end, position = 0, 0, 0
+    with open(path, "rb+") as f:
+        while block := f.read(block_size):
+            newlines = block.count(b"\n")
+            if newlines:
+                count += newlines
+                end = position + block.rfind(b"\n") + 1
+            position += len(block)
+        if end != position:
+            f.truncate(end)
+    return count
+
+
+def batched(items: Iterable, size: int) -> Iterator[list]:
+    batch = []
+    for item in items:
+        batch.append(item)
+        if len(batch) >= size:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
+
+
+def parse_document(file_path: str) -> int:
+    """
+    Load and chunk a PDF into the chunks artifact, skipping repeated chunks.
+
+    Returns:
+        Number of unique chunks written
+    """
+    docs = DocumentProcessor().iter_chunks(file_path)
+    target = chunks_path(file_path)
+    tmp = target.with_suffix(".tmp")
+    seen = set()
+    with open(tmp, "w", encoding="utf-8") as f:
+        for doc in docs:
+            digest = chunk_hash(doc.page_content)
+            if digest in seen:
+                continue
+            seen.add(digest)
+            f.write(json.dumps({"hash": digest, "page_content": doc.page_content, "metadata": doc.metadata}) + "\n")
+    os.replace(tmp, target)
+    return len(seen)
+
+
+async def embed_chunks(
+    file_path: str,
+    scheduler: EmbeddingScheduler,
+    on_progress: Callable[[int, int], Awaitable[None]],
+    on_vectors: Callable[[list[dict], list[list[float]]], Awaitable[None]]
+) -> int:
+    """
+    Embed every chunk not yet present in the vectors artifact.
+
+    Both artifacts are streamed, so memory is bounded by the scheduler's
+    batch window rather than the number of chunks.
+
+    Batches come back from the scheduler in order; each is appended to the
+    artifact and handed to on_vectors (the upsert) while later batches are
+    still being embedded. Vectors already in the artifact from an earlier
+    attempt are replayed through on_vectors first, since they may not have
+    been upserted before the job stopped.
+
+    Args:
+        file_path: Uploaded file whose chunks artifact is embedded
+        scheduler: Shared embedding scheduler for the document's model
+        on_progress: Awaited with (chunks embedded, total chunks) after each batch
+        on_vectors: Awaited with (chunks, vectors) for each embedded batch
+
+    Returns:
+        Total number of chunks
+    """
+    total = _completed_lines(chunks_path(file_path))
+    done = _completed_lines(vectors_path(file_path))
+    chunks = read_jsonl(chunks_path(file_path))
+
+    if done:
+        replay = zip(islice(chunks, done), read_jsonl(vectors_path(file_path)))
+        for batch in batched(replay, scheduler.batch_size):
+            await on_vectors([chunk for chunk, _ in batch], [vector for _, vector in batch])
+
+    with open(vectors_path(file_path), "a", encoding="utf-8") as f:
+        async for start, batch, vectors in embed_stream(scheduler, chunks):
+            for vector in vectors:
+                f.write(json.dumps(vector) + "\n")
+            f.flush()
+            await on_vectors(batch, vectors)
+            await on_progress(done + start + len(vectors), total)
+
+    return total
+
+
+async def embed_stream(
+    scheduler: EmbeddingScheduler,
+    chunks: Iterable[dict]
+) -> AsyncIterator[tuple[int, list[dict], list[list[float]]]]:
+    """
+    Embed chunk dicts through the scheduler.
+
+    Yields:
+        (offset, chunks, vectors) per batch, in input order
+    """
+    # Chunks handed to the scheduler but not yet returned; bounded by its
+    # look-ahead window, so memory does not grow with the document.
+    in_flight: deque = deque()
+
+    def texts() -> Iterator[str]:
+        for chunk in chunks:
+            in_flight.append(chunk)
+            yield chunk["page_content"]
+
+    async for start, vectors in scheduler.stream(texts()):
+        yield start, [in_flight.popleft() for _ in vectors], vectors
+
+
+def upsert_chunks(
+    collection_name: str,
+    chunks: list[dict],
+    vectors: list[list[float]],
+    vector_store: VectorBackend,
+    batch_size: int
+) -> int:
+    """
+    Upsert embedded chunks, keyed by chunk hash, in batches of batch_size.
+
+    Returns:
+        Number of vectors upserted
+    """
+    count = 0
+    for start in range(0, len(chunks), batch_size):
+        ids = [
+            chunk.get("hash") or chunk_hash(chunk["page_content"])
+            for chunk in chunks[start:start + batch_size]
+        ]
+        metadatas = [
+            {**chunk["metadata"], "text": chunk["page_content"]}
+            for chunk in chunks[start:start + batch_size]
+        ]
+        count += len(vector_store.upsert_vectors(
+            collection_name, ids, vectors[start:start + batch_size], metadatas
+        ))
+    return count
+
+
+def index_vectors(
+    collection_name: str,
+    file_path: str,
+    vector_store: VectorBackend,
+    batch_size: int
+) -> int:
+    """
+    Upsert the embedded chunks into the collection.
+
+    Returns:
+        Number of vectors upserted
+    """
+    chunks = read_jsonl(chunks_path(file_path))
+    vectors = read_jsonl(vectors_path(file_path))
+
+    count = 0
+    ids, values, metadatas = [], [], []
+    for chunk, vector in zip(chunks, vectors):
+        ids.append(chunk.get("hash") or chunk_hash(chunk["page_content"]))
+        values.append(vector)
+        metadatas.append({**chunk["metadata"], "text": chunk["page_content"]})
+        if len(ids) >= batch_size:
+            count += len(vector_store.upsert_vectors(collection_name, ids, values, metadatas))
+            ids, values, metadatas = [], [], []
+    count += len(vector_store.upsert_vectors(collection_name, ids, values, metadatas))
+    return count
@@ -0,0 +1,343 @@
+"""
+Incremental replacement of an ingested document, run by the ingestion workers.
+
+Vector ids are chunk content hashes, so the stored vector ids of a namespace
+are exactly the chunk hashes of its current version. A replacement parses the
+new file and diffs its chunk hashes against those ids: only added chunks are
+embedded, and the document keeps serving its current version (status
+"replacing") until the switch.
+
+In place, when the document is the only reference to its namespace:
+
+    build  - the diff is planned once, before anything is written, into
+             artifacts next to the upload (<upload>.plan.json and the added
+             chunks as <upload>.added.chunks.jsonl), and the added chunks are
+             embedded into <upload>.added.vectors.jsonl. The namespace is not
+             touched, and a retry resumes from the artifacts.
+    apply  - upsert the added vectors, delete the removed ids, rebuild the
+             lexical index; then commit_replacement switches the row over.
+             Vector-store work is O(changed chunks). Until the first removed
+             id is deleted a failed replacement is rolled back by deleting
+             the added ids; after that it can only be finished (retried).
+
+Otherwise the namespace is shared with documents that keep the old content,
+so the new version is built in a fresh namespace: unchanged vectors are
+copied and added chunks embedded into it, and the switch is the row update.
+A failed replacement deletes that namespace.
+
+Either way the target namespace is recorded on the row
+(replacement_collection) before the first write and kept across retries,
+and writes already done by an earlier attempt are skipped.
+"""
+import asyncio
+import json
+import os
+from pathlib import Path
+from typing import Awaitable, Callable, Optional
+
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.core.executor import run_blocking
+from app.ingestion.dedup import acquire_content, release_content
+from app.ingestion.pipeline import (
+    QUEUED,
+    READY,
+    SEARCHABLE_STATUSES,
+    batched,
+    chunks_path,
+    embed_chunks,
+    embed_stream,
+    index_vectors,
+    parse_document,
+    read_jsonl,
+    remove_artifacts,
+    upsert_chunks,
+)
+from app.models.database import Document
+from app.services import EmbeddingService, VectorBackend
+from app.services.lexical_index import lexical_indexes
+
+# Copy batches (fetch + upsert of unchanged vectors) in flight at once
+COPY_CONCURRENCY = 4
+
+
+def plan_path(upload_path: str) -> Path:
+    return Path(f"{upload_path}.plan.json")
+
+
+def added_path(upload_path: str) -> str:
+    """Pseudo file path whose chunks / vectors artifacts hold the added chunks."""
+    return f"{upload_path}.added"
+
+
+def applying_path(upload_path: str) -> Path:
+    """Marker written before the first removed id is deleted."""
+    return Path(f"{upload_path}.applying")
+
+
+def remove_replacement_artifacts(upload_path: str):
+    """Delete the stage files of a replacement (not the upload itself)."""
+    remove_artifacts(upload_path)
+    remove_artifacts(added_path(upload_path))
+    for path in (plan_path(upload_path), applying_path(upload_path)):
+        if path.exists():
+            path.unlink()
+
+
+def _write_plan(vector_store: VectorBackend, upload_path: str, collection: str) -> dict:
+    """Parse the new file and diff it against the namespace, once. Blocking."""
+    if plan_path(upload_path).exists():
+        return json.loads(plan_path(upload_path).read_text())
+
+    chunk_count = parse_document(upload_path)
+    current = set(vector_store.list_ids(collection))
+    new_hashes = set()
+    tmp = chunks_path(added_path(upload_path)).with_suffix(".tmp")
+    with open(tmp, "w", encoding="utf-8") as f:
+        for chunk in read_jsonl(chunks_path(upload_path)):
+            new_hashes.add(chunk["hash"])
+            if chunk["hash"] not in current:
+                f.write(json.dumps(chunk) + "\n")
+    os.replace(tmp, chunks_path(added_path(upload_path)))
+
+    plan = {
+        "chunk_count": chunk_count,
+        "added": len(new_hashes - current),
+        "removed": sorted(current - new_hashes),
+    }
+    tmp = plan_path(upload_path).with_suffix(".tmp")
+    tmp.write_text(json.dumps(plan))
+    os.replace(tmp, plan_path(upload_path))
+    return plan
+
+
+def _summary(plan: dict) -> dict:
+    return {
+        "chunk_count": plan["chunk_count"],
+        "added": plan["added"],
+        "removed": len(plan["removed"]),
+        "unchanged": plan["chunk_count"] - plan["added"],
+    }
+
+
+async def build_replacement(
+    vector_store: VectorBackend,
+    embedding_service: EmbeddingService,
+    upload_path: str,
+    old_collection: str,
+    target: str,
+    batch_size: int,
+    on_batch: Callable[[], Awaitable[None]]
+) -> dict:
+    """
+    Build the new version of a document: in place when target is its current
+    namespace (see apply_replacement), else into the fresh target namespace.
+
+    Args:
+        vector_store: Backend holding the namespaces
+        embedding_service: Embeddings for the document's model
+        upload_path: The new file; its artifacts are written next to it
+        old_collection: Namespace of the current version
+        target: old_collection, or a fresh namespace to build into
+        batch_size: Vectors per upsert request
+        on_batch: Awaited after every batch (the worker refreshes its lease)
+
+    Returns:
+        Summary with chunk_count and added / removed / unchanged chunk counts
+    """
+    if target == old_collection:
+        plan = await run_blocking(_write_plan, vector_store, upload_path, old_collection)
+
+        async def on_progress(done: int, total: int):
+            await on_batch()
+
+        async def on_vectors(chunks: list[dict], vectors: list[list[float]]):
+            pass
+
+        await embed_chunks(added_path(upload_path), embedding_service.get_scheduler(), on_progress, on_vectors)
+        return _summary(plan)
+
+    def parse() -> set:
+        if not chunks_path(upload_path).exists():
+            parse_document(upload_path)
+        return {chunk["hash"] for chunk in read_jsonl(chunks_path(upload_path))}
+
+    new_hashes = await run_blocking(parse)
+    old_ids = set(await run_blocking(vector_store.list_ids, old_collection))
+    # Written by an earlier attempt
+    present = set(await run_blocking(vector_store.list_ids, target))
+
+    async def copy(batch: list[dict]):
+        stored = await run_blocking(vector_store.fetch_vectors, old_collection, [chunk["hash"] for chunk in batch])
+        batch = [chunk for chunk in batch if chunk["hash"] in stored]
+        await run_blocking(
+            upsert_chunks, target, batch, [stored[chunk["hash"]][0] for chunk in batch], vector_store, batch_size
+        )
+        await on_batch()
+
+    async def copy_unchanged():
+        # A few batches in flight at a time, bounded so memory does not grow
+        # with the document.
+        pending = set()
+        kept_chunks = (
+            chunk for chunk in read_jsonl(chunks_path(upload_path))
+            if chunk["hash"] in old_ids and chunk["hash"] not in present
+        )
+        try:
+            for batch in batched(kept_chunks, batch_size):
+                if len(pending) >= COPY_CONCURRENCY:
+                    done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                    for task in done:
+                        task.result()
+                pending.add(asyncio.create_task(copy(batch)))
+            while pending:
+                done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    task.result()
+        finally:
+            for task in pending:
+                task.cancel()
+            await asyncio.gather(*pending, return_exceptions=True)
+
+    async def embed_added():
+        new_chunks = (
+            chunk for chunk in read_jsonl(chunks_path(upload_path))
+            if chunk["hash"] not in old_ids and chunk["hash"] not in present
+        )
+        async for _, batch, vectors in embed_stream(embedding_service.get_scheduler(), new_chunks):
+            await run_blocking(upsert_chunks, target, batch, vectors, vector_store, batch_size)
+            await on_batch()
+
+    # Copying needs no embedding calls, so it overlaps with embedding.
+    copying = asyncio.create_task(copy_unchanged())
+    try:
+        await embed_added()
+        await copying
+    finally:
+        if not copying.done():
+            copying.cancel()
+            await asyncio.gather(copying, return_exceptions=True)
+
+    await run_blocking(lexical_indexes.build, target, read_jsonl(chunks_path(upload_path)))
+    return _summary({
+        "chunk_count": len(new_hashes),
+        "added": len(new_hashes - old_ids),
+        "removed": sorted(old_ids - new_hashes),
+    })
+
+
+async def apply_replacement(vector_store: VectorBackend, upload_path: str, collection: str, batch_size: int):
+    """
+    Apply an in-place build to its namespace: upsert the added vectors, delete
+    the removed ids and rebuild the lexical index. Idempotent, so a retry
+    after a partial apply finishes it.
+    """
+    plan = json.loads(plan_path(upload_path).read_text())
+    await run_blocking(index_vectors, collection, added_path(upload_path), vector_store, batch_size)
+    applying_path(upload_path).touch()
+    if plan["removed"]:
+        await run_blocking(vector_store.delete_vectors, collection, plan["removed"])
+    await run_blocking(lexical_indexes.build, collection, read_jsonl(chunks_path(upload_path)))
+
+
+async def discard_replacement(
+    vector_store: VectorBackend,
+    upload_path: str,
+    old_collection: str,
+    target: Optional[str]
+) -> bool:
+    """
+    Undo a (possibly partial) replacement build.
+
+    A fresh namespace is deleted with its lexical index; an in-place build
+    has its added vectors deleted again.
+
+    Returns:
+        False if an in-place build was already being applied and can only be
+        finished, not undone
+    """
+    if not target:
+        return True
+    if target != old_collection:
+        await vector_store.adelete_collection(target)
+        lexical_indexes.delete(target)
+        return True
+    if applying_path(upload_path).exists():
+        return False
+    added = chunks_path(added_path(upload_path))
+    if added.exists():
+        ids = [chunk["hash"] for chunk in read_jsonl(added)]
+        if ids:
+            await run_blocking(vector_store.delete_vectors, old_collection, ids)
+    return True
+
+
+async def commit_replacement(
+    db: AsyncSession,
+    document: Document,
+    target: Optional[str],
+    chunk_count: int
+) -> tuple[bool, str, str, bool]:
+    """
+    Point a locked document at its new version; the caller commits.
+
+    Args:
+        db: Session the document was loaded (and locked) in
+        document: Document with a pending replacement; its new file is moved
+            next to the upload, named after its namespace
+        target: Namespace built by build_replacement (the current one when
+            built in place), or None if the content was found to be
+            ingested already
+        chunk_count: Chunks in the new version
+
+    Returns:
+        Tuple of (whether the old namespace lost its last reference and can
+        be purged, old namespace, old file path, whether target was used)
+
+    Raises:
+        LookupError: target is None and the shared content disappeared;
+            the job must build it after all
+    """
+    old_collection = document.collection_name
+    old_file_path = document.file_path
+    sole_reference = await release_content(db, document)
+
+    shared = await acquire_content(
+        db, document.replacement_hash, document.embedding_provider, document.embedding_model
+    )
+    if shared is not None:
+        ready = shared.status in SEARCHABLE_STATUSES
+        document.collection_name = shared.collection_name
+        document.file_path = shared.file_path
+        document.chunk_count = shared.chunk_count if ready else "0"
+        document.ref_count = shared.ref_count
+        document.status = READY if ready else QUEUED
+        document.progress = 100 if ready else 0
+        if os.path.exists(document.replacement_path):
+            os.remove(document.replacement_path)
+    elif target is None:
+        raise LookupError("Shared content was removed before the replacement could use it")
+    else:
+        upload_path = Path(document.replacement_path)
+        stored_path = upload_path.with_name(f"{target}{upload_path.suffix}")
+        os.replace(upload_path, stored_path)
+        document.collection_name = target
+        document.file_path = str(stored_path)
+        document.chunk_count = str(chunk_count)
+        document.ref_count = 1
+        document.status = READY
+        document.progress = 100
+
+    document.content_hash = document.replacement_hash
+    document.size_bytes = document.replacement_size
+    document.filename = document.replacement_filename
+    document.error = None
+    document.locked_at = None
+    document.embedding_api_key = None
+    document.replacement_path = None
+    document.replacement_filename = None
+    document.replacement_hash = None
+    document.replacement_size = None
+    document.replacement_collection = None
+    purge_old = sole_reference and old_collection != document.collection_name
+    return purge_old, old_collection, old_file_path, shared is None
@@ -0,0 +1,67 @@
+"""
+Streaming upload-to-disk.
+
+Uploads are copied in fixed-size chunks, so memory per request stays constant
+regardless of file size. The SHA-256 is computed while streaming and the copy
+is aborted as soon as the configured size limit is exceeded.
+"""
+import hashlib
+import os
+from pathlib import Path
+
+from fastapi import UploadFile
+
+from app.core.executor import run_blocking
+
+
+class UploadTooLarge(Exception):
+    """The upload exceeded the configured maximum size."""
+
+    def __init__(self, max_bytes: int):
+        super().__init__(f"File exceeds maximum upload size of {max_bytes} bytes")
+        self.max_bytes = max_bytes
+
+
+async def save_upload(
+    file: UploadFile,
+    destination: Path,
+    max_bytes: int,
+    chunk_size: int = 1024 * 1024
+) -> tuple[int, str]:
+    """
+    Stream an upload to destination.
+
+    The file is written to a temporary path and renamed on success, so a
+    rejected or interrupted upload never leaves a partial file behind.
+
+    Args:
+        file: Incoming upload
+        destination: Final path of the stored file
+        max_bytes: Maximum accepted size; 0 disables the limit
+        chunk_size: Bytes read and written per step
+
+    Returns:
+        (size in bytes, hex SHA-256 of the content)
+    """
+    if max_bytes and file.size is not None and file.size > max_bytes:
+        raise UploadTooLarge(max_bytes)
+
+    tmp = destination.with_name(destination.name + ".part")
+    digest = hashlib.sha256()
+    size = 0
+    out = await run_blocking(open, tmp, "wb")
+    try:
+        while chunk := await file.read(chunk_size):
+            size += len(chunk)
+            if max_bytes and size > max_bytes:
+                raise UploadTooLarge(max_bytes)
+            digest.update(chunk)
+            await run_blocking(out.write, chunk)
+        await run_blocking(out.close)
+        await run_blocking(os.replace, tmp, destination)
+    except BaseException:
+        out.close()
+        if tmp.exists():
+            tmp.unlink()
+        raise
+    return size, digest.hexdigest()
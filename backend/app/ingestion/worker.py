@@ -0,0 +1,452 @@
+"""
+Database-backed worker pool that runs document ingestion jobs.
+
+The documents table is the queue: a job is any Document whose status is
+still active. Workers claim one with SELECT ... FOR UPDATE SKIP LOCKED and
+hold a lease (locked_at) that they refresh after every stage and batch. If a
+worker dies, its lease expires and another worker resumes the job from the
+stage recorded in status.
+
+Documents sharing content (see app.ingestion.dedup) are ingested once: only
+the oldest active reference to a namespace is claimable, and the others are
+marked ready from it once it finishes.
+
+Replacements (status "replacing") go through the same queue; see
+app.ingestion.replace.
+"""
+import asyncio
+import os
+import traceback
+from datetime import datetime, timedelta
+from typing import Optional
+from uuid import UUID
+
+from sqlalchemy import select, or_, and_, exists
+from sqlalchemy.orm import aliased
+
+from app.core.config import get_settings
+from app.core.database import async_session
+from app.core.executor import run_blocking
+from app.core.security import decrypt_secret
+from app.ingestion.dedup import file_in_use, has_references, new_collection_name
+from app.ingestion.replace import (
+    apply_replacement,
+    build_replacement,
+    commit_replacement,
+    discard_replacement,
+    remove_replacement_artifacts,
+)
+from app.ingestion.pipeline import (
+    ACTIVE_STATUSES,
+    QUEUED,
+    PARSING,
+    EMBEDDING,
+    INDEXING,
+    READY,
+    FAILED,
+    REPLACING,
+    SEARCHABLE_STATUSES,
+    chunks_path,
+    parse_document,
+    embed_chunks,
+    index_vectors,
+    read_jsonl,
+    upsert_chunks,
+    remove_artifacts,
+)
+from app.models.database import Document
+from app.services import EmbeddingService, get_vector_store
+from app.services.lexical_index import lexical_indexes
+
+
+class DocumentRemoved(Exception):
+    """The document row was deleted while its job was running."""
+
+
+class IngestionWorkerPool:
+    """Pool of asyncio workers draining the ingestion queue."""
+
+    def __init__(
+        self,
+        workers: int = 2,
+        poll_interval: float = 2.0,
+        lease_seconds: int = 300,
+        max_attempts: int = 3,
+        batch_size: int = 100
+    ):
+        self.workers = workers
+        self.poll_interval = poll_interval
+        self.lease_seconds = lease_seconds
+        self.max_attempts = max_attempts
+        self.batch_size = batch_size
+        self._tasks: list[asyncio.Task] = []
+        self._wake = asyncio.Event()
+
+    def start(self):
+        if async_session is None or self._tasks:
+            return
+        self._tasks = [
+            asyncio.create_task(self._run_worker(n), name=f"ingestion-worker-{n}")
+            for n in range(self.workers)
+        ]
+
+    async def stop(self):
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+
+    def wake(self):
+        """Signal idle workers that a new job was queued."""
+        self._wake.set()
+
+    async def _run_worker(self, n: int):
+        while True:
+            try:
+                document_id = await self._claim_job()
+            except Exception as e:
+                print(f"Ingestion worker {n}: error claiming job: {str(e)}")
+                document_id = None
+
+            if document_id is None:
+                try:
+                    await asyncio.wait_for(self._wake.wait(), timeout=self.poll_interval)
+                except asyncio.TimeoutError:
+                    pass
+                self._wake.clear()
+                continue
+
+            try:
+                await self._process(document_id)
+            except Exception as e:
+                # e.g. the database went away mid-job; the lease expires and
+                # the job is retried, but this worker must keep polling.
+                print(f"Ingestion worker {n}: error processing document {document_id}: {str(e)}")
+                traceback.print_exc()
+
+    async def _claim_job(self) -> Optional[UUID]:
+        """Lease the oldest runnable job, or return None if the queue is empty."""
+        now = datetime.utcnow()
+        lease_cutoff = now - timedelta(seconds=self.lease_seconds)
+        older = aliased(Document)
+        older_active_reference = exists().where(
+            older.collection_name == Document.collection_name,
+            older.status.in_(ACTIVE_STATUSES),
+            or_(
+                older.created_at < Document.created_at,
+                and_(older.created_at == Document.created_at, older.id < Document.id)
+            )
+        )
+        async with async_session() as db:
+            result = await db.execute(
+                select(Document)
+                .where(
+                    Document.status.in_(ACTIVE_STATUSES + (REPLACING,)),
+                    or_(Document.locked_at.is_(None), Document.locked_at < lease_cutoff),
+                    ~older_active_reference
+                )
+                .order_by(Document.created_at)
+                .limit(1)
+                .with_for_update(skip_locked=True)
+            )
+            document = result.scalar_one_or_none()
+            if document is None:
+                return None
+            document.locked_at = now
+            document.attempts += 1
+            await db.commit()
+            return document.id
+
+    async def _update(self, document_id: UUID, **fields):
+        """Persist job fields and refresh the lease."""
+        async with async_session() as db:
+            document = await db.get(Document, document_id)
+            if document is None:
+                raise DocumentRemoved()
+            document.locked_at = datetime.utcnow()
+            for name, value in fields.items():
+                setattr(document, name, value)
+            await db.commit()
+
+    async def _process(self, document_id: UUID):
+        async with async_session() as db:
+            document = await db.get(Document, document_id)
+            if document is None:
+                return
+            status = document.status
+            file_path = document.file_path
+            collection_name = document.collection_name
+            attempts = document.attempts
+            embedding_provider = document.embedding_provider or "openai"
+            embedding_model = document.embedding_model
+            stored_api_key = document.embedding_api_key
+            if status == REPLACING:
+                # Loaded again by _process_replacement once this session is closed
+                shared = None
+            else:
+                shared = (await db.execute(
+                    select(Document).where(
+                        Document.collection_name == collection_name,
+                        Document.id != document_id,
+                        Document.status.in_(SEARCHABLE_STATUSES)
+                    ).limit(1)
+                )).scalar_one_or_none()
+
+        if status == REPLACING:
+            await self._process_replacement(document_id)
+            return
+
+        if shared is not None:
+            # Same content was already ingested by another reference.
+            try:
+                await self._update(
+                    document_id,
+                    status=READY,
+                    progress=100,
+                    chunk_count=shared.chunk_count,
+                    error=None,
+                    locked_at=None,
+                    embedding_api_key=None
+                )
+                print(f"Ingestion: document {document_id} shares ingested content of {shared.id}")
+            except DocumentRemoved:
+                pass
+            return
+
+        print(f"Ingestion: document {document_id} resuming at stage '{status}' (attempt {attempts})")
+        try:
+            embedding_service = EmbeddingService(
+                provider=embedding_provider,
+                api_key=decrypt_secret(stored_api_key) if stored_api_key else None,
+                model=embedding_model
+            )
+
+            if status in (QUEUED, PARSING):
+                await self._update(document_id, status=PARSING, progress=0)
+                chunk_count = await run_blocking(parse_document, file_path)
+                status = EMBEDDING
+                await self._update(document_id, status=status, chunk_count=str(chunk_count))
+
+            vector_store = get_vector_store(
+                embeddings=embedding_service.get_embeddings_model(),
+                dimension=embedding_service.get_dimension()
+            )
+
+            if status == EMBEDDING:
+                async def on_progress(done: int, total: int):
+                    await self._update(document_id, progress=int(done * 100 / total))
+
+                async def on_vectors(chunks: list[dict], vectors: list[list[float]]):
+                    await run_blocking(
+                        upsert_chunks, collection_name, chunks, vectors, vector_store, self.batch_size
+                    )
+
+                count = await embed_chunks(
+                    file_path,
+                    embedding_service.get_scheduler(),
+                    on_progress,
+                    on_vectors
+                )
+            elif status == INDEXING:
+                count = await run_blocking(
+                    index_vectors,
+                    collection_name,
+                    file_path,
+                    vector_store,
+                    self.batch_size
+                )
+
+            if status in (EMBEDDING, INDEXING):
+                # BM25 index for hybrid retrieval, from the same parsed chunks.
+                await run_blocking(lexical_indexes.build, collection_name, read_jsonl(chunks_path(file_path)))
+                await self._update(
+                    document_id,
+                    status=READY,
+                    progress=100,
+                    chunk_count=str(count),
+                    error=None,
+                    locked_at=None,
+                    embedding_api_key=None
+                )
+                remove_artifacts(file_path)
+                print(f"Ingestion: document {document_id} ready ({count} chunks)")
+
+        except DocumentRemoved:
+            print(f"Ingestion: document {document_id} was deleted, abandoning job")
+            await self._purge_unreferenced(collection_name)
+            remove_artifacts(file_path)
+
+        except Exception as e:
+            print(f"Ingestion: document {document_id} failed at stage '{status}': {str(e)}")
+            traceback.print_exc()
+            final = attempts >= self.max_attempts
+            try:
+                if final:
+                    await self._update(
+                        document_id,
+                        status=FAILED,
+                        error=str(e),
+                        locked_at=None,
+                        embedding_api_key=None
+                    )
+                else:
+                    await self._update(document_id, error=str(e), locked_at=None)
+            except DocumentRemoved:
+                await self._purge_unreferenced(collection_name)
+                remove_artifacts(file_path)
+
+    async def _purge_unreferenced(self, collection_name: str):
+        """
+        Drop what a job removed mid-way wrote (vectors already upserted, the
+        lexical index) unless another document still references the namespace.
+        """
+        async with async_session() as db:
+            if await has_references(db, collection_name):
+                return
+        await get_vector_store().adelete_collection(collection_name)
+        lexical_indexes.delete(collection_name)
+
+
+    async def _process_replacement(self, document_id: UUID):
+        """Build a document's new version outside any row lock, then switch it over."""
+        async with async_session() as db:
+            document = await db.get(Document, document_id)
+            if document is None:
+                return
+            upload_path = document.replacement_path
+            content_hash = document.replacement_hash
+            old_collection = document.collection_name
+            attempts = document.attempts
+            stored_api_key = document.embedding_api_key
+            embedding_provider = document.embedding_provider or "openai"
+            embedding_model = document.embedding_model
+            target = document.replacement_collection
+
+            # Content already ingested with this model needs no build.
+            already_ingested = (await db.execute(
+                select(Document.id).where(
+                    Document.content_hash == content_hash,
+                    Document.embedding_provider == document.embedding_provider,
+                    Document.embedding_model == embedding_model,
+                    Document.status == READY
+                ).limit(1)
+            )).first() is not None
+            # In place when nothing else reads the namespace. No reference can
+            # join it meanwhile: acquire_content skips replacing documents.
+            shared_namespace = (await db.execute(
+                select(Document.id).where(
+                    Document.collection_name == old_collection,
+                    Document.id != document_id
+                ).limit(1)
+            )).first() is not None
+
+        print(f"Ingestion: document {document_id} replacement (attempt {attempts})")
+        vector_store = None
+        try:
+            embedding_service = EmbeddingService(
+                provider=embedding_provider,
+                api_key=decrypt_secret(stored_api_key) if stored_api_key else None,
+                model=embedding_model
+            )
+            vector_store = get_vector_store(
+                embeddings=embedding_service.get_embeddings_model(),
+                dimension=embedding_service.get_dimension()
+            )
+
+            summary = {"chunk_count": 0}
+            if not already_ingested or target is not None:
+                if target is None:
+                    # Recorded before the first write so every retry reuses it.
+                    target = new_collection_name(content_hash) if shared_namespace else old_collection
+                    await self._update(document_id, replacement_collection=target)
+
+                async def refresh_lease():
+                    await self._update(document_id)
+
+                summary = await build_replacement(
+                    vector_store,
+                    embedding_service,
+                    upload_path,
+                    old_collection,
+                    target,
+                    self.batch_size,
+                    refresh_lease
+                )
+                if target == old_collection:
+                    await refresh_lease()
+                    await apply_replacement(vector_store, upload_path, target, self.batch_size)
+
+            async with async_session() as db:
+                locked = (await db.execute(
+                    select(Document).where(Document.id == document_id).with_for_update()
+                )).scalar_one_or_none()
+                if locked is None or locked.status != REPLACING:
+                    raise DocumentRemoved()
+                purge_old, old_collection, old_file_path, used_target = await commit_replacement(
+                    db, locked, target, summary["chunk_count"]
+                )
+                remove_old_file = old_file_path != locked.file_path and not await file_in_use(db, old_file_path)
+                await db.commit()
+
+            if target and not used_target and target != old_collection:
+                await discard_replacement(vector_store, upload_path, old_collection, target)
+            if purge_old:
+                await vector_store.adelete_collection(old_collection)
+                lexical_indexes.delete(old_collection)
+            if remove_old_file and os.path.exists(old_file_path):
+                os.remove(old_file_path)
+            remove_replacement_artifacts(upload_path)
+            print(f"Ingestion: document {document_id} replaced: {summary}")
+
+        except DocumentRemoved:
+            print(f"Ingestion: document {document_id} was deleted, abandoning replacement")
+            if target:
+                await self._purge_unreferenced(target)
+            if os.path.exists(upload_path):
+                os.remove(upload_path)
+            remove_replacement_artifacts(upload_path)
+
+        except Exception as e:
+            print(f"Ingestion: document {document_id} replacement failed: {str(e)}")
+            traceback.print_exc()
+            final = attempts >= self.max_attempts
+            try:
+                if not final:
+                    # The target and the artifacts are kept for the retry.
+                    await self._update(document_id, error=str(e), locked_at=None)
+                elif not await discard_replacement(
+                    vector_store or get_vector_store(), upload_path, old_collection, target
+                ):
+                    # Part of the old version is already gone: keep retrying
+                    # (once per lease) until the switch goes through.
+                    print(f"Ingestion: document {document_id} replacement partly applied, will be finished")
+                    await self._update(document_id, error=str(e))
+                else:
+                    # Give up on the new version; the current one is intact.
+                    await self._update(
+                        document_id,
+                        status=READY,
+                        error=f"Replacement failed: {str(e)}",
+                        locked_at=None,
+                        embedding_api_key=None,
+                        replacement_path=None,
+                        replacement_filename=None,
+                        replacement_hash=None,
+                        replacement_size=None,
+                        replacement_collection=None
+                    )
+                    if os.path.exists(upload_path):
+                        os.remove(upload_path)
+                    remove_replacement_artifacts(upload_path)
+            except DocumentRemoved:
+                pass
+
+
+_settings = get_settings()
+ingestion_pool = IngestionWorkerPool(
+    workers=_settings.ingestion_workers,
+    poll_interval=_settings.ingestion_poll_interval,
+    lease_seconds=_settings.ingestion_lease_seconds,
+    max_attempts=_settings.ingestion_max_attempts,
+    batch_size=_settings.ingestion_batch_size
+)
@@ -3,16 +3,24 @@ from contextlib import asynccontextmanager
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 
+from app.api.pagination import NEXT_CURSOR_HEADER
 from app.core.config import get_settings
-from app.core.database import init_db
+from app.core.database import init_db, close_db
+from app.core.executor import shutdown_executor
+from app.services.client_pool import client_registry
+from app.ingestion import ingestion_pool
 from app.api.routes import health, workflow, documents, chat, auth
 
 
 @asynccontextmanager
 async def lifespan(app: FastAPI):
     await init_db()
+    ingestion_pool.start()
     yield
-    pass
+    await ingestion_pool.stop()
+    await client_registry.aclose()
+    await close_db()
+    shutdown_executor()
 
 
 def create_app() -> FastAPI:
@@ -31,6 +39,7 @@ def create_app() -> FastAPI:
         allow_credentials=True,
         allow_methods=["*"],
         allow_headers=["*"],
+        expose_headers=[NEXT_CURSOR_HEADER],
     )
     
     app.include_router(health.router, prefix="/api/health", tags=["Health"])
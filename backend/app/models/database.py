@@ -1,5 +1,5 @@
 from datetime import datetime
-from sqlalchemy import Column, String, Text, DateTime, JSON, ForeignKey, Boolean
+from sqlalchemy import Column, String, Text, DateTime, JSON, ForeignKey, Boolean, Integer, BigInteger, Index
 from sqlalchemy.orm import relationship
 from sqlalchemy.dialects.postgresql import UUID
 import uuid
@@ -22,6 +22,9 @@ class User(Base):
 
 class Workflow(Base):
     __tablename__ = "workflows"
+    __table_args__ = (
+        Index("ix_workflows_user_id_updated_at", "user_id", "updated_at"),
+    )
     
     id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
     name = Column(String(255), nullable=False)
@@ -39,20 +42,49 @@ class Workflow(Base):
 
 class Document(Base):
     __tablename__ = "documents"
+    __table_args__ = (
+        Index("ix_documents_workflow_id_created_at", "workflow_id", "created_at"),
+    )
     
     id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
     workflow_id = Column(UUID(as_uuid=True), ForeignKey("workflows.id"), nullable=False)
     filename = Column(String(255), nullable=False)
     file_path = Column(String(512), nullable=False)
-    collection_name = Column(String(255), nullable=False)
+    collection_name = Column(String(255), nullable=False, index=True)
     chunk_count = Column(String(50), default="0")
+    size_bytes = Column(BigInteger, nullable=True)
+    content_hash = Column(String(64), nullable=True, index=True)
+    # Number of documents sharing this row's collection (content-addressed)
+    ref_count = Column(Integer, nullable=False, default=1, server_default="1")
     created_at = Column(DateTime, default=datetime.utcnow)
     
+    # Ingestion job state: queued -> parsing -> embedding -> indexing -> ready | failed
+    status = Column(String(20), nullable=False, default="ready", server_default="ready", index=True)
+    progress = Column(Integer, nullable=False, default=0, server_default="0")
+    error = Column(Text, nullable=True)
+    attempts = Column(Integer, nullable=False, default=0, server_default="0")
+    locked_at = Column(DateTime, nullable=True)
+    updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+    embedding_provider = Column(String(50), nullable=True)
+    embedding_model = Column(String(100), nullable=True)
+    # Encrypted (app.core.security.encrypt_secret), cleared once the job ends
+    embedding_api_key = Column(Text, nullable=True)
+    
+    # Pending replacement (status "replacing"), built by the ingestion workers
+    replacement_path = Column(String(512), nullable=True)
+    replacement_filename = Column(String(255), nullable=True)
+    replacement_hash = Column(String(64), nullable=True)
+    replacement_size = Column(BigInteger, nullable=True)
+    replacement_collection = Column(String(255), nullable=True)
+    
     workflow = relationship("Workflow", back_populates="documents")
 
 
 class ChatSession(Base):
     __tablename__ = "chat_sessions"
+    __table_args__ = (
+        Index("ix_chat_sessions_workflow_id_created_at", "workflow_id", "created_at"),
+    )
     
     id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
     workflow_id = Column(UUID(as_uuid=True), ForeignKey("workflows.id"), nullable=False)
@@ -64,6 +96,9 @@ class ChatSession(Base):
 
 class ChatMessage(Base):
     __tablename__ = "chat_messages"
+    __table_args__ = (
+        Index("ix_chat_messages_session_id_created_at", "session_id", "created_at"),
+    )
     
     id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
     session_id = Column(UUID(as_uuid=True), ForeignKey("chat_sessions.id"), nullable=False)
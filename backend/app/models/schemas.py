@@ -107,7 +107,31 @@ class DocumentResponse(BaseModel):
     file_path: str
     collection_name: str
     chunk_count: str
+    size_bytes: Optional[int] = None
+    content_hash: Optional[str] = None
+    ref_count: int = 1
     created_at: datetime
+    status: str = "ready"
+    progress: int = 0
+    error: Optional[str] = None
+    
+    class Config:
+        from_attributes = True
+
+
+class DocumentReplaceResponse(BaseModel):
+    document: DocumentResponse
+    mode: str  # "queued", or "unchanged" when the upload matches the current content
+
+
+class DocumentStatusResponse(BaseModel):
+    id: UUID
+    status: str
+    progress: int
+    chunk_count: str
+    error: Optional[str] = None
+    attempts: int
+    updated_at: Optional[datetime] = None
     
     class Config:
         from_attributes = True
@@ -138,6 +162,7 @@ class ChatExecuteRequest(BaseModel):
 class ChatExecuteResponse(BaseModel):
     response: str
     session_id: UUID
+    metadata: dict = Field(default_factory=dict)
 
 
 # Validation Schemas
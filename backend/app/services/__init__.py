@@ -1,13 +1,18 @@
 from app.services.document_processor import DocumentProcessor
 from app.services.embedding_service import EmbeddingService
-from app.services.vector_store import VectorStore
+from app.services.vector_backend import VectorBackend
+from app.services.vector_store import VectorStore, get_vector_store
+from app.services.local_vector_store import LocalVectorStore
 from app.services.llm_service import LLMService
 from app.services.web_search import WebSearchService
 
 __all__ = [
     "DocumentProcessor",
     "EmbeddingService", 
+    "VectorBackend",
     "VectorStore",
+    "LocalVectorStore",
+    "get_vector_store",
     "LLMService",
     "WebSearchService"
 ]
@@ -0,0 +1,172 @@
+"""
+Process-wide registry of SDK clients.
+
+ChatOpenAI, OpenAIEmbeddings and Pinecone clients are expensive to build and
+each owns its own HTTP connection pool. Services borrow them from here so
+keep-alive connections and TLS sessions survive across requests.
+"""
+import hashlib
+import time
+from collections import OrderedDict
+from threading import Lock
+from typing import Any, Callable, Optional
+
+import httpx
+from langchain_openai import ChatOpenAI, OpenAIEmbeddings
+from pinecone import Pinecone
+
+from app.core.config import get_settings
+from app.services.embedding_scheduler import EmbeddingScheduler
+
+
+def _hash_key(api_key: Optional[str]) -> str:
+    return hashlib.sha256((api_key or "").encode("utf-8")).hexdigest()[:16]
+
+
+class ClientRegistry:
+    """Bounded, idle-evicting cache of SDK clients sharing one HTTP pool."""
+
+    def __init__(
+        self,
+        maxsize: int = 64,
+        idle_timeout: float = 600,
+        max_connections: int = 100,
+        max_keepalive_connections: int = 20
+    ):
+        self.maxsize = maxsize
+        self.idle_timeout = idle_timeout
+        self._limits = httpx.Limits(
+            max_connections=max_connections,
+            max_keepalive_connections=max_keepalive_connections
+        )
+        self._clients: OrderedDict = OrderedDict()
+        self._lock = Lock()
+        self._http_client: Optional[httpx.Client] = None
+        self._http_async_client: Optional[httpx.AsyncClient] = None
+
+    @property
+    def http_client(self) -> httpx.Client:
+        if self._http_client is None:
+            self._http_client = httpx.Client(limits=self._limits, timeout=60)
+        return self._http_client
+
+    @property
+    def http_async_client(self) -> httpx.AsyncClient:
+        if self._http_async_client is None:
+            self._http_async_client = httpx.AsyncClient(limits=self._limits, timeout=60)
+        return self._http_async_client
+
+    def _evict_idle(self, now: float):
+        while self._clients:
+            key, (_, last_used) = next(iter(self._clients.items()))
+            if now - last_used < self.idle_timeout:
+                break
+            del self._clients[key]
+
+    def get(self, key: tuple, factory: Callable[[], Any]) -> Any:
+        """
+        Return the client registered under key, creating it with factory on a miss.
+
+        Args:
+            key: (kind, provider, model, api_key hash) tuple
+            factory: Zero-argument callable building the client
+        """
+        now = time.monotonic()
+        with self._lock:
+            self._evict_idle(now)
+            entry = self._clients.get(key)
+            if entry is not None:
+                self._clients[key] = (entry[0], now)
+                self._clients.move_to_end(key)
+                return entry[0]
+
+        client = factory()
+        with self._lock:
+            entry = self._clients.get(key)
+            if entry is not None:
+                client = entry[0]
+            self._clients[key] = (client, now)
+            self._clients.move_to_end(key)
+            while len(self._clients) > self.maxsize:
+                self._clients.popitem(last=False)
+        return client
+
+    def get_chat_model(self, provider: str, model: str, api_key: str) -> ChatOpenAI:
+        if provider != "openai":
+            raise ValueError(f"Unsupported provider: {provider}. Only OpenAI is supported.")
+        return self.get(
+            ("chat", provider, model, _hash_key(api_key)),
+            lambda: ChatOpenAI(
+                api_key=api_key,
+                model=model,
+                temperature=0.7,
+                http_client=self.http_client,
+                http_async_client=self.http_async_client
+            )
+        )
+
+    def get_embeddings(self, provider: str, model: str, api_key: str) -> OpenAIEmbeddings:
+        if provider != "openai":
+            raise ValueError(f"Unsupported provider: {provider}. Only OpenAI is supported.")
+        return self.get(
+            ("embeddings", provider, model, _hash_key(api_key)),
+            lambda: OpenAIEmbeddings(
+                api_key=api_key,
+                model=model,
+                http_client=self.http_client,
+                http_async_client=self.http_async_client
+            )
+        )
+
+    def get_embedding_scheduler(self, provider: str, model: str, api_key: str) -> EmbeddingScheduler:
+        settings = get_settings()
+        return self.get(
+            ("embedding-scheduler", provider, model, _hash_key(api_key)),
+            lambda: EmbeddingScheduler(
+                self.get_embeddings(provider, model, api_key),
+                max_concurrency=settings.embedding_max_concurrency,
+                requests_per_minute=settings.embedding_requests_per_minute,
+                tokens_per_minute=settings.embedding_tokens_per_minute,
+                batch_tokens=settings.embedding_batch_tokens,
+                batch_size=settings.embedding_batch_size
+            )
+        )
+
+    def get_pinecone(self, api_key: str) -> Pinecone:
+        return self.get(
+            ("pinecone", "pinecone", "", _hash_key(api_key)),
+            lambda: Pinecone(api_key=api_key)
+        )
+
+    def get_pinecone_index(self, api_key: str, index_name: str):
+        return self.get(
+            ("pinecone-index", "pinecone", index_name, _hash_key(api_key)),
+            lambda: self.get_pinecone(api_key).Index(index_name)
+        )
+
+    def stats(self) -> dict:
+        with self._lock:
+            kinds = {}
+            for kind, *_ in self._clients:
+                kinds[kind] = kinds.get(kind, 0) + 1
+        return {"size": len(self._clients), "maxsize": self.maxsize, "by_kind": kinds}
+
+    async def aclose(self):
+        """Drop every client and close the shared HTTP pools."""
+        with self._lock:
+            self._clients.clear()
+        if self._http_async_client is not None:
+            await self._http_async_client.aclose()
+            self._http_async_client = None
+        if self._http_client is not None:
+            self._http_client.close()
+            self._http_client = None
+
+
+_settings = get_settings()
+client_registry = ClientRegistry(
+    maxsize=_settings.client_pool_size,
+    idle_timeout=_settings.client_idle_timeout,
+    max_connections=_settings.http_max_connections,
+    max_keepalive_connections=_settings.http_max_keepalive_connections
+)
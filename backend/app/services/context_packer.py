@@ -0,0 +1,189 @@
+"""
+Token-budgeted packing of retrieved context for the LLM prompt.
+
+Retrieved chunks are deduplicated (the splitter overlaps neighbouring chunks
+by 200 characters, and several documents can return the same text), ordered
+by retrieval score and tokenized once each. Chunks are then added best first
+until the model's context budget is spent; the first chunk that does not fit
+is truncated at a token boundary. Web search results share the same budget.
+"""
+from functools import lru_cache
+
+import tiktoken
+
+from app.core.config import get_settings
+
+# Context windows of the chat models the LLM Engine node offers.
+MODEL_CONTEXT_WINDOWS = {
+    "gpt-4o-mini": 128_000,
+    "gpt-4o": 128_000,
+    "gpt-4-turbo": 128_000,
+    "gpt-3.5-turbo": 16_385,
+}
+DEFAULT_CONTEXT_WINDOW = 8_192
+
+# Shortest shared prefix/suffix treated as splitter overlap rather than coincidence.
+MIN_OVERLAP_CHARS = 32
+# A truncated chunk shorter than this is not worth the tokens.
+MIN_TRUNCATED_TOKENS = 64
+SEPARATOR = "\n\n"
+
+
+class _ApproximateEncoding:
+    """Roughly four characters per token, when the tokenizer files cannot be loaded."""
+
+    def encode(self, text: str) -> list[str]:
+        return [text[i:i + 4] for i in range(0, len(text), 4)]
+
+    def decode(self, tokens: list[str]) -> str:
+        return "".join(tokens)
+
+
+@lru_cache(maxsize=16)
+def get_encoding(model: str):
+    """Tokenizer for a model, falling back to cl100k_base or an estimate."""
+    try:
+        return tiktoken.encoding_for_model(model)
+    except KeyError:
+        pass
+    except Exception as e:
+        print(f"DEBUG: Could not load tokenizer for {model}: {str(e)}")
+        return _ApproximateEncoding()
+    try:
+        return tiktoken.get_encoding("cl100k_base")
+    except Exception as e:
+        print(f"DEBUG: Could not load cl100k_base tokenizer: {str(e)}")
+        return _ApproximateEncoding()
+
+
+def context_budget(model: str, max_tokens: int = None) -> int:
+    """
+    Tokens available for retrieved context with a given model.
+
+    Args:
+        model: Chat model name
+        max_tokens: Per-node override of CONTEXT_MAX_TOKENS
+
+    Returns:
+        The smaller of the configured cap and the model window minus the
+        tokens reserved for instructions, the question and the answer
+    """
+    settings = get_settings()
+    window = MODEL_CONTEXT_WINDOWS.get(model, DEFAULT_CONTEXT_WINDOW)
+    return max(0, min(max_tokens or settings.context_max_tokens, window - settings.context_reserved_tokens))
+
+
+def _overlap(left: str, right: str) -> int:
+    """Length of the longest suffix of left that is a prefix of right."""
+    if len(left) < MIN_OVERLAP_CHARS or len(right) < MIN_OVERLAP_CHARS:
+        return 0
+    probe = right[:MIN_OVERLAP_CHARS]
+    start = max(0, len(left) - len(right))
+    position = left.find(probe, start)
+    while position != -1:
+        if right.startswith(left[position:]):
+            return len(left) - position
+        position = left.find(probe, position + 1)
+    return 0
+
+
+def _trim(text: str, other: str) -> str:
+    """Text without what it shares with other: empty if contained in it, else minus overlapping ends."""
+    if text in other:
+        return ""
+    text = text[_overlap(other, text):]
+    overlap = _overlap(text, other)
+    return text[:-overlap] if overlap else text
+
+
+def dedupe_chunks(chunks: list[dict]) -> tuple[list[dict], int]:
+    """
+    Remove repeated and overlapping text from chunks ordered best first.
+
+    A chunk contained in a better one is dropped; one containing a better
+    chunk replaces it in that chunk's place, and the other kept chunks are
+    trimmed against the replacement; text shared with a better chunk's start
+    or end is trimmed off.
+
+    Returns:
+        Tuple of (deduplicated chunks, number of chunks dropped)
+    """
+    kept: list[dict] = []
+    dropped = 0
+    for chunk in chunks:
+        text = chunk["text"].strip()
+        for i, better in enumerate(kept):
+            if text not in better["text"] and better["text"] in text:
+                # Chunks kept after the replaced one can be contained in or
+                # overlap the replacement (it was only trimmed against those
+                # before), so trim them against it.
+                later = [{**other, "text": _trim(other["text"], text).strip()} for other in kept[i + 1:]]
+                survivors = [other for other in later if len(other["text"]) >= MIN_OVERLAP_CHARS]
+                dropped += len(later) - len(survivors)
+                kept[i:] = [{**chunk, "text": text, "score": better["score"]}] + survivors
+                text = ""
+                break
+            text = _trim(text, better["text"])
+            if not text:
+                break
+        if len(text.strip()) < MIN_OVERLAP_CHARS:
+            dropped += 1
+            continue
+        kept.append({**chunk, "text": text.strip()})
+    return kept, dropped
+
+
+def pack_context(chunks: list[dict], model: str, budget: int, web_context: str = None) -> dict:
+    """
+    Pack retrieved chunks (and web results) into a token budget.
+
+    Args:
+        chunks: {"text", "score"} dicts from the knowledge base nodes
+        model: Chat model, selects the tokenizer
+        budget: Token budget, see context_budget
+        web_context: Formatted web search results, if any
+
+    Returns:
+        Dict with the packed "context" and "web_context" text, their total
+        "tokens", the "budget", and how many chunks were used, deduplicated
+        and dropped for lack of room
+    """
+    encoding = get_encoding(model)
+    separator_tokens = len(encoding.encode(SEPARATOR))
+    ordered = sorted(chunks, key=lambda chunk: chunk.get("score") or 0.0, reverse=True)
+    unique, deduplicated = dedupe_chunks(ordered)
+
+    web_tokens = encoding.encode(web_context) if web_context else []
+    # Web results keep up to a quarter of the budget when there are documents.
+    doc_budget = budget - min(len(web_tokens), budget // 4) if unique else 0
+
+    parts, used, truncated = [], 0, False
+    for chunk in unique:
+        tokens = encoding.encode(chunk["text"])
+        cost = len(tokens) + (separator_tokens if parts else 0)
+        if used + cost <= doc_budget:
+            parts.append(chunk["text"])
+            used += cost
+            continue
+        room = doc_budget - used - (separator_tokens if parts else 0)
+        if room >= MIN_TRUNCATED_TOKENS:
+            parts.append(encoding.decode(tokens[:room]))
+            used += room + (separator_tokens if len(parts) > 1 else 0)
+            truncated = True
+        break
+
+    web_room = budget - used
+    if len(web_tokens) > web_room:
+        web_context = encoding.decode(web_tokens[:web_room]) if web_room >= MIN_TRUNCATED_TOKENS else ""
+        web_tokens = web_tokens[:web_room] if web_context else []
+
+    return {
+        "context": SEPARATOR.join(parts) or None,
+        "web_context": web_context or "",
+        "tokens": used + len(web_tokens),
+        "budget": budget,
+        "chunks_used": len(parts),
+        "chunks_deduplicated": deduplicated,
+        "chunks_dropped": len(unique) - len(parts),
+        "truncated": truncated,
+    }
@@ -1,21 +1,76 @@
 """
 Document Processor using LangChain components.
 Uses PyPDFLoader and RecursiveCharacterTextSplitter.
+
+iter_chunks streams chunks page by page, so memory is bounded by a page (or,
+in parallel mode, a window of page-range shards) rather than the document.
+Large PDFs are parsed in parallel: page ranges are sharded across a process
+pool and each worker extracts and splits its pages. Shards are merged in page
+order, so chunks, "page" and "start_index" metadata match the serial path.
 """
+import math
+from collections import deque
+from typing import Iterator
+
+from pypdf import PdfReader
 from langchain_community.document_loaders import PyPDFLoader
 from langchain_text_splitters import RecursiveCharacterTextSplitter
 from langchain_core.documents import Document
 
+from app.core.config import get_settings
+from app.core.executor import get_process_pool, process_pool_size
+
+# Shards per worker, so uneven pages (scans, dense tables) balance out.
+SHARDS_PER_WORKER = 4
+
+
+def _make_splitter(chunk_size: int, chunk_overlap: int) -> RecursiveCharacterTextSplitter:
+    return RecursiveCharacterTextSplitter(
+        chunk_size=chunk_size,
+        chunk_overlap=chunk_overlap,
+        add_start_index=True,
+    )
+
+
+def _iter_pages(file_path: str, start: int = 0, end: int = None) -> Iterator[Document]:
+    """Yield pages [start, end) one at a time, with the metadata PyPDFLoader sets."""
+    reader = PdfReader(file_path)
+    end = len(reader.pages) if end is None else end
+    for i in range(start, end):
+        yield Document(page_content=reader.pages[i].extract_text(), metadata={"source": file_path, "page": i})
+
+
+def _parse_page_range(
+    file_path: str,
+    start: int,
+    end: int,
+    chunk_size: int,
+    chunk_overlap: int
+) -> list[tuple[str, dict]]:
+    """
+    Extract and split pages [start, end) of a PDF. Runs in a worker process.
+    
+    Returns:
+        (page_content, metadata) per chunk, with the same metadata PyPDFLoader sets
+    """
+    splitter = _make_splitter(chunk_size, chunk_overlap)
+    return [
+        (chunk.page_content, chunk.metadata)
+        for page in _iter_pages(file_path, start, end)
+        for chunk in splitter.split_documents([page])
+    ]
+
 
 class DocumentProcessor:
     """Process documents using LangChain loaders and splitters."""
     
-    def __init__(self, chunk_size: int = 1000, chunk_overlap: int = 200):
-        self.text_splitter = RecursiveCharacterTextSplitter(
-            chunk_size=chunk_size,
-            chunk_overlap=chunk_overlap,
-            add_start_index=True,
-        )
+    def __init__(self, chunk_size: int = 1000, chunk_overlap: int = 200, workers: int = None):
+        settings = get_settings()
+        self.chunk_size = chunk_size
+        self.chunk_overlap = chunk_overlap
+        self.workers = workers if workers is not None else process_pool_size()
+        self.parallel_min_pages = settings.parse_parallel_min_pages
+        self.text_splitter = _make_splitter(chunk_size, chunk_overlap)
     
     def load_pdf(self, file_path: str) -> list[Document]:
         """Load a PDF file and return documents."""
@@ -28,8 +83,56 @@ class DocumentProcessor:
     
     def process_file(self, file_path: str) -> list[Document]:
         """Load and split a PDF file."""
-        documents = self.load_pdf(file_path)
-        return self.split_documents(documents)
+        return list(self.iter_chunks(file_path))
+    
+    def iter_chunks(self, file_path: str) -> Iterator[Document]:
+        """
+        Yield chunks of a PDF in page order without loading the whole document.
+        
+        Pages are extracted and split one at a time; large PDFs are sharded
+        across the process pool when more than one worker is configured.
+        """
+        if self.workers > 1:
+            page_count = len(PdfReader(file_path).pages)
+            if page_count >= self.parallel_min_pages:
+                yield from self.iter_chunks_parallel(file_path, page_count)
+                return
+        for page in _iter_pages(file_path):
+            yield from self.text_splitter.split_documents([page])
+    
+    def iter_chunks_parallel(self, file_path: str, page_count: int) -> Iterator[Document]:
+        """
+        Parse a PDF by sharding page ranges across the process pool.
+        
+        At most two shards per worker are in flight, so finished shards wait
+        for the consumer instead of accumulating in memory.
+        
+        Args:
+            file_path: PDF to parse
+            page_count: Number of pages in the PDF
+        """
+        shard_size = max(1, math.ceil(page_count / (self.workers * SHARDS_PER_WORKER)))
+        ranges = iter([(start, min(start + shard_size, page_count)) for start in range(0, page_count, shard_size)])
+        pool = get_process_pool()
+        pending = deque()
+        
+        def submit():
+            shard = next(ranges, None)
+            if shard is not None:
+                pending.append(pool.submit(_parse_page_range, file_path, *shard, self.chunk_size, self.chunk_overlap))
+        
+        for _ in range(self.workers * 2):
+            submit()
+        try:
+            while pending:
+                # Consumed in submission order, i.e. page order.
+                chunks = pending.popleft().result()
+                submit()
+                for content, metadata in chunks:
+                    yield Document(page_content=content, metadata=metadata)
+        finally:
+            for future in pending:
+                future.cancel()
     
     def get_texts_from_documents(self, documents: list[Document]) -> list[str]:
         """Extract plain text from documents."""
@@ -0,0 +1,231 @@
+"""
+Rate-limit-aware scheduler for bulk embedding requests.
+
+Texts are split into batches bounded by item count and an estimated token
+budget, and embedded with bounded concurrency. Request and token rates are
+held under the provider's per-minute limits with token buckets; on a 429 the
+scheduler backs off (honouring Retry-After) and halves its concurrency, then
+grows it back one slot per successful window (AIMD).
+
+One scheduler is shared per (provider, model, api key), so concurrent
+ingestion jobs draw from the same budget.
+"""
+import asyncio
+import random
+import time
+from collections import deque
+from typing import AsyncIterator, Iterable, Iterator, Optional
+
+from langchain_core.embeddings import Embeddings
+
+
+def estimate_tokens(text: str) -> int:
+    """Cheap token estimate (~4 characters per token for English text)."""
+    return len(text) // 4 + 1
+
+
+def token_batches(texts: Iterable[str], max_tokens: int, max_items: int) -> Iterator[tuple[list[str], int]]:
+    """
+    Lazily split texts into contiguous batches.
+
+    Yields:
+        (batch texts, estimated tokens) for each batch
+    """
+    batch, tokens = [], 0
+    for text in texts:
+        cost = estimate_tokens(text)
+        if batch and (tokens + cost > max_tokens or len(batch) >= max_items):
+            yield batch, tokens
+            batch, tokens = [], 0
+        batch.append(text)
+        tokens += cost
+    if batch:
+        yield batch, tokens
+
+
+def _is_rate_limited(exc: Exception) -> bool:
+    return getattr(exc, "status_code", None) == 429 or type(exc).__name__ == "RateLimitError"
+
+
+def _is_retryable(exc: Exception) -> bool:
+    status = getattr(exc, "status_code", None)
+    return _is_rate_limited(exc) or (status is not None and status >= 500) or isinstance(
+        exc, (asyncio.TimeoutError, ConnectionError)
+    ) or type(exc).__name__ in ("APIConnectionError", "APITimeoutError")
+
+
+def _retry_after(exc: Exception) -> Optional[float]:
+    response = getattr(exc, "response", None)
+    headers = getattr(response, "headers", None) or {}
+    try:
+        return float(headers.get("retry-after"))
+    except (TypeError, ValueError):
+        return None
+
+
+class _TokenBucket:
+    """Per-minute budget refilled continuously."""
+
+    def __init__(self, per_minute: float):
+        self.capacity = per_minute
+        self.level = per_minute
+        self.rate = per_minute / 60
+        self.updated = time.monotonic()
+
+    def wait_time(self, amount: float, now: float) -> float:
+        """Seconds until amount is available (0 if it is now)."""
+        self.level = min(self.capacity, self.level + (now - self.updated) * self.rate)
+        self.updated = now
+        amount = min(amount, self.capacity)
+        return 0.0 if self.level >= amount else (amount - self.level) / self.rate
+
+    def take(self, amount: float):
+        self.level -= min(amount, self.capacity)
+
+
+class EmbeddingScheduler:
+    """Batches and throttles embedding requests for one model and API key."""
+
+    def __init__(
+        self,
+        embeddings: Embeddings,
+        max_concurrency: int = 4,
+        requests_per_minute: int = 3000,
+        tokens_per_minute: int = 1_000_000,
+        batch_tokens: int = 50_000,
+        batch_size: int = 256,
+        max_retries: int = 6
+    ):
+        self.embeddings = embeddings
+        self.max_concurrency = max_concurrency
+        self.batch_tokens = batch_tokens
+        self.batch_size = batch_size
+        self.max_retries = max_retries
+        self._requests = _TokenBucket(requests_per_minute)
+        self._tokens = _TokenBucket(tokens_per_minute)
+        self._limit = max_concurrency
+        self._in_flight = 0
+        self._successes = 0
+        self._paused_until = 0.0
+        self._condition: Optional[asyncio.Condition] = None
+        self._counters = {"requests": 0, "retries": 0, "rate_limited": 0, "texts": 0}
+
+    def _get_condition(self) -> asyncio.Condition:
+        # Created lazily so the scheduler can be built outside a running loop.
+        if self._condition is None:
+            self._condition = asyncio.Condition()
+        return self._condition
+
+    async def _acquire(self, tokens: int):
+        """Wait for a concurrency slot and enough request/token budget."""
+        condition = self._get_condition()
+        async with condition:
+            while True:
+                now = time.monotonic()
+                wait = max(
+                    self._paused_until - now,
+                    self._requests.wait_time(1, now),
+                    self._tokens.wait_time(tokens, now)
+                )
+                if self._in_flight < self._limit and wait <= 0:
+                    self._requests.take(1)
+                    self._tokens.take(tokens)
+                    self._in_flight += 1
+                    return
+                try:
+                    await asyncio.wait_for(condition.wait(), timeout=wait if wait > 0 else None)
+                except asyncio.TimeoutError:
+                    pass
+
+    async def _release(self, succeeded: bool, rate_limited: bool = False, backoff: float = 0.0):
+        # Freed before waiting for the lock, so a cancellation here cannot leak the slot
+        self._in_flight -= 1
+        condition = self._get_condition()
+        async with condition:
+            if rate_limited:
+                self._limit = max(1, self._limit // 2)
+                self._successes = 0
+                self._paused_until = max(self._paused_until, time.monotonic() + backoff)
+            elif succeeded:
+                self._successes += 1
+                if self._limit < self.max_concurrency and self._successes >= self._limit:
+                    self._limit += 1
+                    self._successes = 0
+            condition.notify_all()
+
+    async def _embed_batch(self, texts: list[str], tokens: int) -> list[list[float]]:
+        attempt = 0
+        while True:
+            await self._acquire(tokens)
+            self._counters["requests"] += 1
+            # The slot is released exactly once per attempt, including when the
+            # task is cancelled mid-request (CancelledError is a BaseException).
+            released = False
+            try:
+                vectors = await self.embeddings.aembed_documents(texts)
+            except Exception as e:
+                if not _is_retryable(e) or attempt >= self.max_retries:
+                    raise
+                backoff = _retry_after(e) or min(60.0, 2 ** attempt) * (0.5 + random.random())
+                rate_limited = _is_rate_limited(e)
+                if rate_limited:
+                    self._counters["rate_limited"] += 1
+                self._counters["retries"] += 1
+                print(f"Embedding batch failed ({type(e).__name__}), retrying in {backoff:.1f}s")
+                released = True
+                await self._release(succeeded=False, rate_limited=rate_limited, backoff=backoff)
+            else:
+                released = True
+                await self._release(succeeded=True)
+                self._counters["texts"] += len(texts)
+                return vectors
+            finally:
+                if not released:
+                    await self._release(succeeded=False)
+            if not rate_limited:
+                await asyncio.sleep(backoff)
+            attempt += 1
+
+    async def stream(self, texts: Iterable[str]) -> AsyncIterator[tuple[int, list[list[float]]]]:
+        """
+        Embed texts, yielding (start index, vectors) per batch in input order.
+
+        texts may be a generator: it is consumed only as batches are launched.
+        Up to twice max_concurrency batches run ahead of the consumer, so work
+        done between iterations (e.g. upserts) overlaps with embedding while
+        memory stays bounded by that window.
+        """
+        batches = token_batches(texts, self.batch_tokens, self.batch_size)
+        pending: deque = deque()
+        offset = 0
+
+        def launch():
+            nonlocal offset
+            batch = next(batches, None)
+            if batch is not None:
+                batch_texts, tokens = batch
+                pending.append((offset, asyncio.create_task(self._embed_batch(batch_texts, tokens))))
+                offset += len(batch_texts)
+
+        for _ in range(self.max_concurrency * 2):
+            launch()
+        try:
+            while pending:
+                start, task = pending.popleft()
+                vectors = await task
+                launch()
+                yield start, vectors
+        finally:
+            for _, task in pending:
+                task.cancel()
+            await asyncio.gather(*(task for _, task in pending), return_exceptions=True)
+
+    async def embed(self, texts: Iterable[str]) -> list[list[float]]:
+        """Embed texts and return all vectors in input order."""
+        vectors: list[list[float]] = []
+        async for _, batch in self.stream(texts):
+            vectors.extend(batch)
+        return vectors
+
+    def stats(self) -> dict:
+        return {**self._counters, "concurrency": self._limit, "max_concurrency": self.max_concurrency}
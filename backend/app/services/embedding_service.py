@@ -1,6 +1,7 @@
-from langchain_openai import OpenAIEmbeddings
 from langchain_core.embeddings import Embeddings
 from app.core.config import get_settings
+from app.services.client_pool import client_registry
+from app.services.embedding_scheduler import EmbeddingScheduler
 
 
 class EmbeddingService:
@@ -16,14 +17,13 @@ class EmbeddingService:
         settings = get_settings()
         self.provider = provider
         self.model = model or "text-embedding-3-small"
+        self._api_key = api_key or settings.openai_api_key
         
-        if provider == "openai":
-            self.embeddings: Embeddings = OpenAIEmbeddings(
-                api_key=api_key or settings.openai_api_key,
-                model=self.model
-            )
-        else:
-            raise ValueError(f"Unsupported provider: {provider}. Only OpenAI is supported.")
+        self.embeddings: Embeddings = client_registry.get_embeddings(
+            provider=provider,
+            model=self.model,
+            api_key=self._api_key
+        )
     
     def embed_documents(self, texts: list[str]) -> list[list[float]]:
         """Generate embeddings for a list of texts."""
@@ -37,6 +37,18 @@ class EmbeddingService:
         """Return the LangChain embeddings model for use with vector stores."""
         return self.embeddings
     
+    def get_scheduler(self) -> EmbeddingScheduler:
+        """
+        Return the bulk-embedding scheduler for this model and API key.
+        
+        Shared process-wide so concurrent jobs respect one rate limit budget.
+        """
+        return client_registry.get_embedding_scheduler(
+            provider=self.provider,
+            model=self.model,
+            api_key=self._api_key
+        )
+    
     def get_dimension(self) -> int:
         """Get the dimension of the embedding model."""
         return self.EMBEDDING_DIMENSIONS.get(self.model, 1536)
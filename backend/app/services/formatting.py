@@ -0,0 +1,91 @@
+"""
+Local (LLM-free) markdown clean-up for workflow output.
+"""
+import re
+from itertools import islice
+
+
+_BULLET_RE = re.compile(r"^(\s*)(?:[•●▪◦*+]|-(?!-))\s+")
+_NUMBERED_RE = re.compile(r"^(\s*)(\d+)[.)]\s+")
+_LABEL_RE = re.compile(r"^([A-Z][\w /&-]{0,48}):\s*$")
+_HEADING_RE = re.compile(r"^#{1,6}\s")
+_FENCE_RE = re.compile(r"^\s*(`{3,}|~{3,})")
+# Words that make a "...:" line a sentence introducing what follows rather
+# than a label, e.g. "Here is the code:".
+_PROSE_WORDS = {"here", "is", "are", "was", "were", "this", "these", "that", "below", "following", "as"}
+_MAX_LABEL_WORDS = 4
+
+
+def _is_block_start(line: str) -> bool:
+    return bool(
+        _HEADING_RE.match(line)
+        or _BULLET_RE.match(line)
+        or _NUMBERED_RE.match(line)
+    )
+
+
+def _label(line: str, lines: list[str], index: int) -> str:
+    """Return the label of a standalone "Label:" line, or "" for prose."""
+    match = _LABEL_RE.match(line)
+    if not match:
+        return ""
+    next_line = next((following for following in islice(lines, index + 1, None) if following.strip()), "")
+    if _FENCE_RE.match(next_line):
+        return ""
+    words = match.group(1).split()
+    if len(words) > _MAX_LABEL_WORDS or _PROSE_WORDS.intersection(word.lower() for word in words):
+        return ""
+    return match.group(1)
+
+
+def format_markdown(text: str) -> str:
+    """
+    Tidy an LLM response into consistent markdown without another model call.
+
+    Normalises bullets to "- ", numbered items to "1. ", turns short
+    standalone "Label:" lines into bold headers (colon kept), separates lists
+    and headings from surrounding paragraphs, and collapses runs of blank
+    lines. The contents of ``` / ~~~ code fences are left untouched.
+    """
+    lines = text.replace("\r\n", "\n").replace("\r", "\n").split("\n")
+    formatted = []
+    fence = None
+
+    for index, raw in enumerate(lines):
+        if fence:
+            formatted.append(raw)
+            marker = raw.strip()
+            if len(marker) >= len(fence) and marker == fence[0] * len(marker):
+                fence = None
+            continue
+
+        opening = _FENCE_RE.match(raw)
+        if opening:
+            fence = opening.group(1)
+            formatted.append(raw.rstrip())
+            continue
+
+        line = raw.rstrip()
+        if not line and formatted and not formatted[-1]:
+            continue
+        line = _BULLET_RE.sub(lambda m: f"{m.group(1)}- ", line)
+        line = _NUMBERED_RE.sub(lambda m: f"{m.group(1)}{m.group(2)}. ", line)
+
+        label = _label(line, lines, index)
+        if label:
+            line = f"**{label}:**"
+
+        is_heading = bool(label or _HEADING_RE.match(line))
+        previous = formatted[-1] if formatted else ""
+        if previous and (
+            is_heading
+            or (_is_block_start(line) and not _is_block_start(previous))
+            or (line and not line[0].isspace() and _is_block_start(previous) and not _is_block_start(line))
+            or _HEADING_RE.match(previous)
+            or (previous.startswith("**") and previous.endswith("**"))
+        ):
+            formatted.append("")
+
+        formatted.append(line)
+
+    return "\n".join(formatted).strip()
@@ -0,0 +1,177 @@
+"""
+Hierarchical navigable small world (HNSW) graph for approximate search.
+
+Nodes are row numbers of a vector matrix owned by the caller; vectors are
+unit-normalised and similarity is the dot product. Layer 0 holds up to 2*m
+neighbours per node in a fixed-width int32 matrix (-1 padded), which the
+local vector store memory-maps next to the vectors; the sparse upper layers
+are small and kept as dicts.
+
+Reference: Malkov & Yashunin, "Efficient and robust approximate nearest
+neighbor search using Hierarchical Navigable Small World graphs".
+"""
+import heapq
+import math
+import random
+
+import numpy as np
+
+
+class HNSWIndex:
+    """HNSW graph over the rows of an externally stored vector matrix."""
+
+    def __init__(self, neighbors: np.ndarray, m: int = 16, ef_construction: int = 100, seed: int = 0):
+        """
+        Args:
+            neighbors: (capacity, 2*m) int32 layer-0 adjacency, -1 padded
+            m: Neighbours per node on the upper layers
+            ef_construction: Candidate list size while inserting
+            seed: Seed for level assignment, so builds are reproducible
+        """
+        self.neighbors = neighbors
+        self.m = m
+        self.m0 = 2 * m
+        self.ef_construction = ef_construction
+        self.level_mult = 1 / math.log(m)
+        self.rng = random.Random(seed)
+        self.upper: list[dict[int, list[int]]] = []
+        self.entry = -1
+
+    @property
+    def neighbors(self) -> np.ndarray:
+        return self._neighbors
+
+    @neighbors.setter
+    def neighbors(self, neighbors: np.ndarray):
+        self._neighbors = neighbors
+        # Plain ndarray view of the same buffer: indexing a memmap directly is slow.
+        self._adjacency = None if neighbors is None else np.asarray(neighbors)
+
+    @property
+    def max_level(self) -> int:
+        return len(self.upper)
+
+    def state(self) -> dict:
+        """Serialisable upper layers and entry point (layer 0 lives in neighbors)."""
+        return {
+            "entry": self.entry,
+            "upper": [{str(node): links for node, links in layer.items()} for layer in self.upper],
+        }
+
+    def load_state(self, state: dict):
+        self.entry = state["entry"]
+        self.upper = [{int(node): links for node, links in layer.items()} for layer in state["upper"]]
+
+    def _links(self, node: int, level: int) -> list[int]:
+        if level == 0:
+            row = self._adjacency[node]
+            return row[row >= 0].tolist()
+        return self.upper[level - 1].get(node, [])
+
+    def _set_links(self, node: int, level: int, links: list[int]):
+        if level == 0:
+            self._adjacency[node] = -1
+            self._adjacency[node, :len(links)] = links
+        else:
+            self.upper[level - 1][node] = links
+
+    def _search_layer(
+        self,
+        vectors: np.ndarray,
+        query: np.ndarray,
+        entry_points: list[int],
+        ef: int,
+        level: int
+    ) -> list[tuple[float, int]]:
+        """Best-first search of one layer; returns up to ef (score, node), best first."""
+        visited = set(entry_points)
+        scores = vectors[entry_points] @ query
+        candidates = [(-float(s), n) for s, n in zip(scores, entry_points)]
+        heapq.heapify(candidates)
+        results = [(float(s), n) for s, n in zip(scores, entry_points)]
+        heapq.heapify(results)
+        while len(results) > ef:
+            heapq.heappop(results)
+
+        while candidates:
+            negative, node = heapq.heappop(candidates)
+            if len(results) >= ef and -negative < results[0][0]:
+                break
+            fresh = [n for n in self._links(node, level) if n not in visited]
+            if not fresh:
+                continue
+            visited.update(fresh)
+            for score, neighbor in zip((vectors[fresh] @ query).tolist(), fresh):
+                if len(results) < ef or score > results[0][0]:
+                    heapq.heappush(candidates, (-score, neighbor))
+                    heapq.heappush(results, (score, neighbor))
+                    if len(results) > ef:
+                        heapq.heappop(results)
+        return sorted(results, reverse=True)
+
+    def _select(self, vectors: np.ndarray, candidates: list[tuple[float, int]], limit: int) -> list[int]:
+        """
+        Neighbour selection heuristic: keep a candidate only if it is closer
+        to the base node than to any neighbour already kept, so links spread
+        across clusters instead of piling into the nearest one. Pruned
+        candidates fill any remaining slots.
+        """
+        nodes = [node for _, node in candidates]
+        similarity = (vectors[nodes] @ vectors[nodes].T).tolist()
+        selected, pruned = [], []
+        for i, (score, node) in enumerate(candidates):
+            if len(selected) >= limit:
+                break
+            row = similarity[i]
+            if any(row[j] > score for j in selected):
+                pruned.append(node)
+            else:
+                selected.append(i)
+        return [nodes[i] for i in selected] + pruned[:limit - len(selected)]
+
+    def insert(self, vectors: np.ndarray, node: int):
+        """Link row node of vectors into the graph."""
+        vectors = np.asarray(vectors)
+        level = int(-math.log(1 - self.rng.random()) * self.level_mult)
+        if self.entry < 0:
+            self.entry = node
+            self.upper.extend({node: []} for _ in range(level))
+            return
+
+        query = vectors[node]
+        entry_points = [self.entry]
+        for lc in range(self.max_level, level, -1):
+            entry_points = [self._search_layer(vectors, query, entry_points, 1, lc)[0][1]]
+
+        for lc in range(min(level, self.max_level), -1, -1):
+            found = self._search_layer(vectors, query, entry_points, self.ef_construction, lc)
+            limit = self.m0 if lc == 0 else self.m
+            links = self._select(vectors, found, self.m)
+            self._set_links(node, lc, links)
+            for neighbor in links:
+                neighbor_links = self._links(neighbor, lc) + [node]
+                if len(neighbor_links) > limit:
+                    scores = (vectors[neighbor_links] @ vectors[neighbor]).tolist()
+                    ranked = sorted(zip(scores, neighbor_links), reverse=True)
+                    neighbor_links = self._select(vectors, ranked, limit)
+                self._set_links(neighbor, lc, neighbor_links)
+            entry_points = [n for _, n in found]
+
+        if level > self.max_level:
+            self.upper.extend({node: []} for _ in range(level - self.max_level))
+            self.entry = node
+
+    def search(self, vectors: np.ndarray, query: np.ndarray, ef: int) -> list[tuple[float, int]]:
+        """
+        Approximate nearest neighbours of query.
+
+        Returns:
+            Up to ef (score, node) pairs, best first
+        """
+        if self.entry < 0:
+            return []
+        vectors = np.asarray(vectors)
+        entry_points = [self.entry]
+        for lc in range(self.max_level, 0, -1):
+            entry_points = [self._search_layer(vectors, query, entry_points, 1, lc)[0][1]]
+        return self._search_layer(vectors, query, entry_points, ef, 0)
@@ -0,0 +1,88 @@
+"""
+Hybrid lexical + vector retrieval across a workflow's collections.
+
+Modes:
+    vector   embedding search only
+    lexical  BM25 only, no embedding call
+    hybrid   BM25 and embedding search fused with reciprocal-rank fusion;
+             queries made mostly of identifiers (SKUs, error codes) that
+             BM25 can answer take the lexical path and skip the embedding API
+
+Collections without a lexical index (ingested before it existed) fall back
+to vector search, so the identifier fast path is only taken when every
+collection has one.
+"""
+from langchain_core.embeddings import Embeddings
+from langchain_core.documents import Document
+
+from app.core.config import get_settings
+from app.core.executor import run_blocking
+from app.services.lexical_index import identifier_ratio, lexical_indexes
+from app.services.vector_backend import SCORE_KEY, VectorBackend
+
+RETRIEVAL_MODES = ("vector", "lexical", "hybrid")
+
+
+def reciprocal_rank_fusion(rankings: list[list[Document]], k: int, rrf_k: int = 60) -> list[Document]:
+    """
+    Fuse ranked lists: each document scores sum(1 / (rrf_k + rank)).
+
+    Documents are matched by content, which is what their vector ids
+    (chunk hashes) are derived from.
+    """
+    fused: dict[str, tuple[float, Document]] = {}
+    for ranking in rankings:
+        for rank, doc in enumerate(ranking, start=1):
+            score, first = fused.get(doc.page_content, (0.0, doc))
+            fused[doc.page_content] = (score + 1 / (rrf_k + rank), first)
+    ranked = sorted(fused.values(), key=lambda item: item[0], reverse=True)[:k]
+    return [
+        Document(page_content=doc.page_content, metadata={**doc.metadata, SCORE_KEY: score})
+        for score, doc in ranked
+    ]
+
+
+async def hybrid_search(
+    vector_store: VectorBackend,
+    collection_names: list[str],
+    query: str,
+    embeddings: Embeddings,
+    k: int = 5,
+    mode: str = None,
+    timeout: float = None
+) -> tuple[list[Document], dict]:
+    """
+    Retrieve the top k documents from several collections.
+
+    Args:
+        vector_store: Backend for the embedding search
+        collection_names: Collections to search
+        query: Query text
+        embeddings: Embeddings model the collections were built with
+        k: Number of documents to return
+        mode: vector, lexical or hybrid (default RETRIEVAL_MODE)
+        timeout: Deadline for the vector search, see asearch_collections
+
+    Returns:
+        Tuple of (documents, info with the mode actually used and the
+        collections dropped by the vector search)
+    """
+    settings = get_settings()
+    mode = mode or settings.retrieval_mode
+    if mode not in RETRIEVAL_MODES:
+        raise ValueError(f"Unknown retrieval mode: {mode}")
+    if mode == "vector":
+        docs, dropped = await vector_store.asearch_collections(collection_names, query, embeddings, k, timeout)
+        return docs, {"mode": "vector", "dropped": dropped}
+
+    candidates = k * settings.hybrid_candidates
+    lexical, unindexed = await run_blocking(lexical_indexes.search, collection_names, query, candidates)
+    if mode == "lexical":
+        return lexical[:k], {"mode": "lexical", "dropped": unindexed}
+    if lexical and not unindexed and identifier_ratio(query) >= settings.lexical_fast_path_ratio:
+        return lexical[:k], {"mode": "lexical", "dropped": unindexed}
+
+    vector, dropped = await vector_store.asearch_collections(collection_names, query, embeddings, candidates, timeout)
+    if not lexical:
+        return vector[:k], {"mode": "vector", "dropped": dropped}
+    return reciprocal_rank_fusion([vector, lexical], k, settings.rrf_k), {"mode": "hybrid", "dropped": dropped}
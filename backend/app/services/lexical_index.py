@@ -0,0 +1,241 @@
+"""
+BM25 inverted index per collection, stored on local disk.
+
+Built at ingestion time from the parsed chunks, next to the collection's
+vectors, so exact identifiers (SKUs, error codes, versions) can be matched
+lexically and identifier-only queries can be answered without an embedding
+call. Each collection is a directory under LEXICAL_INDEX_PATH:
+
+    meta.json        document count and average length
+    vocab.json       term -> term number
+    offsets.npy      int64, postings of term t are [offsets[t], offsets[t + 1])
+    postings.npy     int32 document numbers, grouped by term
+    frequencies.npy  uint16 term frequency per posting
+    lengths.npy      int32 tokens per document
+    documents.jsonl  one {"hash", "page_content", "metadata"} line per document
+    positions.npy    int64 byte offset of each line in documents.jsonl
+
+Arrays and documents.jsonl are memory-mapped when an index is opened.
+Indexes are immutable: a rebuild writes a new directory and swaps it in, and
+an index opened earlier keeps reading the files it mapped. The files live on the host
+that ingested the document, like the uploads themselves.
+"""
+import json
+import math
+import os
+import re
+import shutil
+import uuid
+from collections import Counter, defaultdict
+from pathlib import Path
+from typing import Iterable
+
+import numpy as np
+from langchain_core.documents import Document
+
+from app.core.cache import LRUCache
+from app.core.config import get_settings
+
+K1 = 1.2
+B = 0.75
+
+# Words joined by -, _, ., /, : or # stay together ("err-404", "v2.1.3") and
+# are also indexed as their parts.
+_TOKEN = re.compile(r"[A-Za-z0-9]+(?:[-_./:#][A-Za-z0-9]+)*")
+_PART = re.compile(r"[A-Za-z0-9]+")
+_STOPWORDS = frozenset(
+    "a an and are as at be by code does error for from how i in is it me of on or show "
+    "the this to was what when where which who why with".split()
+)
+
+
+def tokenize(text: str) -> list[str]:
+    """Lowercased terms: compound tokens followed by their parts."""
+    terms = []
+    for match in _TOKEN.finditer(text):
+        token = match.group().lower()
+        terms.append(token)
+        parts = _PART.findall(token)
+        if len(parts) > 1:
+            terms.extend(parts)
+    return terms
+
+
+def is_identifier(token: str) -> bool:
+    """Codes rather than words: contain a digit, join parts, or are upper-case acronyms."""
+    return (
+        any(c.isdigit() for c in token)
+        or len(_PART.findall(token)) > 1
+        or (len(token) >= 3 and token.isupper())
+    )
+
+
+def identifier_ratio(query: str) -> float:
+    """Share of the query's meaningful tokens that look like identifiers."""
+    tokens = [token for token in _TOKEN.findall(query) if token.lower() not in _STOPWORDS]
+    if not tokens:
+        return 0.0
+    return sum(is_identifier(token) for token in tokens) / len(tokens)
+
+
+def build_index(path: Path, chunks: Iterable[dict]) -> int:
+    """
+    Build an index from {"hash", "page_content", "metadata"} chunks and swap it into path.
+
+    Returns:
+        Number of documents indexed
+    """
+    tmp = path.with_name(f"{path.name}.tmp-{uuid.uuid4().hex[:8]}")
+    tmp.mkdir(parents=True)
+    postings = defaultdict(list)
+    lengths, positions = [], []
+    position = 0
+    with open(tmp / "documents.jsonl", "wb") as f:
+        for number, chunk in enumerate(chunks):
+            terms = tokenize(chunk["page_content"])
+            lengths.append(len(terms))
+            for term, count in Counter(terms).items():
+                postings[term].append((number, min(count, 65535)))
+            line = (json.dumps({
+                "hash": chunk["hash"],
+                "page_content": chunk["page_content"],
+                "metadata": chunk.get("metadata", {}),
+            }) + "\n").encode("utf-8")
+            f.write(line)
+            positions.append(position)
+            position += len(line)
+
+    vocab = {term: number for number, term in enumerate(postings)}
+    offsets = np.zeros(len(vocab) + 1, dtype=np.int64)
+    offsets[1:] = np.cumsum([len(entries) for entries in postings.values()])
+    flat = [entry for entries in postings.values() for entry in entries]
+    np.save(tmp / "offsets.npy", offsets)
+    np.save(tmp / "postings.npy", np.array([doc for doc, _ in flat], dtype=np.int32))
+    np.save(tmp / "frequencies.npy", np.array([tf for _, tf in flat], dtype=np.uint16))
+    np.save(tmp / "lengths.npy", np.array(lengths, dtype=np.int32))
+    np.save(tmp / "positions.npy", np.array(positions, dtype=np.int64))
+    (tmp / "vocab.json").write_text(json.dumps(vocab))
+    (tmp / "meta.json").write_text(json.dumps({
+        "documents": len(lengths),
+        "average_length": (sum(lengths) / len(lengths)) if lengths else 0.0,
+    }))
+
+    old = path.with_name(f"{path.name}.old-{uuid.uuid4().hex[:8]}")
+    if path.exists():
+        os.replace(path, old)
+    os.replace(tmp, path)
+    shutil.rmtree(old, ignore_errors=True)
+    return len(lengths)
+
+
+class BM25Index:
+    """A built index, opened read-only."""
+
+    def __init__(self, path: Path):
+        self.path = path
+        meta = json.loads((path / "meta.json").read_text())
+        self.documents = meta["documents"]
+        self.average_length = meta["average_length"] or 1.0
+        self.vocab = json.loads((path / "vocab.json").read_text())
+        self.offsets = np.load(path / "offsets.npy", mmap_mode="r")
+        self.postings = np.load(path / "postings.npy", mmap_mode="r")
+        self.frequencies = np.load(path / "frequencies.npy", mmap_mode="r")
+        self.lengths = np.load(path / "lengths.npy")
+        self.positions = np.load(path / "positions.npy", mmap_mode="r")
+        # Mapped now, not reopened by path on every read: after a rebuild the
+        # path holds another version whose byte offsets differ.
+        self.records = np.memmap(path / "documents.jsonl", dtype=np.uint8, mode="r") if self.documents else None
+
+    def search(self, query: str, k: int) -> list[tuple[float, int]]:
+        """Top k (BM25 score, document number) for a query, best first."""
+        scores = np.zeros(self.documents, dtype=np.float32)
+        for term in set(tokenize(query)):
+            number = self.vocab.get(term)
+            if number is None:
+                continue
+            start, end = self.offsets[number], self.offsets[number + 1]
+            docs = self.postings[start:end]
+            tf = self.frequencies[start:end].astype(np.float32)
+            idf = math.log(1 + (self.documents - len(docs) + 0.5) / (len(docs) + 0.5))
+            norm = K1 * (1 - B + B * self.lengths[docs] / self.average_length)
+            scores[docs] += idf * tf * (K1 + 1) / (tf + norm)
+
+        matched = np.flatnonzero(scores)
+        if not len(matched):
+            return []
+        top = matched[np.argsort(-scores[matched], kind="stable")[:k]]
+        return [(float(scores[doc]), int(doc)) for doc in top]
+
+    def read(self, numbers: list[int]) -> list[dict]:
+        found = []
+        for number in numbers:
+            start = int(self.positions[number])
+            end = int(self.positions[number + 1]) if number + 1 < self.documents else len(self.records)
+            found.append(json.loads(self.records[start:end].tobytes()))
+        return found
+
+
+class LexicalIndexStore:
+    """Builds, opens and searches the per-collection BM25 indexes."""
+
+    def __init__(self, root: str, cache_size: int = 64):
+        self._root = Path(root)
+        # (collection path, meta.json mtime) -> BM25Index, so a rebuild by
+        # any process is picked up on the next search.
+        self._open = LRUCache(maxsize=cache_size)
+
+    def _path(self, collection_name: str) -> Path:
+        return self._root / re.sub(r"[^A-Za-z0-9_.-]", "_", collection_name)
+
+    def build(self, collection_name: str, chunks: Iterable[dict]) -> int:
+        """(Re)build a collection's index from its chunks. Blocking."""
+        self._root.mkdir(parents=True, exist_ok=True)
+        return build_index(self._path(collection_name), chunks)
+
+    def delete(self, collection_name: str):
+        shutil.rmtree(self._path(collection_name), ignore_errors=True)
+
+    def get(self, collection_name: str) -> BM25Index:
+        """The collection's index, or None if it was never built."""
+        path = self._path(collection_name)
+        for _ in range(3):
+            try:
+                version = (path / "meta.json").stat().st_mtime_ns
+                index = self._open.get((path, version))
+                if index is not None:
+                    return index
+                index = BM25Index(path)
+                # A rebuild swapped in while opening could mix two versions' files.
+                if (path / "meta.json").stat().st_mtime_ns == version:
+                    self._open.set((path, version), index)
+                    return index
+            except FileNotFoundError:
+                if not path.exists():
+                    return None
+        return None
+
+    def search(self, collection_names: list[str], query: str, k: int) -> tuple[list[Document], list[str]]:
+        """
+        BM25 search across collections, merged by score. Blocking.
+
+        Returns:
+            Tuple of (best k documents with metadata["score"], names of
+            collections that have no index)
+        """
+        hits, missing = [], []
+        for name in dict.fromkeys(collection_names):
+            index = self.get(name)
+            if index is None:
+                missing.append(name)
+                continue
+            hits.extend((score, index, number) for score, number in index.search(query, k))
+        hits.sort(key=lambda hit: hit[0], reverse=True)
+
+        docs = []
+        for score, index, number in hits[:k]:
+            record = index.read([number])[0]
+            docs.append(Document(page_content=record["page_content"], metadata={**record["metadata"], "score": score}))
+        return docs, missing
+
+
+lexical_indexes = LexicalIndexStore(get_settings().lexical_index_path)
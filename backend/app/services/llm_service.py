@@ -1,7 +1,7 @@
-from langchain_openai import ChatOpenAI
 from langchain_core.language_models import BaseChatModel
 from langchain_core.messages import HumanMessage, SystemMessage
 from app.core.config import get_settings
+from app.services.client_pool import client_registry
 
 
 class LLMService:
@@ -16,14 +16,12 @@ class LLMService:
         settings = get_settings()
         self.provider = provider
         
-        if provider == "openai":
-            self.llm: BaseChatModel = ChatOpenAI(
-                api_key=api_key or settings.openai_api_key,
-                model=model or "gpt-4o-mini",
-                temperature=0.7
-            )
-        else:
-            raise ValueError(f"Unsupported provider: {provider}. Only OpenAI is supported.")
+        # Shared across requests, so never mutate it; per-call options are bound.
+        self.llm: BaseChatModel = client_registry.get_chat_model(
+            provider=provider,
+            model=model or "gpt-4o-mini",
+            api_key=api_key or settings.openai_api_key
+        )
     
     async def generate(
         self,
@@ -33,8 +31,6 @@ class LLMService:
         temperature: float = 0.7
     ) -> str:
         """Generate a response."""
-        self.llm.temperature = temperature
-        
         base_instruction = (
             "CRITICAL INSTRUCTION: You have access to 'Document Context' (from uploaded files) and 'Web Search Results'.\n"
             "1. The 'Document Context' is your PRIMARY source of truth. It contains specific private information.\n"
@@ -65,7 +61,7 @@ class LLMService:
             HumanMessage(content=query)
         ]
         
-        response = await self.llm.ainvoke(messages)
+        response = await self.llm.bind(temperature=temperature).ainvoke(messages)
         return response.content
     
     def get_llm(self) -> BaseChatModel:
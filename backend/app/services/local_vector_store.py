@@ -0,0 +1,380 @@
+"""
+In-process vector store persisted to memory-mapped files.
+
+An alternative to Pinecone for offline use, development and tests
+(VECTOR_BACKEND=local). Each collection is a directory under
+LOCAL_VECTOR_PATH:
+
+    meta.json      dimension, row count, capacity and HNSW upper layers
+    vectors.f32    (capacity, dimension) float32 rows, unit-normalised
+    alive.u8       1 per live row, 0 for deleted / overwritten rows
+    records.jsonl  one {"id", "metadata"} line per row
+    graph.i32      HNSW layer-0 adjacency, once the collection is large
+
+Small collections are searched exactly with one NumPy matrix-vector product.
+Once a collection reaches LOCAL_HNSW_MIN_VECTORS live rows an HNSW graph is
+built and kept up to date on every upsert, and searches become approximate.
+Deletes and overwrites only clear the alive flag; the files are compacted
+when dead rows outnumber live ones.
+
+Collections are opened once per process and shared by every store
+instance. The files are not safe to write from several processes at once,
+so run a single API process against a given LOCAL_VECTOR_PATH.
+"""
+import json
+import os
+import re
+import shutil
+import threading
+from pathlib import Path
+
+import numpy as np
+from langchain_core.documents import Document
+from langchain_core.embeddings import Embeddings
+
+from app.core.config import get_settings
+from app.services.hnsw import HNSWIndex
+from app.services.retrieval_cache import retrieval_cache
+from app.services.vector_backend import TEXT_KEY, VectorBackend
+
+INITIAL_CAPACITY = 1024
+COMPACT_MIN_DEAD = 1024
+
+
+def _normalise(vectors: np.ndarray) -> np.ndarray:
+    norms = np.linalg.norm(vectors, axis=-1, keepdims=True)
+    return vectors / np.where(norms == 0, 1, norms)
+
+
+def _resize(path: Path, size: int):
+    with open(path, "ab") as f:
+        f.truncate(size)
+
+
+class _Collection:
+    """One collection's files, opened and memory-mapped."""
+
+    def __init__(self, path: Path, hnsw_min_vectors: int, hnsw_m: int, ef_construction: int):
+        self.path = path
+        self.hnsw_min_vectors = hnsw_min_vectors
+        self.hnsw_m = hnsw_m
+        self.ef_construction = ef_construction
+        self.lock = threading.RLock()
+        self._reset()
+        self._load()
+
+    def _reset(self):
+        self.dimension = None
+        self.count = 0
+        self.capacity = 0
+        self.vectors = None
+        self.alive = None
+        self.graph = None
+        self.ids: list[str] = []
+        self.offsets: list[int] = []
+        self.rows: dict[str, int] = {}
+
+    @property
+    def live(self) -> int:
+        return len(self.rows)
+
+    def _load(self):
+        meta_path = self.path / "meta.json"
+        if not meta_path.exists():
+            return
+        meta = json.loads(meta_path.read_text())
+        self.dimension, self.count, self.capacity = meta["dimension"], meta["count"], meta["capacity"]
+        self._map()
+
+        offset = 0
+        with open(self.path / "records.jsonl", "rb") as f:
+            for line in f:
+                if len(self.ids) == self.count:
+                    break
+                self.ids.append(json.loads(line)["id"])
+                self.offsets.append(offset)
+                offset += len(line)
+        # Drop records from a write that was interrupted before meta.json.
+        _resize(self.path / "records.jsonl", offset)
+        self.rows = {vector_id: row for row, vector_id in enumerate(self.ids) if self.alive[row]}
+
+        if meta.get("graph") is not None:
+            self.graph = HNSWIndex(self._map_graph(), self.hnsw_m, self.ef_construction)
+            self.graph.load_state(meta["graph"])
+
+    def _map(self):
+        self.vectors = np.memmap(self.path / "vectors.f32", dtype=np.float32, mode="r+", shape=(self.capacity, self.dimension))
+        self.alive = np.memmap(self.path / "alive.u8", dtype=np.uint8, mode="r+", shape=(self.capacity,))
+
+    def _map_graph(self) -> np.memmap:
+        return np.memmap(self.path / "graph.i32", dtype=np.int32, mode="r+", shape=(self.capacity, 2 * self.hnsw_m))
+
+    def _grow(self, needed: int):
+        if needed <= self.capacity:
+            return
+        old = self.capacity
+        self.capacity = max(needed, 2 * old, INITIAL_CAPACITY)
+        self.flush()
+        self.vectors = self.alive = None
+        _resize(self.path / "vectors.f32", self.capacity * self.dimension * 4)
+        _resize(self.path / "alive.u8", self.capacity)
+        self._map()
+        if self.graph is not None:
+            self.graph.neighbors = None
+            _resize(self.path / "graph.i32", self.capacity * 2 * self.hnsw_m * 4)
+            self.graph.neighbors = self._map_graph()
+            self.graph.neighbors[old:] = -1
+
+    def _build_graph(self):
+        _resize(self.path / "graph.i32", self.capacity * 2 * self.hnsw_m * 4)
+        neighbors = self._map_graph()
+        neighbors[:] = -1
+        self.graph = HNSWIndex(neighbors, self.hnsw_m, self.ef_construction)
+        for row in sorted(self.rows.values()):
+            self.graph.insert(self.vectors, row)
+
+    def flush(self):
+        for array in (self.vectors, self.alive, self.graph.neighbors if self.graph else None):
+            if array is not None:
+                array.flush()
+        meta = {
+            "dimension": self.dimension,
+            "count": self.count,
+            "capacity": self.capacity,
+            "graph": self.graph.state() if self.graph else None,
+        }
+        tmp = self.path / "meta.json.tmp"
+        tmp.write_text(json.dumps(meta))
+        os.replace(tmp, self.path / "meta.json")
+
+    def upsert(self, ids: list[str], vectors: list[list[float]], metadatas: list[dict]):
+        values = _normalise(np.asarray(vectors, dtype=np.float32))
+        with self.lock:
+            if self.dimension is None:
+                self.path.mkdir(parents=True, exist_ok=True)
+                self.dimension = values.shape[1]
+            elif values.shape[1] != self.dimension:
+                raise ValueError(f"Vector dimension {values.shape[1]} does not match collection dimension {self.dimension}")
+            self._grow(self.count + len(ids))
+
+            start = self.count
+            self.vectors[start:start + len(ids)] = values
+            self.alive[start:start + len(ids)] = 1
+            with open(self.path / "records.jsonl", "ab") as f:
+                offset = f.tell()
+                for row, (vector_id, metadata) in enumerate(zip(ids, metadatas), start):
+                    line = (json.dumps({"id": vector_id, "metadata": metadata}) + "\n").encode()
+                    f.write(line)
+                    self.ids.append(vector_id)
+                    self.offsets.append(offset)
+                    offset += len(line)
+                    if vector_id in self.rows:
+                        self.alive[self.rows[vector_id]] = 0
+                    self.rows[vector_id] = row
+            self.count += len(ids)
+
+            if self.graph is not None:
+                for row in range(start, self.count):
+                    if self.alive[row]:
+                        self.graph.insert(self.vectors, row)
+            elif self.live >= self.hnsw_min_vectors:
+                self._build_graph()
+            self.flush()
+
+    def delete(self, ids: list[str]) -> int:
+        with self.lock:
+            rows = [self.rows.pop(vector_id) for vector_id in ids if vector_id in self.rows]
+            if rows:
+                self.alive[rows] = 0
+                self.flush()
+            return len(rows)
+
+    def needs_compaction(self) -> bool:
+        dead = self.count - self.live
+        return dead >= COMPACT_MIN_DEAD and dead > self.live
+
+    def records(self, rows: list[int]) -> list[dict]:
+        found = []
+        with open(self.path / "records.jsonl", "rb") as f:
+            for row in rows:
+                f.seek(self.offsets[row])
+                found.append(json.loads(f.readline())["metadata"])
+        return found
+
+    def search(self, query: list[float], k: int, ef: int) -> list[tuple[float, int]]:
+        with self.lock:
+            if not self.live:
+                return []
+            q = _normalise(np.asarray(query, dtype=np.float32))
+            if self.graph is not None:
+                hits = self.graph.search(self.vectors, q, max(ef, k))
+                return [(score, row) for score, row in hits if self.alive[row]][:k]
+
+            scores = self.vectors[:self.count] @ q
+            scores[self.alive[:self.count] == 0] = -np.inf
+            k = min(k, self.live)
+            top = np.argpartition(-scores, k - 1)[:k]
+            top = top[np.argsort(-scores[top])]
+            return [(float(scores[row]), int(row)) for row in top]
+
+    def close(self):
+        """Flush and unmap; the object then behaves as an empty collection."""
+        with self.lock:
+            if self.vectors is not None:
+                self.flush()
+            self._reset()
+
+    def reopen(self):
+        with self.lock:
+            self._reset()
+            self._load()
+
+
+class LocalVectorStore(VectorBackend):
+    """Vector store kept in memory-mapped files on local disk."""
+
+    _collections: dict[Path, _Collection] = {}
+    _lock = threading.Lock()
+
+    def __init__(self, embeddings: Embeddings = None, dimension: int = None, path: str = None):
+        super().__init__(embeddings, dimension)
+        settings = get_settings()
+        self._root = Path(path or settings.local_vector_path)
+        self._hnsw_min_vectors = settings.local_hnsw_min_vectors
+        self._hnsw_m = settings.local_hnsw_m
+        self._ef_construction = settings.local_hnsw_ef_construction
+        self._ef_search = settings.local_hnsw_ef_search
+
+    def _collection_path(self, collection_name: str) -> Path:
+        return self._root / re.sub(r"[^A-Za-z0-9_.-]", "_", collection_name)
+
+    def _collection(self, collection_name: str, create: bool = False) -> _Collection:
+        """Open a collection once per process; None if it does not exist and create is False."""
+        path = self._collection_path(collection_name)
+        with self._lock:
+            collection = self._collections.get(path)
+            if collection is None and (create or (path / "meta.json").exists()):
+                collection = _Collection(path, self._hnsw_min_vectors, self._hnsw_m, self._ef_construction)
+                self._collections[path] = collection
+            return collection
+
+    def _compact(self, collection_name: str, collection: _Collection):
+        """Rewrite a collection without its dead rows."""
+        with collection.lock:
+            if not collection.needs_compaction():
+                return
+            rows = sorted(collection.rows.values())
+            tmp_path = collection.path.with_name(collection.path.name + ".compact")
+            shutil.rmtree(tmp_path, ignore_errors=True)
+            compacted = _Collection(tmp_path, self._hnsw_min_vectors, self._hnsw_m, self._ef_construction)
+            for start in range(0, len(rows), INITIAL_CAPACITY):
+                batch = rows[start:start + INITIAL_CAPACITY]
+                compacted.upsert(
+                    [collection.ids[row] for row in batch],
+                    collection.vectors[batch],
+                    collection.records(batch)
+                )
+            compacted.close()
+            collection.close()
+            shutil.rmtree(collection.path)
+            if tmp_path.exists():
+                os.replace(tmp_path, collection.path)
+            # Reloaded in place, so threads holding this object see the new files.
+            collection.reopen()
+
+    def upsert_vectors(
+        self,
+        collection_name: str,
+        ids: list[str],
+        vectors: list[list[float]],
+        metadatas: list[dict]
+    ) -> list[str]:
+        """Upsert precomputed embeddings into a collection."""
+        if not ids:
+            return []
+        self._collection(collection_name, create=True).upsert(ids, vectors, metadatas)
+        retrieval_cache.invalidate_collection(collection_name)
+        return ids
+
+    def list_ids(self, collection_name: str) -> list[str]:
+        """List every vector id in a collection."""
+        collection = self._collection(collection_name)
+        if collection is None:
+            return []
+        with collection.lock:
+            return list(collection.rows)
+
+    def fetch_vectors(self, collection_name: str, ids: list[str], batch_size: int = 100) -> dict:
+        """
+        Fetch stored vectors by id.
+
+        Returns:
+            Mapping of id -> (values, metadata) for the ids that exist
+        """
+        collection = self._collection(collection_name)
+        if collection is None:
+            return {}
+        with collection.lock:
+            found = [(vector_id, collection.rows[vector_id]) for vector_id in ids if vector_id in collection.rows]
+            rows = [row for _, row in found]
+            metadatas = collection.records(rows)
+            return {
+                vector_id: (collection.vectors[row].tolist(), metadata)
+                for (vector_id, row), metadata in zip(found, metadatas)
+            }
+
+    def delete_vectors(self, collection_name: str, ids: list[str], batch_size: int = 1000):
+        """Delete vectors by id from a collection."""
+        collection = self._collection(collection_name)
+        if collection is None or not ids:
+            return
+        collection.delete(ids)
+        if collection.needs_compaction():
+            self._compact(collection_name, collection)
+        retrieval_cache.invalidate_collection(collection_name)
+
+    def delete_collection(self, collection_name: str, embeddings: Embeddings = None):
+        """Delete a collection and its files."""
+        path = self._collection_path(collection_name)
+        with self._lock:
+            collection = self._collections.pop(path, None)
+        if collection is not None:
+            collection.close()
+        shutil.rmtree(path, ignore_errors=True)
+        retrieval_cache.invalidate_collection(collection_name)
+
+    def collection_exists(self, collection_name: str) -> bool:
+        """Check if a collection exists and has documents."""
+        collection = self._collection(collection_name)
+        return collection is not None and collection.live > 0
+
+    def search_rows(self, collection_name: str, embedding: list[float], k: int = 5) -> list[tuple[float, str]]:
+        """
+        Return the k nearest vector ids with their cosine similarity.
+
+        Exact below LOCAL_HNSW_MIN_VECTORS live vectors, HNSW above.
+        """
+        collection = self._collection(collection_name)
+        if collection is None:
+            return []
+        return [(score, collection.ids[row]) for score, row in collection.search(embedding, k, self._ef_search)]
+
+    def similarity_search_by_vector_with_score(
+        self,
+        collection_name: str,
+        embedding: list[float],
+        k: int = 5
+    ) -> list[tuple[Document, float]]:
+        """Return the k documents closest to an embedding with their cosine similarity."""
+        collection = self._collection(collection_name)
+        if collection is None:
+            return []
+        with collection.lock:
+            hits = collection.search(embedding, k, self._ef_search)
+            metadatas = collection.records([row for _, row in hits])
+        docs = []
+        for (score, _), metadata in zip(hits, metadatas):
+            metadata = dict(metadata)
+            text = metadata.pop(TEXT_KEY, "")
+            docs.append((Document(page_content=text, metadata=metadata), score))
+        return docs
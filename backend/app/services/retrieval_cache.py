@@ -0,0 +1,171 @@
+"""
+Caches for knowledge-base retrieval.
+
+Query embeddings are cached by (embedding model, normalized query text) and
+search results by (collection, query embedding, k). Both live in bounded
+in-memory LRUs, optionally backed by a SQLite file so they survive restarts
+and are shared between workers on the same host.
+"""
+import hashlib
+import json
+import re
+import sqlite3
+from array import array
+from collections import defaultdict
+from threading import Lock
+from typing import Optional
+
+from langchain_core.documents import Document
+from langchain_core.embeddings import Embeddings
+
+from app.core.cache import LRUCache
+from app.core.config import get_settings
+
+
+def normalize_query(query: str) -> str:
+    return re.sub(r"\s+", " ", query).strip().lower()
+
+
+def _embedding_digest(embedding: list[float]) -> str:
+    return hashlib.sha256(array("f", embedding).tobytes()).hexdigest()
+
+
+class _DiskStore:
+    """SQLite-backed key/value store used as the optional second cache tier."""
+
+    def __init__(self, path: str):
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._lock = Lock()
+        with self._lock:
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS entries ("
+                "kind TEXT NOT NULL, key TEXT NOT NULL, collection TEXT, value TEXT NOT NULL, "
+                "PRIMARY KEY (kind, key))"
+            )
+            self._conn.execute("CREATE INDEX IF NOT EXISTS entries_collection ON entries (collection)")
+            self._conn.commit()
+
+    def get(self, kind: str, key: str) -> Optional[str]:
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT value FROM entries WHERE kind = ? AND key = ?", (kind, key)
+            ).fetchone()
+        return row[0] if row else None
+
+    def set(self, kind: str, key: str, value: str, collection: str = None):
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO entries (kind, key, collection, value) VALUES (?, ?, ?, ?)",
+                (kind, key, collection, value)
+            )
+            self._conn.commit()
+
+    def delete_collection(self, collection: str):
+        with self._lock:
+            self._conn.execute("DELETE FROM entries WHERE collection = ?", (collection,))
+            self._conn.commit()
+
+
+class RetrievalCache:
+    """Query-embedding and search-result caches with hit/miss counters."""
+
+    def __init__(self, maxsize: int = 1024, path: str = None):
+        self._embeddings = LRUCache(maxsize=maxsize)
+        self._results = LRUCache(maxsize=maxsize)
+        self._disk = _DiskStore(path) if path else None
+        self._keys_by_collection: dict[str, set] = defaultdict(set)
+        self._generations: dict[str, int] = defaultdict(int)
+        self._lock = Lock()
+        self._counters = {
+            "embeddings": {"hits": 0, "misses": 0},
+            "results": {"hits": 0, "misses": 0},
+        }
+
+    def _lookup(self, kind: str, memory: LRUCache, key: str):
+        value = memory.get(key)
+        if value is None and self._disk is not None:
+            raw = self._disk.get(kind, key)
+            if raw is not None:
+                value = json.loads(raw)
+                memory.set(key, value)
+        self._counters[kind]["hits" if value is not None else "misses"] += 1
+        return value
+
+    async def aembed_query(self, embeddings: Embeddings, query: str) -> list[float]:
+        """Embed a query, reusing the vector for repeated questions."""
+        model = getattr(embeddings, "model", type(embeddings).__name__)
+        key = hashlib.sha256(f"{model}\0{normalize_query(query)}".encode("utf-8")).hexdigest()
+
+        embedding = self._lookup("embeddings", self._embeddings, key)
+        if embedding is None:
+            embedding = await embeddings.aembed_query(query)
+            self._embeddings.set(key, embedding)
+            if self._disk is not None:
+                self._disk.set("embeddings", key, json.dumps(embedding))
+        return embedding
+
+    def _result_key(self, collection_name: str, embedding: list[float], k: int) -> str:
+        return f"{collection_name}:{_embedding_digest(embedding)}:{k}"
+
+    def generation(self, collection_name: str) -> int:
+        """Token to pass back to set_results so stale searches are not stored."""
+        return self._generations[collection_name]
+
+    def get_results(self, collection_name: str, embedding: list[float], k: int) -> Optional[list[Document]]:
+        key = self._result_key(collection_name, embedding, k)
+        cached = self._lookup("results", self._results, key)
+        if cached is None:
+            return None
+        with self._lock:
+            # Entries promoted from disk must be tracked for invalidation too.
+            self._keys_by_collection[collection_name].add(key)
+        return [Document(page_content=doc["page_content"], metadata=dict(doc["metadata"])) for doc in cached]
+
+    def set_results(
+        self,
+        collection_name: str,
+        embedding: list[float],
+        k: int,
+        documents: list[Document],
+        generation: int
+    ):
+        key = self._result_key(collection_name, embedding, k)
+        value = [{"page_content": doc.page_content, "metadata": dict(doc.metadata)} for doc in documents]
+        with self._lock:
+            if self._generations[collection_name] != generation:
+                return
+            self._keys_by_collection[collection_name].add(key)
+        self._results.set(key, value)
+        if self._disk is not None:
+            self._disk.set("results", key, json.dumps(value, default=str), collection=collection_name)
+
+    def invalidate_collection(self, collection_name: str):
+        """
+        Drop cached search results for a collection after its vectors change.
+
+        Query embeddings do not depend on collection contents and are kept.
+        """
+        with self._lock:
+            self._generations[collection_name] += 1
+            keys = self._keys_by_collection.pop(collection_name, set())
+        for key in keys:
+            self._results.pop(key)
+        if self._disk is not None:
+            self._disk.delete_collection(collection_name)
+
+    def stats(self) -> dict:
+        return {
+            kind: {
+                **counters,
+                "size": len(self._embeddings if kind == "embeddings" else self._results),
+                "disk": self._disk is not None,
+            }
+            for kind, counters in self._counters.items()
+        }
+
+
+_settings = get_settings()
+retrieval_cache = RetrievalCache(
+    maxsize=_settings.retrieval_cache_size,
+    path=_settings.retrieval_cache_path or None
+)
@@ -0,0 +1,187 @@
+"""
+Short-lived cache of authenticated users for get_current_user.
+
+Every authenticated request resolves the JWT subject to a user row. Users are
+cached by id for USER_CACHE_TTL seconds in a bounded in-memory LRU, or, with
+USER_CACHE_PATH set, in a SQLite file shared by the workers on this host so
+an invalidation reaches all of them.
+
+Entries are plain column snapshots, never session-bound ORM objects. They are
+dropped whenever a commit changes a user's is_active flag or deletes the
+user, and the TTL bounds staleness for changes made outside the ORM.
+
+A lookup that raced an invalidation is not stored (see UserCache.generation).
+That guard is per process: with USER_CACHE_PATH, a worker that loaded a user
+just before another worker invalidated it can still write the old row back,
+and it is served until the TTL expires.
+"""
+import json
+import sqlite3
+import time
+from collections import OrderedDict
+from datetime import datetime
+from threading import Lock
+from typing import Optional
+from uuid import UUID
+
+from sqlalchemy import event, inspect
+from sqlalchemy.orm import Session
+
+from app.core.cache import LRUCache
+from app.core.config import get_settings
+from app.models.database import User
+
+_FIELDS = ("email", "username", "is_active")
+
+
+def _snapshot(user: User) -> dict:
+    return {
+        **{field: getattr(user, field) for field in _FIELDS},
+        "created_at": user.created_at.isoformat() if user.created_at else None,
+    }
+
+
+def _restore(user_id: UUID, snapshot: dict) -> User:
+    """A transient User carrying the cached columns (not attached to any session)."""
+    created_at = snapshot["created_at"]
+    return User(
+        id=user_id,
+        created_at=datetime.fromisoformat(created_at) if created_at else None,
+        **{field: snapshot[field] for field in _FIELDS}
+    )
+
+
+class _SharedStore:
+    """SQLite-backed user entries with wall-clock expiry, shared between processes."""
+
+    def __init__(self, path: str):
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._lock = Lock()
+        with self._lock:
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS users ("
+                "id TEXT PRIMARY KEY, value TEXT NOT NULL, expires_at REAL NOT NULL)"
+            )
+            self._conn.commit()
+
+    def get(self, user_id: str) -> Optional[dict]:
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT value FROM users WHERE id = ? AND expires_at > ?", (user_id, time.time())
+            ).fetchone()
+        return json.loads(row[0]) if row else None
+
+    def set(self, user_id: str, value: dict, ttl: float):
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO users (id, value, expires_at) VALUES (?, ?, ?)",
+                (user_id, json.dumps(value), time.time() + ttl)
+            )
+            self._conn.commit()
+
+    def delete(self, user_id: str):
+        with self._lock:
+            self._conn.execute("DELETE FROM users WHERE id = ?", (user_id,))
+            self._conn.commit()
+
+
+class UserCache:
+    """Users by id with a short TTL, hit/miss counters and invalidation."""
+
+    def __init__(self, maxsize: int = 1024, ttl: float = 30, path: str = None):
+        self.ttl = ttl
+        self._memory = LRUCache(maxsize=maxsize, ttl=ttl)
+        self._shared = _SharedStore(path) if path else None
+        # Invalidation counter, and the counter value of each user's last
+        # invalidation (the maxsize most recent; older ones are folded into
+        # _floor, which then rejects any token older than it).
+        self._invalidations = 0
+        self._invalidated: OrderedDict[str, int] = OrderedDict()
+        self._floor = 0
+        self._maxsize = maxsize
+        self._lock = Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def generation(self, user_id: UUID) -> int:
+        """Token to pass back to set so a user read before an invalidation is not stored."""
+        return self._invalidations
+
+    def get(self, user_id: UUID) -> Optional[User]:
+        if not self.ttl:
+            return None
+        key = str(user_id)
+        snapshot = self._shared.get(key) if self._shared is not None else self._memory.get(key)
+        if snapshot is None:
+            self.misses += 1
+            return None
+        self.hits += 1
+        return _restore(user_id, snapshot)
+
+    def set(self, user: User, generation: int):
+        if not self.ttl:
+            return
+        key = str(user.id)
+        snapshot = _snapshot(user)
+        with self._lock:
+            if generation < self._floor or self._invalidated.get(key, 0) > generation:
+                return
+            if self._shared is not None:
+                self._shared.set(key, snapshot, self.ttl)
+            else:
+                self._memory.set(key, snapshot)
+
+    def invalidate(self, user_id: UUID):
+        key = str(user_id)
+        with self._lock:
+            self._invalidations += 1
+            self._invalidated.pop(key, None)
+            self._invalidated[key] = self._invalidations
+            while len(self._invalidated) > self._maxsize:
+                _, self._floor = self._invalidated.popitem(last=False)
+            self._memory.pop(key)
+            if self._shared is not None:
+                self._shared.delete(key)
+
+    def clear(self):
+        self._memory.clear()
+
+    def stats(self) -> dict:
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "size": len(self._memory),
+            "ttl": self.ttl,
+            "shared": self._shared is not None,
+        }
+
+
+_settings = get_settings()
+user_cache = UserCache(
+    maxsize=_settings.user_cache_size,
+    ttl=_settings.user_cache_ttl,
+    path=_settings.user_cache_path or None
+)
+
+
+@event.listens_for(Session, "after_flush")
+def _collect_changed_users(session, flush_context):
+    """Remember users whose is_active changed or who were deleted in this transaction."""
+    changed = session.info.setdefault("changed_users", set())
+    for user in session.dirty:
+        if isinstance(user, User) and inspect(user).attrs.is_active.history.has_changes():
+            changed.add(user.id)
+    for user in session.deleted:
+        if isinstance(user, User):
+            changed.add(user.id)
+
+
+@event.listens_for(Session, "after_commit")
+def _invalidate_changed_users(session):
+    for user_id in session.info.pop("changed_users", ()):
+        user_cache.invalidate(user_id)
+
+
+@event.listens_for(Session, "after_rollback")
+def _forget_changed_users(session):
+    session.info.pop("changed_users", None)
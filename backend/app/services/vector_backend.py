@@ -0,0 +1,228 @@
+"""
+Vector backend interface.
+
+A backend stores precomputed vectors in named collections (Pinecone
+namespaces) and searches them by vector. Retrieval caching, query embedding
+and the async wrappers are shared; backends only implement the primitives.
+Chunk text is stored in metadata under "text" and returned as page_content,
+matching what PineconeVectorStore reads back. Search results carry their
+similarity under metadata["score"], so results from several collections
+can be merged into one ranking.
+"""
+import asyncio
+import heapq
+import uuid
+from abc import ABC, abstractmethod
+from weakref import WeakKeyDictionary
+
+from langchain_core.documents import Document
+from langchain_core.embeddings import Embeddings
+
+from app.core.config import get_settings
+from app.core.executor import run_blocking
+from app.services.retrieval_cache import retrieval_cache
+
+TEXT_KEY = "text"
+SCORE_KEY = "score"
+
+# One search semaphore per event loop (in practice, one per process)
+_search_slots: WeakKeyDictionary = WeakKeyDictionary()
+
+
+def search_slots() -> asyncio.Semaphore:
+    """
+    Process-wide cap on backend searches in flight, shared by every request.
+
+    Sized to RETRIEVAL_CONCURRENCY but always leaving one blocking-pool
+    thread free for other work.
+    """
+    loop = asyncio.get_running_loop()
+    slots = _search_slots.get(loop)
+    if slots is None:
+        settings = get_settings()
+        slots = asyncio.Semaphore(max(1, min(settings.retrieval_concurrency, settings.blocking_pool_size - 1)))
+        _search_slots[loop] = slots
+    return slots
+
+
+class VectorBackend(ABC):
+    """Base class for vector store backends."""
+
+    def __init__(self, embeddings: Embeddings = None, dimension: int = None):
+        self._embeddings = embeddings
+        self._dimension = dimension
+
+    def _require_embeddings(self, embeddings: Embeddings = None) -> Embeddings:
+        emb = embeddings or self._embeddings
+        if not emb:
+            raise ValueError("Embeddings model required")
+        return emb
+
+    @abstractmethod
+    def upsert_vectors(
+        self,
+        collection_name: str,
+        ids: list[str],
+        vectors: list[list[float]],
+        metadatas: list[dict]
+    ) -> list[str]:
+        """Upsert precomputed embeddings; metadata carries the chunk text under "text"."""
+
+    @abstractmethod
+    def list_ids(self, collection_name: str) -> list[str]:
+        """List every vector id in a collection."""
+
+    @abstractmethod
+    def fetch_vectors(self, collection_name: str, ids: list[str], batch_size: int = 100) -> dict:
+        """Fetch stored vectors by id, as id -> (values, metadata) for the ids that exist."""
+
+    @abstractmethod
+    def delete_vectors(self, collection_name: str, ids: list[str], batch_size: int = 1000):
+        """Delete vectors by id from a collection."""
+
+    @abstractmethod
+    def delete_collection(self, collection_name: str, embeddings: Embeddings = None):
+        """Delete a collection and every vector in it."""
+
+    @abstractmethod
+    def collection_exists(self, collection_name: str) -> bool:
+        """Check if a collection exists and has documents."""
+
+    @abstractmethod
+    def similarity_search_by_vector_with_score(
+        self,
+        collection_name: str,
+        embedding: list[float],
+        k: int = 5
+    ) -> list[tuple[Document, float]]:
+        """Return the k documents closest to an embedding with their similarity, best first."""
+
+    def similarity_search_by_vector(
+        self,
+        collection_name: str,
+        embedding: list[float],
+        k: int = 5
+    ) -> list[Document]:
+        """Return the k documents closest to an embedding, score in metadata["score"]."""
+        # New documents: the backend's may be shared (e.g. with the retrieval cache).
+        return [
+            Document(page_content=doc.page_content, metadata={**doc.metadata, SCORE_KEY: score})
+            for doc, score in self.similarity_search_by_vector_with_score(collection_name, embedding, k)
+        ]
+
+    def add_documents(
+        self,
+        collection_name: str,
+        documents: list[Document],
+        embeddings: Embeddings = None
+    ) -> list[str]:
+        """Embed and add documents to a collection."""
+        emb = self._require_embeddings(embeddings)
+        vectors = emb.embed_documents([doc.page_content for doc in documents])
+        ids = [str(uuid.uuid4()) for _ in documents]
+        metadatas = [{**doc.metadata, TEXT_KEY: doc.page_content} for doc in documents]
+        return self.upsert_vectors(collection_name, ids, vectors, metadatas)
+
+    def similarity_search(
+        self,
+        collection_name: str,
+        query: str,
+        embeddings: Embeddings = None,
+        k: int = 5
+    ) -> list[Document]:
+        """Search for similar documents."""
+        emb = self._require_embeddings(embeddings)
+        return self.similarity_search_by_vector(collection_name, emb.embed_query(query), k=k)
+
+    async def asimilarity_search(
+        self,
+        collection_name: str,
+        query: str,
+        embeddings: Embeddings = None,
+        k: int = 5
+    ) -> list[Document]:
+        """
+        Search for similar documents without blocking the event loop.
+
+        Query embeddings and results are served from the retrieval cache when
+        the same question is asked again against an unchanged collection.
+        """
+        emb = self._require_embeddings(embeddings)
+        query_embedding = await retrieval_cache.aembed_query(emb, query)
+        return await self._asearch_by_vector(collection_name, query_embedding, k)
+
+    async def _asearch_by_vector(
+        self,
+        collection_name: str,
+        embedding: list[float],
+        k: int
+    ) -> list[Document]:
+        cached = retrieval_cache.get_results(collection_name, embedding, k)
+        if cached is not None:
+            return cached
+
+        generation = retrieval_cache.generation(collection_name)
+        async with search_slots():
+            docs = await run_blocking(self.similarity_search_by_vector, collection_name, embedding, k)
+        retrieval_cache.set_results(collection_name, embedding, k, docs, generation)
+        return docs
+
+    async def asearch_collections(
+        self,
+        collection_names: list[str],
+        query: str,
+        embeddings: Embeddings = None,
+        k: int = 5,
+        timeout: float = None
+    ) -> tuple[list[Document], list[str]]:
+        """
+        Search several collections concurrently and merge them into one top-k.
+
+        The query is embedded once. Collections that have not answered by
+        the deadline (or fail) are dropped rather than holding up the rest.
+        At most RETRIEVAL_CONCURRENCY searches run at once across all
+        requests (see search_slots): a search past
+        the deadline keeps its pool thread until the backend returns, while
+        one still waiting for a slot is cancelled before it takes a thread.
+
+        Args:
+            collection_names: Collections to search
+            query: Query text
+            embeddings: Embeddings model
+            k: Number of documents to return overall
+            timeout: Seconds to wait for the slowest collection, None to wait for all
+
+        Returns:
+            Tuple of (best k documents by score, names of dropped collections)
+        """
+        emb = self._require_embeddings(embeddings)
+        query_embedding = await retrieval_cache.aembed_query(emb, query)
+        tasks = {
+            asyncio.create_task(self._asearch_by_vector(name, query_embedding, k)): name
+            for name in dict.fromkeys(collection_names)
+        }
+        if not tasks:
+            return [], []
+        done, pending = await asyncio.wait(tasks, timeout=timeout)
+        for task in pending:
+            task.cancel()
+
+        dropped = [tasks[task] for task in pending]
+        candidates = []
+        for task in done:
+            if task.exception() is not None:
+                print(f"DEBUG: Search of collection '{tasks[task]}' failed: {task.exception()}")
+                dropped.append(tasks[task])
+                continue
+            candidates.extend(task.result())
+        if pending:
+            print(f"DEBUG: Dropped {len(pending)} collection(s) past the {timeout}s retrieval deadline")
+        return heapq.nlargest(k, candidates, key=lambda doc: doc.metadata.get(SCORE_KEY, 0.0)), dropped
+
+    async def adelete_collection(self, collection_name: str):
+        """Async variant of delete_collection, run in the blocking-IO pool."""
+        await run_blocking(self.delete_collection, collection_name)
+
+    async def acollection_exists(self, collection_name: str) -> bool:
+        """Async variant of collection_exists, run in the blocking-IO pool."""
+        return await run_blocking(self.collection_exists, collection_name)
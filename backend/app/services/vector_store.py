@@ -2,34 +2,66 @@ from pinecone import Pinecone, ServerlessSpec
 from langchain_pinecone import PineconeVectorStore
 from langchain_core.documents import Document
 from langchain_core.embeddings import Embeddings
+from app.core.cache import LRUCache
 from app.core.config import get_settings
+from app.services.client_pool import client_registry
+from app.services.local_vector_store import LocalVectorStore
+from app.services.retrieval_cache import retrieval_cache
+from app.services.vector_backend import VectorBackend
 import time
 
 
-class VectorStore:
+class VectorStore(VectorBackend):
     """Vector store using Pinecone cloud service."""
     
+    # Control-plane metadata shared by every instance in the process:
+    # index name -> exists, and (index name, namespace) -> vector count.
+    # Writes from this process update the counts directly; the TTL bounds
+    # staleness from writes made elsewhere.
+    _index_cache = LRUCache(maxsize=16, ttl=get_settings().vector_metadata_ttl)
+    _namespace_cache = LRUCache(maxsize=4096, ttl=get_settings().vector_metadata_ttl)
+    
     def __init__(self, embeddings: Embeddings = None, dimension: int = None):
+        super().__init__(embeddings, dimension)
         settings = get_settings()
-        self._embeddings = embeddings
-        self._dimension = dimension
-        self._pc = None
         self._index_name = settings.pinecone_index_name
         self._api_key = settings.pinecone_api_key
         print(f"DEBUG: VectorStore init. Pinecone Index: {self._index_name}")
         print(f"DEBUG: VectorStore init. Pinecone Key Present: {bool(self._api_key)}")
         self._environment = settings.pinecone_environment
         
-    def _get_pinecone_client(self):
-        """Initialize Pinecone client."""
-        if not self._pc:
-            if not self._api_key:
-                print("DEBUG: Pinecone API Key is MISSING in _get_pinecone_client")
-            self._pc = Pinecone(api_key=self._api_key)
-        return self._pc
+    def _get_pinecone_client(self) -> Pinecone:
+        """Borrow the shared Pinecone client."""
+        if not self._api_key:
+            print("DEBUG: Pinecone API Key is MISSING in _get_pinecone_client")
+        return client_registry.get_pinecone(self._api_key)
+    
+    def _get_index(self):
+        """Borrow the shared handle to the Pinecone index."""
+        return client_registry.get_pinecone_index(self._api_key, self._index_name)
+    
+    def _index_exists(self) -> bool:
+        """Check whether the Pinecone index exists, using the metadata cache."""
+        exists = self._index_cache.get(self._index_name)
+        if exists is None:
+            pc = self._get_pinecone_client()
+            exists = self._index_name in [index.name for index in pc.list_indexes()]
+            self._index_cache.set(self._index_name, exists)
+        return exists
+    
+    def _refresh_namespace_counts(self) -> dict:
+        """Fetch vector counts for every namespace with one describe_index_stats call."""
+        stats = self._get_index().describe_index_stats()
+        namespaces = stats.get('namespaces', {})
+        for name, info in namespaces.items():
+            self._namespace_cache.set((self._index_name, name), info.get('vector_count', 0))
+        return namespaces
     
     def _ensure_index_exists(self, dimension: int):
         """Ensure the Pinecone index exists."""
+        if self._index_exists():
+            return
+        
         pc = self._get_pinecone_client()
         
         existing_indexes = [index.name for index in pc.list_indexes()]
@@ -46,6 +78,7 @@ class VectorStore:
             )
             while not pc.describe_index(self._index_name).status['ready']:
                 time.sleep(1)
+        self._index_cache.set(self._index_name, True)
     
     def get_or_create_collection(
         self, 
@@ -71,10 +104,9 @@ class VectorStore:
         self._ensure_index_exists(dimension)
         
         return PineconeVectorStore(
-            index_name=self._index_name,
+            index=self._get_index(),
             embedding=emb,
-            namespace=collection_name,
-            pinecone_api_key=self._api_key
+            namespace=collection_name
         )
     
     def add_documents(
@@ -85,7 +117,71 @@ class VectorStore:
     ) -> list[str]:
         """Add documents to a collection (namespace)."""
         vector_store = self.get_or_create_collection(collection_name, embeddings)
-        return vector_store.add_documents(documents)
+        ids = vector_store.add_documents(documents)
+        key = (self._index_name, collection_name)
+        self._namespace_cache.set(key, (self._namespace_cache.get(key) or 0) + len(ids))
+        retrieval_cache.invalidate_collection(collection_name)
+        return ids
+    
+    def upsert_vectors(
+        self,
+        collection_name: str,
+        ids: list[str],
+        vectors: list[list[float]],
+        metadatas: list[dict]
+    ) -> list[str]:
+        """
+        Upsert precomputed embeddings into a collection (namespace).
+        
+        Metadata must carry the chunk text under "text", matching the layout
+        PineconeVectorStore reads back in similarity_search.
+        """
+        if not ids:
+            return []
+        self._ensure_index_exists(self._dimension or len(vectors[0]))
+        self._get_index().upsert(
+            vectors=list(zip(ids, vectors, metadatas)),
+            namespace=collection_name
+        )
+        key = (self._index_name, collection_name)
+        self._namespace_cache.set(key, (self._namespace_cache.get(key) or 0) + len(ids))
+        retrieval_cache.invalidate_collection(collection_name)
+        return ids
+    
+    def list_ids(self, collection_name: str) -> list[str]:
+        """List every vector id in a collection (namespace)."""
+        ids = []
+        for page in self._get_index().list(namespace=collection_name):
+            ids.extend(page)
+        return ids
+    
+    def fetch_vectors(self, collection_name: str, ids: list[str], batch_size: int = 100) -> dict:
+        """
+        Fetch stored vectors by id.
+        
+        Returns:
+            Mapping of id -> (values, metadata) for the ids that exist
+        """
+        index = self._get_index()
+        found = {}
+        for start in range(0, len(ids), batch_size):
+            response = index.fetch(ids=ids[start:start + batch_size], namespace=collection_name)
+            for vector_id, vector in response.vectors.items():
+                found[vector_id] = (vector.values, vector.metadata or {})
+        return found
+    
+    def delete_vectors(self, collection_name: str, ids: list[str], batch_size: int = 1000):
+        """Delete vectors by id from a collection (namespace)."""
+        if not ids:
+            return
+        index = self._get_index()
+        for start in range(0, len(ids), batch_size):
+            index.delete(ids=ids[start:start + batch_size], namespace=collection_name)
+        key = (self._index_name, collection_name)
+        count = self._namespace_cache.get(key)
+        if count is not None:
+            self._namespace_cache.set(key, max(0, count - len(ids)))
+        retrieval_cache.invalidate_collection(collection_name)
     
     def similarity_search(
         self,
@@ -98,6 +194,16 @@ class VectorStore:
         vector_store = self.get_or_create_collection(collection_name, embeddings)
         return vector_store.similarity_search(query, k=k)
     
+    def similarity_search_by_vector_with_score(
+        self,
+        collection_name: str,
+        embedding: list[float],
+        k: int = 5
+    ) -> list[tuple[Document, float]]:
+        """Search for the documents closest to an embedding, with cosine similarity."""
+        vector_store = self.get_or_create_collection(collection_name)
+        return vector_store.similarity_search_by_vector_with_score(embedding, k=k)
+    
     def similarity_search_with_score(
         self,
         collection_name: str,
@@ -122,24 +228,27 @@ class VectorStore:
     def delete_collection(self, collection_name: str, embeddings: Embeddings = None):
         """Delete a collection (namespace) by deleting all vectors in it."""
         try:
-            pc = self._get_pinecone_client()
-            index = pc.Index(self._index_name)
+            index = self._get_index()
             index.delete(delete_all=True, namespace=collection_name)
+            self._namespace_cache.set((self._index_name, collection_name), 0)
         except Exception:
             pass
+        retrieval_cache.invalidate_collection(collection_name)
     
     def collection_exists(self, collection_name: str) -> bool:
         """Check if a collection (namespace) exists and has documents."""
         try:
-            pc = self._get_pinecone_client()
-            
-            existing_indexes = [index.name for index in pc.list_indexes()]
-            if self._index_name not in existing_indexes:
+            if not self._index_exists():
                 return False
             
-            index = pc.Index(self._index_name)
-            stats = index.describe_index_stats()
-            namespaces = stats.get('namespaces', {})
+            key = (self._index_name, collection_name)
+            vector_count = self._namespace_cache.get(key)
+            if vector_count is not None:
+                return vector_count > 0
+            
+            namespaces = self._refresh_namespace_counts()
+            if collection_name not in namespaces:
+                self._namespace_cache.set(key, 0)
             
             exists = collection_name in namespaces and namespaces[collection_name].get('vector_count', 0) > 0
             
@@ -153,3 +262,19 @@ class VectorStore:
         except Exception as e:
             print(f"DEBUG: Error checking collection existence: {str(e)}")
             return False
+
+
+def get_vector_store(embeddings: Embeddings = None, dimension: int = None) -> VectorBackend:
+    """
+    Create the vector store for the configured backend.
+    
+    Args:
+        embeddings: Embeddings model
+        dimension: Embedding dimension, if known
+    
+    Returns:
+        Pinecone VectorStore, or LocalVectorStore when VECTOR_BACKEND=local
+    """
+    if get_settings().vector_backend == "local":
+        return LocalVectorStore(embeddings=embeddings, dimension=dimension)
+    return VectorStore(embeddings=embeddings, dimension=dimension)
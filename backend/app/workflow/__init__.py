@@ -1,5 +1,6 @@
 # Workflow package
 from app.workflow.state import WorkflowState
 from app.workflow.graph import WorkflowGraphBuilder
+from app.workflow.topology import WorkflowCycleError
 
-__all__ = ["WorkflowState", "WorkflowGraphBuilder"]
+__all__ = ["WorkflowState", "WorkflowGraphBuilder", "WorkflowCycleError"]
@@ -0,0 +1,113 @@
+"""
+Cache of compiled LangGraph workflows keyed by topology.
+
+Node configuration travels through ``WorkflowState`` at run time, so a compiled
+graph only depends on the node ids/types, the edges between them and which LLM
+Engines search the web (those get a parallel web search node).
+"""
+import hashlib
+import json
+from threading import Lock
+from typing import Callable, Optional
+
+from app.core.cache import LRUCache
+from app.core.config import get_settings
+
+
+def web_search_engines(nodes: list[dict]) -> set[str]:
+    """Ids of the LLM Engine nodes configured to use web search."""
+    return {
+        node["id"] for node in nodes
+        if node["type"] == "llmEngine"
+        and ((node.get("data") or {}).get("config") or {}).get("use_web_search")
+    }
+
+
+def topology_hash(nodes: list[dict], edges: list[dict]) -> str:
+    """Canonical hash of a workflow's node ids/types, edges and web search engines."""
+    canonical = {
+        "nodes": sorted((node["id"], node["type"]) for node in nodes),
+        "edges": sorted((edge["source"], edge["target"]) for edge in edges),
+        "web_search": sorted(web_search_engines(nodes)),
+    }
+    payload = json.dumps(canonical, separators=(",", ":"))
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+class CompiledGraphCache:
+    """
+    Bounded LRU of compiled graphs with per-workflow invalidation.
+
+    The workflow -> topology key index only holds keys that are still cached:
+    evicted keys are dropped from it, so it is bounded by maxsize as well.
+    """
+
+    def __init__(self, maxsize: int = 128):
+        self._graphs = LRUCache(maxsize=maxsize, on_evict=self._forget)
+        self._keys_by_workflow: dict[str, set[str]] = {}
+        self._workflows_by_key: dict[str, set[str]] = {}
+        self._lock = Lock()
+
+    def get_or_build(
+        self,
+        nodes: list[dict],
+        edges: list[dict],
+        build: Callable,
+        workflow_id: Optional[str] = None
+    ):
+        """
+        Return the compiled graph for this topology, building it on a miss.
+
+        Args:
+            nodes: Workflow nodes from frontend
+            edges: Workflow edges from frontend
+            build: Callable taking (nodes, edges) and returning a compiled graph
+            workflow_id: Saved workflow the graph belongs to, used for invalidation
+        """
+        key = topology_hash(nodes, edges)
+        graph = self._graphs.get(key)
+        if graph is None:
+            graph = build(nodes, edges)
+            self._graphs.set(key, graph)
+
+        if workflow_id:
+            with self._lock:
+                # Skip a key evicted again before it could be recorded
+                if key in self._graphs:
+                    self._keys_by_workflow.setdefault(str(workflow_id), set()).add(key)
+                    self._workflows_by_key.setdefault(key, set()).add(str(workflow_id))
+        return graph
+
+    def _unlink(self, key: str) -> None:
+        """Remove a key from the workflow index; the caller holds the lock."""
+        for workflow_id in self._workflows_by_key.pop(key, set()):
+            keys = self._keys_by_workflow.get(workflow_id)
+            if keys is not None:
+                keys.discard(key)
+                if not keys:
+                    del self._keys_by_workflow[workflow_id]
+
+    def _forget(self, key: str) -> None:
+        with self._lock:
+            self._unlink(key)
+
+    def invalidate(self, workflow_id) -> None:
+        """Drop every compiled graph recorded for a workflow."""
+        with self._lock:
+            keys = self._keys_by_workflow.pop(str(workflow_id), set())
+            for key in keys:
+                self._unlink(key)
+        for key in keys:
+            self._graphs.pop(key)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._keys_by_workflow.clear()
+            self._workflows_by_key.clear()
+        self._graphs.clear()
+
+    def stats(self) -> dict:
+        return self._graphs.stats()
+
+
+graph_cache = CompiledGraphCache(maxsize=get_settings().graph_cache_size)
@@ -1,8 +1,14 @@
-from langgraph.graph import StateGraph, END
+import inspect
+from typing import AsyncIterator
+
+from langgraph.graph import StateGraph, START, END
 from app.workflow.state import WorkflowState
+from app.workflow.cache import graph_cache, web_search_engines
+from app.workflow.topology import transitive_reduction
 from app.workflow.nodes import (
     user_query_node,
     knowledge_base_node,
+    web_search_node,
     llm_engine_node,
     output_node
 )
@@ -18,6 +24,10 @@ class WorkflowGraphBuilder:
         "output": output_node
     }
     
+    # Nodes that only read the query and can run concurrently with each other.
+    WEB_SEARCH_TYPE = "webSearch"
+    RETRIEVAL_TYPES = {"knowledgeBase", WEB_SEARCH_TYPE}
+    
     def build_from_config(self, nodes: list[dict], edges: list[dict]) -> StateGraph:
         """
         Build a LangGraph from frontend workflow configuration.
@@ -58,32 +68,52 @@ class WorkflowGraphBuilder:
         if not entry_node:
             entry_node = nodes[0]["id"] if nodes else None
         
-        active_nodes = []
         print(f"\n=== BUILDING WORKFLOW GRAPH ===")
         print(f"Node types found: {node_types}")
-        for node_id, node_type in node_types.items():
-            if node_type in self.NODE_MAPPING:
-                graph.add_node(node_id, self.NODE_MAPPING[node_type])
-                active_nodes.append(node_id)
-                print(f"Added node: {node_id} (type: {node_type})")
-        
-        if entry_node:
-            print(f"Entry node: {entry_node}")
-            graph.set_entry_point(entry_node)
         
         pruned_adj = self._prune_redundant_edges(adjacency)
         print(f"Original adjacency: {adjacency}")
         print(f"Pruned adjacency: {pruned_adj}")
         
-        for source, targets in pruned_adj.items():
+        active_adj = self._reachable_adjacency(entry_node, pruned_adj, node_types)
+        dropped = [node_id for node_id in node_types if node_id not in active_adj]
+        if dropped:
+            print(f"DEBUG: Skipping nodes not reachable from entry node {entry_node}: {dropped}")
+        web_search_nodes = self._add_web_search_nodes(active_adj, node_types, web_search_engines(nodes))
+        fanned_adj = transitive_reduction(self._fan_out_retrieval(active_adj, node_types))
+        print(f"Parallel adjacency: {fanned_adj}")
+        
+        predecessors = {node_id: [] for node_id in fanned_adj}
+        for source, targets in fanned_adj.items():
             for target in targets:
-                if source in active_nodes and target in active_nodes:
-                    graph.add_edge(source, target)
-                    print(f"Added edge: {source} -> {target}")
+                predecessors[target].append(source)
         
-        all_sources = set(adjacency.keys())
-        for node_id in active_nodes:
-            if node_id not in all_sources:
+        for node_id in fanned_adj:
+            node_type = node_types[node_id]
+            if node_type == self.WEB_SEARCH_TYPE:
+                node_fn = self._bind_node(web_search_node, node_id, llm_node_id=web_search_nodes[node_id])
+            elif node_type == "llmEngine":
+                inline_web_search = self._web_search_id(node_id) not in fanned_adj
+                node_fn = self._bind_node(llm_engine_node, node_id, inline_web_search=inline_web_search)
+            else:
+                node_fn = self._bind_node(self.NODE_MAPPING[node_type], node_id)
+            graph.add_node(node_id, node_fn)
+            print(f"Added node: {node_id} (type: {node_type})")
+        
+        for node_id, sources in predecessors.items():
+            if not sources:
+                graph.add_edge(START, node_id)
+                print(f"Added entry edge: START -> {node_id}")
+            elif len(sources) == 1:
+                graph.add_edge(sources[0], node_id)
+                print(f"Added edge: {sources[0]} -> {node_id}")
+            else:
+                # Join edge: wait for every parallel branch before running.
+                graph.add_edge(sources, node_id)
+                print(f"Added join edge: {sources} -> {node_id}")
+        
+        for node_id, targets in fanned_adj.items():
+            if not targets:
                 graph.add_edge(node_id, END)
                 print(f"Added exit edge: {node_id} -> END")
         
@@ -91,6 +121,106 @@ class WorkflowGraphBuilder:
         
         return graph.compile()
     
+    def _reachable_adjacency(self, entry_node: str, adjacency: dict, node_types: dict) -> dict:
+        """Restrict the graph to supported nodes reachable from the entry node."""
+        if node_types.get(entry_node) not in self.NODE_MAPPING:
+            return {}
+        
+        reachable = {entry_node: []}
+        stack = [entry_node]
+        while stack:
+            source = stack.pop()
+            for target in adjacency.get(source, []):
+                if node_types.get(target) not in self.NODE_MAPPING:
+                    continue
+                reachable[source].append(target)
+                if target not in reachable:
+                    reachable[target] = []
+                    stack.append(target)
+        return reachable
+    
+    def _web_search_id(self, llm_node_id: str) -> str:
+        return f"{llm_node_id}__web_search"
+    
+    def _add_web_search_nodes(self, adjacency: dict, node_types: dict, web_search_llms: set) -> dict:
+        """
+        Give every web-searching LLM Engine with upstream nodes a sibling web
+        search node.
+        
+        The search only needs the query, so it can run alongside knowledge base
+        retrieval instead of inside the LLM node. Mutates adjacency/node_types.
+        
+        Returns:
+            Mapping of web search node id to the LLM Engine it feeds
+        """
+        web_search_nodes = {}
+        for node_id in list(adjacency):
+            if node_types[node_id] != "llmEngine" or node_id not in web_search_llms:
+                continue
+            sources = [source for source, targets in adjacency.items() if node_id in targets]
+            if not sources:
+                continue
+            search_id = self._web_search_id(node_id)
+            node_types[search_id] = self.WEB_SEARCH_TYPE
+            adjacency[search_id] = [node_id]
+            for source in sources:
+                adjacency[source].append(search_id)
+            web_search_nodes[search_id] = node_id
+        return web_search_nodes
+    
+    def _fan_out_retrieval(self, adjacency: dict, node_types: dict) -> dict:
+        """
+        Rewire retrieval nodes into parallel branches.
+        
+        Retrieval nodes only read the query, so a chain such as
+        query -> kb1 -> kb2 -> llm becomes query -> {kb1, kb2} -> llm: each
+        retrieval node hangs off its nearest non-retrieval ancestors and feeds
+        its nearest non-retrieval descendants. Their writes are merged by the
+        reducers on WorkflowState.
+        """
+        retrieval = {node_id for node_id in adjacency if node_types[node_id] in self.RETRIEVAL_TYPES}
+        predecessors = {node_id: [] for node_id in adjacency}
+        for source, targets in adjacency.items():
+            for target in targets:
+                predecessors[target].append(source)
+        
+        def anchors(node_id: str, neighbours: dict) -> list[str]:
+            found = []
+            seen = set()
+            stack = list(neighbours[node_id])
+            while stack:
+                current = stack.pop()
+                if current in seen:
+                    continue
+                seen.add(current)
+                if current in retrieval:
+                    stack.extend(neighbours[current])
+                else:
+                    found.append(current)
+            return found
+        
+        fanned = {node_id: [] for node_id in adjacency}
+        for node_id, targets in adjacency.items():
+            if node_id in retrieval:
+                for source in anchors(node_id, predecessors):
+                    fanned[source].append(node_id)
+                fanned[node_id].extend(anchors(node_id, adjacency))
+            else:
+                fanned[node_id].extend(target for target in targets if target not in retrieval)
+        
+        return {node_id: list(dict.fromkeys(targets)) for node_id, targets in fanned.items()}
+    
+    def _bind_node(self, node_fn, node_id: str, **kwargs):
+        """Wrap a node function so it knows its own node id (and extra options)."""
+        if inspect.iscoroutinefunction(node_fn):
+            async def bound(state: WorkflowState) -> dict:
+                return await node_fn(state, node_id=node_id, **kwargs)
+        else:
+            def bound(state: WorkflowState) -> dict:
+                return node_fn(state, node_id=node_id, **kwargs)
+        bound.__name__ = node_fn.__name__
+        return bound
+    
     def _prune_redundant_edges(self, adjacency: dict) -> dict:
         """
         Remove direct edges if an indirect path exists (Transitive Reduction).
@@ -101,45 +231,50 @@ class WorkflowGraphBuilder:
             
         Returns:
             Pruned adjacency dictionary
-        """
-        pruned_adj = {k: list(v) for k, v in adjacency.items()}
-        
-        def has_path(start, end, current_adj):
-            queue = [start]
-            visited = set()
-            
-            while queue:
-                node = queue.pop(0)
-                if node == end:
-                    return True
-                
-                if node in visited:
-                    continue
-                visited.add(node)
-                
-                for neighbor in current_adj.get(node, []):
-                    queue.append(neighbor)
-            return False
 
-        for source in list(adjacency.keys()):
-            for target in list(adjacency[source]):
-                if target in pruned_adj.get(source, []):
-                    pruned_adj[source].remove(target)
-                    
-                    if has_path(source, target, pruned_adj):
-                        print(f"Pruning redundant edge: {source} -> {target}")
-                    else:
-                        pruned_adj[source].append(target)
-        
+        Raises:
+            WorkflowCycleError: If the edges contain a cycle
+        """
+        pruned_adj = transitive_reduction(adjacency)
+        for source, targets in adjacency.items():
+            for target in set(targets) - set(pruned_adj[source]):
+                print(f"Pruning redundant edge: {source} -> {target}")
         return pruned_adj
 
+    def get_compiled(self, nodes: list[dict], edges: list[dict], workflow_id=None):
+        """Return a compiled graph for this topology, reusing a cached one if possible."""
+        return graph_cache.get_or_build(
+            nodes,
+            edges,
+            build=self.build_from_config,
+            workflow_id=workflow_id
+        )
+
+    def _initial_state(self, query: str, node_configs: dict) -> dict:
+        return {
+            "query": query,
+            "node_configs": node_configs,
+            "context": None,
+            "context_chunks": [],
+            "context_tokens": None,
+            "collection_name": None,
+            "llm_response": None,
+            "web_search_results": None,
+            "final_output": None,
+            "workflow_id": None,
+            "active_nodes": [],
+            "error": None,
+            "metadata": {}
+        }
+    
     async def execute(
         self,
         nodes: list[dict],
         edges: list[dict],
         query: str,
-        node_configs: dict
-    ) -> str:
+        node_configs: dict,
+        workflow_id=None
+    ) -> tuple[str, dict]:
         """
         Execute a workflow with a query.
         
@@ -148,25 +283,14 @@ class WorkflowGraphBuilder:
             edges: Workflow edges from frontend
             query: User's query
             node_configs: Configuration for each node
+            workflow_id: Saved workflow id, used to invalidate cached graphs
         
         Returns:
-            Final response string
+            Tuple of (final response string, response metadata from the nodes)
         """
         try:
-            graph = self.build_from_config(nodes, edges)
-            
-            initial_state = {
-                "query": query,
-                "node_configs": node_configs,
-                "context": None,
-                "collection_name": None,
-                "llm_response": None,
-                "web_search_results": None,
-                "final_output": None,
-                "workflow_id": None,
-                "active_nodes": [],
-                "error": None
-            }
+            graph = self.get_compiled(nodes, edges, workflow_id=workflow_id)
+            initial_state = self._initial_state(query, node_configs)
             
             print(f"\n=== Executing workflow graph ===")
             result = await graph.ainvoke(initial_state)
@@ -177,7 +301,8 @@ class WorkflowGraphBuilder:
             print(f"=== End workflow execution ===\n")
             
             final_output = result.get("final_output", "No response generated.")
-            return final_output if final_output else "No response generated."
+            metadata = result.get("metadata") or {}
+            return (final_output if final_output else "No response generated."), metadata
         
         except Exception as e:
             print(f"\n=== Workflow execution exception ===")
@@ -185,4 +310,68 @@ class WorkflowGraphBuilder:
             import traceback
             traceback.print_exc()
             print(f"=== End exception ===\n")
-            return f"Workflow execution error: {str(e)}"
+            return f"Workflow execution error: {str(e)}", {}
+    
+    async def stream(
+        self,
+        nodes: list[dict],
+        edges: list[dict],
+        query: str,
+        node_configs: dict,
+        workflow_id=None
+    ) -> AsyncIterator[dict]:
+        """
+        Execute a workflow and yield progress events as they happen.
+        
+        Events are dicts with an "event" key:
+            node_start / node_end: {"node": node_id}
+            token: {"node": node_id, "content": chunk} for every token of an
+                LLM Engine node (other model calls, e.g. the output node's
+                refine step, are not streamed)
+            done: {"response": final_output, "metadata": {...}}
+        
+        Args:
+            nodes: Workflow nodes from frontend
+            edges: Workflow edges from frontend
+            query: User's query
+            node_configs: Configuration for each node
+            workflow_id: Saved workflow id, used to invalidate cached graphs
+        """
+        final_output = None
+        metadata = {}
+        llm_nodes = {node["id"] for node in nodes if node["type"] == "llmEngine"}
+        try:
+            graph = self.get_compiled(nodes, edges, workflow_id=workflow_id)
+            initial_state = self._initial_state(query, node_configs)
+            
+            async for event in graph.astream_events(initial_state, version="v2"):
+                kind = event["event"]
+                node_id = event.get("metadata", {}).get("langgraph_node")
+                
+                if kind == "on_chat_model_stream":
+                    content = event["data"]["chunk"].content
+                    if content and node_id in llm_nodes:
+                        yield {"event": "token", "node": node_id, "content": content}
+                elif node_id and event["name"] == node_id:
+                    if kind == "on_chain_start":
+                        yield {"event": "node_start", "node": node_id}
+                    elif kind == "on_chain_end":
+                        output = event["data"].get("output")
+                        if isinstance(output, dict):
+                            final_output = output.get("final_output") or final_output
+                            metadata.update(output.get("metadata") or {})
+                        yield {"event": "node_end", "node": node_id}
+        
+        except Exception as e:
+            print(f"\n=== Workflow stream exception ===")
+            print(f"Error: {str(e)}")
+            import traceback
+            traceback.print_exc()
+            print(f"=== End exception ===\n")
+            final_output = f"Workflow execution error: {str(e)}"
+        
+        yield {
+            "event": "done",
+            "response": final_output or "No response generated.",
+            "metadata": metadata
+        }
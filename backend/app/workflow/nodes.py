@@ -1,11 +1,35 @@
 """
 LangGraph workflow nodes using LangChain services.
 """
+import hashlib
+import time
+
+from app.core.cache import LRUCache
+from app.core.config import get_settings
+from app.core.executor import run_blocking
 from app.workflow.state import WorkflowState
-from app.services import EmbeddingService, VectorStore, LLMService, WebSearchService
+from app.services import EmbeddingService, get_vector_store, LLMService, WebSearchService
+from app.services.context_packer import context_budget, pack_context
+from app.services.hybrid_search import hybrid_search
+from app.services.formatting import format_markdown
+
+
+def _node_config(state: WorkflowState, node_type: str, node_id: str = None) -> dict:
+    """Config for a specific node, falling back to the shared per-type config."""
+    node_configs = state.get("node_configs", {})
+    if node_id and node_id in node_configs:
+        return node_configs[node_id]
+    return node_configs.get(node_type, {})
+
+
+async def _search_web(query: str, serpapi_key: str) -> str:
+    """Run a SerpAPI search off the event loop and format it as LLM context."""
+    web_search = WebSearchService(api_key=serpapi_key)
+    results = await run_blocking(web_search.get_search_results, query)
+    return web_search.format_results_as_context(results)
 
 
-def user_query_node(state: WorkflowState) -> dict:
+def user_query_node(state: WorkflowState, node_id: str = None) -> dict:
     """Entry point node - processes the user query."""
     print(f"\n=== USER QUERY NODE ===")
     print(f"Query: {state['query']}")
@@ -13,26 +37,34 @@ def user_query_node(state: WorkflowState) -> dict:
     return {"query": state["query"]}
 
 
-def knowledge_base_node(state: WorkflowState) -> dict:
-    """Knowledge Base node - retrieves relevant context from vector store."""
-    print(f"\n=== KNOWLEDGE BASE NODE ===")
-    node_configs = state.get("node_configs", {})
-    kb_config = node_configs.get("knowledgeBase", {})
+async def knowledge_base_node(state: WorkflowState, node_id: str = None) -> dict:
+    """
+    Knowledge Base node - retrieves relevant context from vector store.
+    
+    Every collection in the config's collection_names (one per document
+    attached to the workflow) is searched concurrently and the hits are
+    merged into a single top-k. Collections slower than the retrieval
+    deadline are left out. The config's retrieval_mode picks vector,
+    lexical or hybrid (BM25 + vector) retrieval, see hybrid_search.
+    """
+    print(f"\n=== KNOWLEDGE BASE NODE ({node_id}) ===")
+    kb_config = _node_config(state, "knowledgeBase", node_id)
     
     collection_name = kb_config.get("collection_name")
+    collection_names = kb_config.get("collection_names") or ([collection_name] if collection_name else [])
     embedding_provider = kb_config.get("embedding_provider", "openai")
     embedding_model = kb_config.get("embedding_model", "text-embedding-3-small")
     api_key = kb_config.get("api_key")
     file_path = kb_config.get("file_path")  # Get file path from config
     
-    print(f"Collection name: {collection_name}")
+    print(f"Collection names: {collection_names}")
     print(f"Embedding provider: {embedding_provider}")
     print(f"Embedding model: {embedding_model}")
     print(f"API key present: {bool(api_key)}")
     print(f"File path: {file_path}")
     print(f"Query: {state['query']}")
     
-    if not collection_name:
+    if not collection_names:
         print(f"No collection name found, returning None context")
         print(f"=== END KNOWLEDGE BASE NODE ===\n")
         return {"context": None}
@@ -46,22 +78,30 @@ def knowledge_base_node(state: WorkflowState) -> dict:
         
         dimension = embedding_service.get_dimension()
         
-        vector_store = VectorStore(
+        vector_store = get_vector_store(
             embeddings=embedding_service.get_embeddings_model(),
             dimension=dimension
         )
         
-        if not vector_store.collection_exists(collection_name):
-            print(f"Collection {collection_name} does not exist.")
-            print(f"=== END KNOWLEDGE BASE NODE ===\n")
-            return {"context": None}
-        
-        docs = vector_store.similarity_search(
-            collection_name=collection_name,
+        start = time.perf_counter()
+        # Missing or empty namespaces simply return no hits, so there is no
+        # separate existence check per collection.
+        docs, retrieval = await hybrid_search(
+            vector_store,
+            collection_names,
             query=state["query"],
             embeddings=embedding_service.get_embeddings_model(),
-            k=5
+            k=5,
+            mode=kb_config.get("retrieval_mode"),
+            timeout=get_settings().retrieval_timeout
         )
+        print(f"Retrieval mode: {retrieval['mode']}")
+        metadata = {
+            "retrieval_mode": retrieval["mode"],
+            "retrieval_collections": len(collection_names),
+            "retrieval_dropped": len(retrieval["dropped"]),
+            "retrieval_ms": round((time.perf_counter() - start) * 1000, 2),
+        }
         
         print(f"Found {len(docs) if docs else 0} documents")
         if docs:
@@ -71,11 +111,12 @@ def knowledge_base_node(state: WorkflowState) -> dict:
             print(f"{context[:500]}...")
             print(f"=============================================")
             print(f"=== END KNOWLEDGE BASE NODE ===\n")
-            return {"context": context}
+            chunks = [{"text": doc.page_content, "score": doc.metadata.get("score")} for doc in docs]
+            return {"context": context, "context_chunks": chunks, "metadata": metadata}
         
         print(f"No documents found, returning None context")
         print(f"=== END KNOWLEDGE BASE NODE ===\n")
-        return {"context": None}
+        return {"context": None, "metadata": metadata}
     
     except Exception as e:
         print(f"ERROR in knowledge base node: {str(e)}")
@@ -85,10 +126,39 @@ def knowledge_base_node(state: WorkflowState) -> dict:
         return {"context": None, "error": str(e)}
 
 
-async def llm_engine_node(state: WorkflowState) -> dict:
-    """LLM Engine node - generates response using configured LLM."""
-    node_configs = state.get("node_configs", {})
-    llm_config = node_configs.get("llmEngine", {})
+async def web_search_node(state: WorkflowState, node_id: str = None, llm_node_id: str = None) -> dict:
+    """Web Search node - fetches web results for an LLM Engine in parallel with retrieval."""
+    llm_config = _node_config(state, "llmEngine", llm_node_id)
+    use_web_search = llm_config.get("use_web_search", False)
+    serpapi_key = llm_config.get("serpapi_key")
+    
+    if not (use_web_search and serpapi_key):
+        return {}
+    
+    print(f"\n=== WEB SEARCH NODE ({node_id}) ===")
+    try:
+        web_context = await _search_web(state["query"], serpapi_key)
+        print(f"Web search results length: {len(web_context)} chars")
+        print(f"=== END WEB SEARCH NODE ===\n")
+        return {"web_search_results": web_context or None}
+    except Exception as e:
+        print(f"ERROR in web search node: {str(e)}")
+        print(f"=== END WEB SEARCH NODE ===\n")
+        return {"error": str(e)}
+
+
+async def llm_engine_node(
+    state: WorkflowState,
+    node_id: str = None,
+    inline_web_search: bool = True
+) -> dict:
+    """
+    LLM Engine node - generates response using configured LLM.
+    
+    When the graph builder schedules a parallel web_search_node for this
+    engine, inline_web_search is False and the results are read from state.
+    """
+    llm_config = _node_config(state, "llmEngine", node_id)
     
     provider = llm_config.get("provider", "openai")
     model = llm_config.get("model", "gpt-4o-mini")
@@ -132,20 +202,27 @@ async def llm_engine_node(state: WorkflowState) -> dict:
         context = state.get("context", "")
         
         web_context = ""
-        if use_web_search and serpapi_key:
+        if not inline_web_search:
+            web_context = state.get("web_search_results") or ""
+        elif use_web_search and serpapi_key:
             print(f"Performing web search...")
-            web_search = WebSearchService(api_key=serpapi_key)
-            results = web_search.get_search_results(state["query"])
-            web_context = web_search.format_results_as_context(results)
+            web_context = await _search_web(state["query"], serpapi_key)
             print(f"Web search results length: {len(web_context)} chars")
         
+        # Knowledge base nodes pass scored chunks; fall back to plain context text.
+        chunks = state.get("context_chunks") or ([{"text": context, "score": None}] if context else [])
+        budget = context_budget(actual_model, llm_config.get("context_tokens"))
+        packed = await run_blocking(pack_context, chunks, actual_model, budget, web_context)
+        context, web_context = packed["context"], packed["web_context"]
+        
         full_context = ""
         if context:
             full_context += f"Document Context:\n{context}\n\n"
         if web_context:
             full_context += web_context
         
-        print(f"Full context length: {len(full_context)} chars")
+        print(f"Full context length: {len(full_context)} chars, {packed['tokens']}/{budget} tokens")
+        print(f"Chunks used: {packed['chunks_used']}, deduplicated: {packed['chunks_deduplicated']}, dropped: {packed['chunks_dropped']}")
         print(f"Calling LLM service...")
         
         llm_service = LLMService(
@@ -164,10 +241,19 @@ async def llm_engine_node(state: WorkflowState) -> dict:
         print(f"LLM Response received: {response[:200] if response else 'None'}...")
         print(f"=== END DEBUG: LLM Engine Node ===\n")
         
-        return {
+        result = {
             "llm_response": response,
-            "web_search_results": web_context if web_context else None
+            "context_tokens": packed["tokens"],
+            "metadata": {
+                "context_tokens": packed["tokens"],
+                "context_budget": budget,
+                "context_chunks_used": packed["chunks_used"],
+                "context_chunks_dropped": packed["chunks_dropped"],
+            }
         }
+        if inline_web_search:
+            result["web_search_results"] = web_context if web_context else None
+        return result
     
     except Exception as e:
         print(f"LLM Engine Error: {str(e)}")
@@ -177,22 +263,78 @@ async def llm_engine_node(state: WorkflowState) -> dict:
         return {"llm_response": None, "error": str(e)}
 
 
-async def output_node(state: WorkflowState) -> dict:
-    """Output node - formats the final response."""
+DEFAULT_FORMATTING_PROMPT = (
+    "You are an expert technical writer. Refine the following response into a clean, professional, and well-structured format. "
+    "Use bold headers for main sections (e.g., **Summary**, **Key Skills**, **Experience**, **Education**). "
+    "Use bullet points for lists to improve readability. "
+    "Do not remove any facts, but ensure the tone is polished and professional."
+)
+
+FORMAT_MODES = ("passthrough", "markdown", "llm")
+
+_refine_cache = LRUCache(maxsize=get_settings().output_format_cache_size)
+
+
+async def _refine_with_llm(response: str, formatting_prompt: str, llm_config: dict) -> tuple[str, bool]:
+    """
+    Rewrite a response with the workflow's configured LLM.
+    
+    Results are cached by content hash, so an identical upstream response is
+    never reformatted twice with the same provider, model and prompt.
+    
+    Returns:
+        Tuple of (formatted response, whether it came from the cache)
+    """
+    provider = llm_config.get("provider", "openai")
+    model = llm_config.get("model", "gpt-4o-mini")
+    
+    cache_key = hashlib.sha256(
+        "\0".join([provider, model, formatting_prompt, response]).encode("utf-8")
+    ).hexdigest()
+    cached = _refine_cache.get(cache_key)
+    if cached is not None:
+        return cached, True
+    
+    llm_service = LLMService(
+        provider=provider,
+        model=model,
+        api_key=llm_config.get("api_key")
+    )
+    
+    combined_query = f"{formatting_prompt}\n\n=== CONTENT TO REFINE ===\n{response}"
+    
+    formatted_response = await llm_service.generate(
+        query=combined_query,
+        context=None,
+        custom_prompt="You are an expert technical editor. Improve the structure and tone of the provided text.",
+        temperature=0.7
+    )
+    _refine_cache.set(cache_key, formatted_response)
+    return formatted_response, False
+
+
+async def output_node(state: WorkflowState, node_id: str = None) -> dict:
+    """
+    Output node - formats the final response.
+    
+    The output config's "format_mode" selects how llm_response is formatted:
+        passthrough: returned unchanged
+        markdown: tidied locally by format_markdown, no LLM call
+        llm: refined by the workflow's LLM (default, cached by content hash)
+    """
     print(f"\n=== OUTPUT NODE ===")
     response = state.get("llm_response")
     error = state.get("error")
     
-    formatting_prompt = (
-        "You are an expert technical writer. Refine the following response into a clean, professional, and well-structured format. "
-        "Use bold headers for main sections (e.g., **Summary**, **Key Skills**, **Experience**, **Education**). "
-        "Use bullet points for lists to improve readability. "
-        "Do not remove any facts, but ensure the tone is polished and professional."
-    )
+    output_config = _node_config(state, "output", node_id)
+    format_mode = output_config.get("format_mode") or "llm"
+    if format_mode not in FORMAT_MODES:
+        format_mode = "llm"
+    formatting_prompt = output_config.get("formatting_prompt") or DEFAULT_FORMATTING_PROMPT
     
     print(f"LLM Response: {response[:200] if response else 'None'}...")
     print(f"Error: {error}")
-    print(f"Formatting Prompt: {formatting_prompt}")
+    print(f"Format mode: {format_mode}")
     
     if error:
         final = f"Error: {error}"
@@ -201,35 +343,29 @@ async def output_node(state: WorkflowState) -> dict:
         return {"final_output": final}
     
     if response:
-        if formatting_prompt:
+        metadata = {"format_mode": format_mode, "format_cache_hit": False}
+        start = time.perf_counter()
+        
+        if format_mode == "markdown":
+            response = format_markdown(response)
+        elif format_mode == "llm":
             print("Applying formatting prompt...")
             try:
-                node_configs = state.get("node_configs", {})
-                llm_config = node_configs.get("llmEngine", {})
-                api_key = llm_config.get("api_key")
-                
-                llm_service = LLMService(
-                    provider="openai",
-                    model="gpt-4o-mini",
-                    api_key=api_key
+                response, metadata["format_cache_hit"] = await _refine_with_llm(
+                    response,
+                    formatting_prompt,
+                    _node_config(state, "llmEngine")
                 )
-                
-                combined_query = f"{formatting_prompt}\n\n=== CONTENT TO REFINE ===\n{response}"
-                
-                formatted_response = await llm_service.generate(
-                    query=combined_query,
-                    context=None,
-                    custom_prompt="You are an expert technical editor. Improve the structure and tone of the provided text.",
-                    temperature=0.7
-                )
-                print(f"Formatted Response: {formatted_response[:200]}...")
-                response = formatted_response
+                print(f"Formatted Response: {response[:200]}...")
             except Exception as e:
                 print(f"Error applying formatting: {str(e)}")
+                metadata["format_error"] = str(e)
+        
+        metadata["format_ms"] = round((time.perf_counter() - start) * 1000, 2)
         
         print(f"Returning final response: {response[:200]}...")
         print(f"=== END OUTPUT NODE ===\n")
-        return {"final_output": response}
+        return {"final_output": response, "metadata": metadata}
     
     print(f"No response generated, returning default message")
     print(f"=== END OUTPUT NODE ===\n")
@@ -2,6 +2,29 @@ from typing import TypedDict, Optional, Annotated
 from operator import add
 
 
+def merge_text(left: Optional[str], right: Optional[str]) -> Optional[str]:
+    """Reducer joining text written by parallel branches, ignoring empty updates."""
+    if not left:
+        return right
+    if not right:
+        return left
+    return f"{left}\n\n{right}"
+
+
+def merge_metadata(left: Optional[dict], right: Optional[dict]) -> dict:
+    """Reducer merging per-node response metadata."""
+    return {**(left or {}), **(right or {})}
+
+
+def merge_errors(left: Optional[str], right: Optional[str]) -> Optional[str]:
+    """Reducer keeping every error reported by parallel branches."""
+    if not left:
+        return right
+    if not right:
+        return left
+    return f"{left}; {right}"
+
+
 class WorkflowState(TypedDict):
     """State passed between LangGraph nodes."""
     
@@ -9,16 +32,20 @@ class WorkflowState(TypedDict):
     
     node_configs: dict
     
-    context: Optional[str]
+    context: Annotated[Optional[str], merge_text]
+    context_chunks: Annotated[list[dict], add]
+    context_tokens: Optional[int]
     collection_name: Optional[str]
     
     llm_response: Optional[str]
     
-    web_search_results: Optional[str]
+    web_search_results: Annotated[Optional[str], merge_text]
     
     final_output: Optional[str]
     
     workflow_id: Optional[str]
     active_nodes: list[str]
     
-    error: Optional[str]
+    error: Annotated[Optional[str], merge_errors]
+    
+    metadata: Annotated[dict, merge_metadata]
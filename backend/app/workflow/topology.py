@@ -0,0 +1,131 @@
+"""
+Graph algorithms over workflow adjacency maps.
+
+Reachability is tracked with Python ints used as bitsets (bit ``i`` set means
+the node at topological index ``i`` is reachable), so a transitive reduction
+costs one topological sort plus one pass in reverse topological order.
+"""
+from collections import deque
+
+
+class WorkflowCycleError(ValueError):
+    """Raised when a workflow graph is not a DAG."""
+
+    def __init__(self, cycle: list[str]):
+        self.cycle = cycle
+        super().__init__(f"Workflow contains a cycle: {' -> '.join(cycle)}")
+
+
+def _collect_nodes(adjacency: dict) -> list[str]:
+    nodes = dict.fromkeys(adjacency)
+    for targets in adjacency.values():
+        nodes.update(dict.fromkeys(targets))
+    return list(nodes)
+
+
+def _find_cycle(adjacency: dict, remaining: set) -> list[str]:
+    """Return one cycle among the nodes Kahn's algorithm could not order."""
+    predecessors = {node: [] for node in remaining}
+    for source in remaining:
+        for target in adjacency.get(source, []):
+            if target in remaining:
+                predecessors[target].append(source)
+
+    # Every remaining node has a remaining predecessor, so walking backwards
+    # must eventually revisit a node.
+    node = next(iter(remaining))
+    seen = {}
+    path = []
+    while node not in seen:
+        seen[node] = len(path)
+        path.append(node)
+        node = predecessors[node][0]
+
+    cycle = path[seen[node]:]
+    cycle.reverse()
+    return cycle + [cycle[0]]
+
+
+def reachable_nodes(adjacency: dict, start: str) -> set[str]:
+    """Nodes reachable from start by following edges, start included."""
+    reached = {start}
+    stack = [start]
+    while stack:
+        for target in adjacency.get(stack.pop(), []):
+            if target not in reached:
+                reached.add(target)
+                stack.append(target)
+    return reached
+
+
+def topological_sort(adjacency: dict) -> list[str]:
+    """
+    Order the nodes of a directed graph so every edge points forward.
+
+    Args:
+        adjacency: Dictionary mapping source nodes to lists of target nodes
+
+    Returns:
+        Nodes in topological order
+
+    Raises:
+        WorkflowCycleError: If the graph contains a cycle
+    """
+    nodes = _collect_nodes(adjacency)
+    in_degree = dict.fromkeys(nodes, 0)
+    for source, targets in adjacency.items():
+        for target in set(targets):
+            in_degree[target] += 1
+
+    queue = deque(node for node in nodes if in_degree[node] == 0)
+    order = []
+    while queue:
+        node = queue.popleft()
+        order.append(node)
+        for target in dict.fromkeys(adjacency.get(node, [])):
+            in_degree[target] -= 1
+            if in_degree[target] == 0:
+                queue.append(target)
+
+    if len(order) != len(nodes):
+        remaining = set(nodes) - set(order)
+        raise WorkflowCycleError(_find_cycle(adjacency, remaining))
+
+    return order
+
+
+def transitive_reduction(adjacency: dict) -> dict:
+    """
+    Remove direct edges if an indirect path exists (Transitive Reduction).
+    Example: If A->B, B->C, and A->C exist, remove A->C.
+
+    Args:
+        adjacency: Dictionary mapping source nodes to lists of target nodes
+
+    Returns:
+        Reduced adjacency dictionary with the same keys and target order
+
+    Raises:
+        WorkflowCycleError: If the graph contains a cycle
+    """
+    order = topological_sort(adjacency)
+    index = {node: i for i, node in enumerate(order)}
+    reachable = {}
+    reduced = {}
+
+    for node in reversed(order):
+        targets = list(dict.fromkeys(adjacency.get(node, [])))
+        reach = 0
+        kept = set()
+        # A successor can only be reached through successors earlier in
+        # topological order, so visiting them in that order is sufficient.
+        for target in sorted(targets, key=index.__getitem__):
+            bit = 1 << index[target]
+            if not reach & bit:
+                kept.add(target)
+            reach |= bit | reachable[target]
+        reachable[node] = reach
+        if node in adjacency:
+            reduced[node] = [target for target in targets if target in kept]
+
+    return {node: reduced[node] for node in adjacency}
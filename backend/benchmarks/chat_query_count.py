@@ -0,0 +1,128 @@
+"""
+Benchmark: SQL statements and commits per chat request.
+
+Runs the /api/chat/execute and /api/chat/execute/stream handlers against an
+in-memory SQLite database (requires aiosqlite) holding a workflow with ready
+documents and several knowledge-base nodes. Graph execution is replaced by a
+stub so only the handlers' own database work is measured. Statements are
+counted with engine events, for a new session and for a follow-up message in
+an existing one.
+
+Usage (from backend/):
+    python -m benchmarks.chat_query_count [--kb-nodes 3] [--documents 20]
+"""
+import argparse
+import asyncio
+import time
+
+from sqlalchemy import event, func, select
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+
+from app.api.routes import chat
+from app.core.database import Base
+from app.ingestion import READY
+from app.models.database import ChatMessage, Document, User, Workflow
+from app.models.schemas import ChatExecuteRequest
+from app.workflow import WorkflowGraphBuilder
+
+
+async def fake_execute(self, nodes, edges, query, node_configs, workflow_id=None):
+    return "answer", {}
+
+
+async def fake_stream(self, nodes, edges, query, node_configs, workflow_id=None):
+    yield {"event": "token", "content": "answer"}
+    yield {"event": "done", "response": "answer"}
+
+
+class Counter:
+    def __init__(self, engine):
+        self.statements = 0
+        self.commits = 0
+        event.listen(engine.sync_engine, "before_cursor_execute", self._statement)
+        event.listen(engine.sync_engine, "commit", self._commit)
+
+    def _statement(self, *args):
+        self.statements += 1
+
+    def _commit(self, *args):
+        self.commits += 1
+
+    def reset(self):
+        self.statements = self.commits = 0
+
+
+async def seed(sessionmaker, kb_nodes: int, documents: int) -> Workflow:
+    async with sessionmaker() as db:
+        user = User(email="bench@example.com", username="bench", hashed_password="x")
+        nodes = [
+            {"id": f"kb-{i}", "type": "knowledgeBase", "data": {"config": {"file": {"name": "doc-0.pdf"}}}}
+            for i in range(kb_nodes)
+        ] + [{"id": "llm", "type": "llmEngine", "data": {"config": {}}}]
+        workflow = Workflow(name="bench", nodes=nodes, edges=[], user=user)
+        db.add(workflow)
+        for i in range(documents):
+            db.add(Document(
+                workflow=workflow,
+                filename=f"doc-{i}.pdf",
+                file_path=f"uploads/doc-{i}.pdf",
+                collection_name=f"collection-{i}",
+                status=READY
+            ))
+        await db.commit()
+        return workflow
+
+
+async def run(handler, request: ChatExecuteRequest, sessionmaker):
+    async with sessionmaker() as db:
+        result = await handler(request, db)
+        if handler is chat.execute_chat_stream:
+            async for _ in result.body_iterator:
+                pass
+            return None
+        return result.session_id
+
+
+async def main(kb_nodes: int, documents: int):
+    engine = create_async_engine("sqlite+aiosqlite://")
+    sessionmaker = async_sessionmaker(engine, expire_on_commit=False)
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
+    workflow = await seed(sessionmaker, kb_nodes, documents)
+    counter = Counter(engine)
+
+    WorkflowGraphBuilder.execute = fake_execute
+    WorkflowGraphBuilder.stream = fake_stream
+    chat.async_session = sessionmaker
+    chat.print = lambda *args, **kwargs: None
+
+    print(f"{kb_nodes} knowledge-base nodes, {documents} ready documents")
+    for name, handler in (("execute", chat.execute_chat), ("execute/stream", chat.execute_chat_stream)):
+        counter.reset()
+        start = time.perf_counter()
+        session_id = await run(handler, ChatExecuteRequest(query="hello", workflow_id=workflow.id), sessionmaker)
+        first = (counter.statements, counter.commits, (time.perf_counter() - start) * 1000)
+        if session_id is None:
+            async with sessionmaker() as db:
+                session_id = (await db.execute(
+                    select(ChatMessage.session_id).order_by(ChatMessage.created_at.desc()).limit(1)
+                )).scalar_one()
+        counter.reset()
+        start = time.perf_counter()
+        await run(handler, ChatExecuteRequest(query="again", workflow_id=workflow.id, session_id=session_id), sessionmaker)
+        follow_up = (counter.statements, counter.commits, (time.perf_counter() - start) * 1000)
+        for label, (statements, commits, ms) in (("new session", first), ("follow-up", follow_up)):
+            print(f"{name:15s} {label:12s} statements {statements:3d}  commits {commits}  {ms:6.1f} ms")
+
+    async with sessionmaker() as db:
+        messages = (await db.execute(select(func.count()).select_from(ChatMessage))).scalar_one()
+    print(f"messages stored: {messages}")
+    await engine.dispose()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--kb-nodes", type=int, default=3)
+    parser.add_argument("--documents", type=int, default=20)
+    args = parser.parse_args()
+    asyncio.run(main(args.kb_nodes, args.documents))
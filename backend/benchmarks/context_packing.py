@@ -0,0 +1,58 @@
+"""
+Benchmark: prompt context size with and without the context packer.
+
+Takes runs of neighbouring chunks from the large-PDF fixture (adjacent chunks
+are typical retrieval hits and share the splitter's 200-character overlap),
+joins them the way the knowledge base node used to, and packs them with
+pack_context. Reports tokens per prompt and packing time.
+
+Usage (from backend/):
+    python -m benchmarks.context_packing [--k 5] [--documents 3] [--budget 6000]
+"""
+import argparse
+import random
+import statistics
+import time
+
+from app.services.context_packer import get_encoding, pack_context
+from app.services.document_processor import DocumentProcessor
+from benchmarks.fixtures.large_pdf import large_pdf
+
+MODEL = "gpt-4o-mini"
+TRIALS = 200
+
+
+def main(k: int, documents: int, budget: int):
+    chunks = [doc.page_content for doc in DocumentProcessor(workers=1).iter_chunks(str(large_pdf(50)))]
+    encoding = get_encoding(MODEL)
+    print(f"tokenizer: {type(encoding).__name__}, {len(chunks)} fixture chunks")
+    rng = random.Random(0)
+
+    naive, packed, packing_ms = [], [], []
+    for _ in range(TRIALS):
+        # Each knowledge base document returns k neighbouring chunks.
+        retrieved = []
+        for _ in range(documents):
+            start = rng.randrange(len(chunks) - k)
+            retrieved += [{"text": text, "score": rng.random()} for text in chunks[start:start + k]]
+        naive.append(len(encoding.encode("\n\n".join(chunk["text"] for chunk in retrieved))))
+
+        start = time.perf_counter()
+        result = pack_context(retrieved, MODEL, budget)
+        packing_ms.append((time.perf_counter() - start) * 1000)
+        packed.append(result["tokens"])
+
+    print(f"{documents} documents x top-{k}, budget {budget} tokens, {TRIALS} prompts")
+    print(f"naive join   mean {statistics.mean(naive):7.0f} tokens  max {max(naive):6d}")
+    print(f"packed       mean {statistics.mean(packed):7.0f} tokens  max {max(packed):6d}")
+    print(f"saved        {(1 - sum(packed) / sum(naive)) * 100:.1f}%")
+    print(f"packing      p50 {statistics.median(packing_ms):.2f} ms  max {max(packing_ms):.2f} ms")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--k", type=int, default=5)
+    parser.add_argument("--documents", type=int, default=3)
+    parser.add_argument("--budget", type=int, default=6000)
+    args = parser.parse_args()
+    main(args.k, args.documents, args.budget)
@@ -0,0 +1,59 @@
+"""
+Benchmark: connection checkout wait vs. pool size under concurrent requests.
+
+Drives MonitoredQueuePool (the engine's pool class) with fake connections:
+each simulated request checks out a connection, holds it for a fixed query
+time and returns it. Prints the pool_status() figures /api/health/metrics
+reports for each pool size, showing how saturation surfaces as checkout wait.
+
+Usage (from backend/):
+    python -m benchmarks.db_pool_saturation [--requests 400] [--concurrency 50] [--hold 0.02]
+"""
+import argparse
+import asyncio
+import time
+from unittest import mock
+
+from sqlalchemy.util import greenlet_spawn
+
+from app.core import pool_metrics as metrics_module
+from app.core.pool_metrics import MonitoredQueuePool, PoolMetrics
+
+
+async def run(pool_size: int, max_overflow: int, requests: int, concurrency: int, hold: float) -> dict:
+    metrics_module.pool_metrics = PoolMetrics()
+    pool = MonitoredQueuePool(mock.MagicMock, pool_size=pool_size, max_overflow=max_overflow, timeout=30)
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async def request():
+        async with semaphore:
+            connection = await greenlet_spawn(pool.connect)
+            await asyncio.sleep(hold)
+            await greenlet_spawn(connection.close)
+
+    start = time.perf_counter()
+    await asyncio.gather(*(request() for _ in range(requests)))
+    elapsed = time.perf_counter() - start
+    snapshot = metrics_module.pool_metrics.snapshot(pool, max_overflow)
+    pool.dispose()
+    return {"elapsed": elapsed, **snapshot}
+
+
+async def main(requests: int, concurrency: int, hold: float):
+    print(f"{requests} requests, {concurrency} concurrent, {hold * 1000:.0f} ms per query")
+    for pool_size, max_overflow in ((5, 0), (10, 0), (10, 10), (25, 25)):
+        result = await run(pool_size, max_overflow, requests, concurrency, hold)
+        wait = result["wait_ms"]
+        print(
+            f"pool {pool_size:3d}+{max_overflow:<3d} {requests / result['elapsed']:7.0f} req/s  "
+            f"wait p50 {wait['p50']:7.2f} ms  p95 {wait['p95']:7.2f} ms  max {wait['max']:7.2f} ms"
+        )
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--requests", type=int, default=400)
+    parser.add_argument("--concurrency", type=int, default=50)
+    parser.add_argument("--hold", type=float, default=0.02)
+    args = parser.parse_args()
+    asyncio.run(main(args.requests, args.concurrency, args.hold))
@@ -0,0 +1,159 @@
+"""
+Throughput benchmark: sequential embedding vs. the EmbeddingScheduler.
+
+Starts a local fake OpenAI embeddings server (FastAPI + uvicorn) with a fixed
+per-request latency, a per-token cost and a requests/min limit that answers
+429 with Retry-After once exceeded. The same chunk set is then embedded and
+"upserted" (a fixed sleep per batch) twice:
+
+    sequential  - batches of 100, embed then upsert, one at a time
+                  (what PineconeVectorStore.add_documents did)
+    scheduler   - token-budgeted batches with bounded concurrency, upserts
+                  overlapping the next batches' embedding
+
+Usage (from backend/):
+    python -m benchmarks.embedding_throughput [--chunks 5000] [--rpm 600]
+"""
+import argparse
+import array
+import asyncio
+import base64
+import random
+import threading
+import time
+from collections import deque
+
+import uvicorn
+from fastapi import FastAPI, Request
+from fastapi.responses import JSONResponse
+from langchain_openai import OpenAIEmbeddings
+
+from app.services.embedding_scheduler import EmbeddingScheduler, estimate_tokens
+
+PORT = 8765
+DIMENSION = 256
+REQUEST_LATENCY = 0.15
+SECONDS_PER_1K_TOKENS = 0.01
+UPSERT_LATENCY = 0.1
+
+
+def make_server(rpm: int) -> FastAPI:
+    app = FastAPI()
+    recent: deque = deque()
+
+    @app.post("/v1/embeddings")
+    async def embeddings(request: Request):
+        body = await request.json()
+        now = time.monotonic()
+        while recent and now - recent[0] > 60:
+            recent.popleft()
+        if len(recent) >= rpm:
+            retry_after = max(0.1, 60 - (now - recent[0]))
+            return JSONResponse(
+                {"error": {"message": "Rate limit reached", "type": "requests", "code": "rate_limit_exceeded"}},
+                status_code=429,
+                headers={"retry-after": f"{retry_after:.2f}"}
+            )
+        recent.append(now)
+
+        inputs = body["input"]
+        tokens = sum(estimate_tokens(text) if isinstance(text, str) else len(text) for text in inputs)
+        await asyncio.sleep(REQUEST_LATENCY + tokens / 1000 * SECONDS_PER_1K_TOKENS)
+
+        data = []
+        for i, _ in enumerate(inputs):
+            vector = [random.random() for _ in range(DIMENSION)]
+            if body.get("encoding_format") == "base64":
+                vector = base64.b64encode(array.array("f", vector).tobytes()).decode()
+            data.append({"object": "embedding", "index": i, "embedding": vector})
+        return {
+            "object": "list",
+            "data": data,
+            "model": body.get("model"),
+            "usage": {"prompt_tokens": tokens, "total_tokens": tokens},
+        }
+
+    return app
+
+
+def start_server(rpm: int):
+    config = uvicorn.Config(make_server(rpm), port=PORT, log_level="warning")
+    server = uvicorn.Server(config)
+    thread = threading.Thread(target=server.run, daemon=True)
+    thread.start()
+    while not server.started:
+        time.sleep(0.05)
+    return server
+
+
+def make_chunks(count: int) -> list[str]:
+    words = "retrieval augmented generation pipelines split documents into overlapping chunks".split()
+    return [" ".join(random.choices(words, k=random.randint(80, 220))) for _ in range(count)]
+
+
+def make_embeddings() -> OpenAIEmbeddings:
+    return OpenAIEmbeddings(
+        api_key="fake",
+        base_url=f"http://127.0.0.1:{PORT}/v1",
+        model="text-embedding-3-small",
+        check_embedding_ctx_length=False,
+        max_retries=0
+    )
+
+
+async def fake_upsert(vectors: list[list[float]]):
+    await asyncio.sleep(UPSERT_LATENCY)
+
+
+async def run_sequential(texts: list[str]) -> float:
+    embeddings = make_embeddings()
+    start = time.perf_counter()
+    for i in range(0, len(texts), 100):
+        while True:
+            try:
+                vectors = await embeddings.aembed_documents(texts[i:i + 100])
+                break
+            except Exception as e:
+                if getattr(e, "status_code", None) != 429:
+                    raise
+                await asyncio.sleep(1)
+        await fake_upsert(vectors)
+    return time.perf_counter() - start
+
+
+async def run_scheduler(texts: list[str], rpm: int, concurrency: int) -> tuple[float, dict]:
+    scheduler = EmbeddingScheduler(
+        make_embeddings(),
+        max_concurrency=concurrency,
+        requests_per_minute=rpm,
+        tokens_per_minute=10_000_000
+    )
+    start = time.perf_counter()
+    async for _, vectors in scheduler.stream(texts):
+        await fake_upsert(vectors)
+    return time.perf_counter() - start, scheduler.stats()
+
+
+async def main(num_chunks: int, rpm: int, concurrency: int):
+    texts = make_chunks(num_chunks)
+    tokens = sum(estimate_tokens(text) for text in texts)
+    print(f"{num_chunks} chunks, ~{tokens} tokens, server limit {rpm} req/min")
+
+    elapsed = await run_sequential(texts)
+    print(f"sequential  {elapsed:7.2f}s  {num_chunks / elapsed:8.1f} chunks/s")
+
+    elapsed, stats = await run_scheduler(texts, rpm, concurrency)
+    print(f"scheduler   {elapsed:7.2f}s  {num_chunks / elapsed:8.1f} chunks/s  {stats}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--chunks", type=int, default=5000)
+    parser.add_argument("--rpm", type=int, default=600)
+    parser.add_argument("--concurrency", type=int, default=8)
+    args = parser.parse_args()
+    server = start_server(args.rpm)
+    try:
+        asyncio.run(main(args.chunks, args.rpm, args.concurrency))
+    finally:
+        server.should_exit = True
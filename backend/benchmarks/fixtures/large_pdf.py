@@ -0,0 +1,75 @@
+"""
+Deterministic large-PDF fixture for parsing benchmarks.
+
+Writes a text-only PDF (Helvetica, one content stream per page) so the
+benchmark does not depend on a multi-megabyte binary in the repository.
+The same page count always produces the same file.
+"""
+import random
+from pathlib import Path
+
+FIXTURE_DIR = Path(__file__).parent
+LINES_PER_PAGE = 60
+
+WORDS = (
+    "install configure the controller module before powering the unit verify "
+    "wiring torque values in table maintenance interval replace filter cartridge "
+    "warning disconnect supply voltage calibration procedure sensor offset reset "
+    "firmware update error code troubleshooting section appendix specification"
+).split()
+
+
+def _escape(text: str) -> str:
+    return text.replace("\\", "\\\\").replace("(", "\\(").replace(")", "\\)")
+
+
+def _page_stream(rng: random.Random, page: int, edited: bool = False) -> bytes:
+    lines = [f"Section {page + 1}. Operating manual page {page + 1}"]
+    lines += [" ".join(rng.choices(WORDS, k=rng.randint(8, 14))) + "." for _ in range(LINES_PER_PAGE)]
+    if edited:
+        lines[LINES_PER_PAGE // 2] = "Revised: this paragraph was updated in the new edition of the manual."
+    body = " T* ".join(f"({_escape(line)}) Tj" for line in lines)
+    return f"BT /F1 9 Tf 11 TL 40 800 Td {body} ET".encode("latin-1")
+
+
+def build_pdf(path: Path, pages: int, seed: int = 0, edited_pages: tuple = ()):
+    """Write the fixture; edited_pages get one line rewritten (a new "version")."""
+    rng = random.Random(seed)
+    # Object numbers: 1 catalog, 2 pages, 3 font, then (page, content) pairs.
+    objects = {
+        1: b"<< /Type /Catalog /Pages 2 0 R >>",
+        3: b"<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica >>",
+    }
+    kids = []
+    for page in range(pages):
+        page_id, content_id = 4 + page * 2, 5 + page * 2
+        stream = _page_stream(rng, page, page in edited_pages)
+        objects[page_id] = (
+            f"<< /Type /Page /Parent 2 0 R /MediaBox [0 0 595 842] "
+            f"/Resources << /Font << /F1 3 0 R >> >> /Contents {content_id} 0 R >>"
+        ).encode("latin-1")
+        objects[content_id] = f"<< /Length {len(stream)} >>\nstream\n".encode("latin-1") + stream + b"\nendstream"
+        kids.append(f"{page_id} 0 R")
+    objects[2] = f"<< /Type /Pages /Kids [{' '.join(kids)}] /Count {pages} >>".encode("latin-1")
+
+    out = bytearray(b"%PDF-1.4\n")
+    offsets = {}
+    for number in sorted(objects):
+        offsets[number] = len(out)
+        out += f"{number} 0 obj\n".encode("latin-1") + objects[number] + b"\nendobj\n"
+    xref = len(out)
+    size = max(objects) + 1
+    out += f"xref\n0 {size}\n0000000000 65535 f \n".encode("latin-1")
+    for number in range(1, size):
+        out += f"{offsets[number]:010d} 00000 n \n".encode("latin-1")
+    out += f"trailer\n<< /Size {size} /Root 1 0 R >>\nstartxref\n{xref}\n%%EOF\n".encode("latin-1")
+    path.write_bytes(bytes(out))
+
+
+def large_pdf(pages: int = 1000, edited_pages: tuple = ()) -> Path:
+    """Path to the fixture with the given page count, generated on first use."""
+    suffix = "".join(f"_e{page}" for page in edited_pages)
+    path = FIXTURE_DIR / f"manual_{pages}p{suffix}.pdf"
+    if not path.exists():
+        build_pdf(path, pages, edited_pages=edited_pages)
+    return path
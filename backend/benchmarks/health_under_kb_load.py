@@ -0,0 +1,136 @@
+"""
+Load test: /api/health latency while knowledge-base queries are in flight.
+
+Pinecone and OpenAI are replaced by fakes with realistic latencies: the
+embedding call is async, while index lookups block their thread exactly like
+the Pinecone SDK does. The script probes /api/health in-process while N
+knowledge_base_node calls run, first with the async retrieval path and then
+with the old behaviour of calling the SDK directly on the event loop.
+
+Usage (from backend/, requires httpx):
+    python -m benchmarks.health_under_kb_load [--queries 50]
+"""
+import argparse
+import asyncio
+import statistics
+import time
+
+import httpx
+
+from app.main import app
+from app.services.vector_store import VectorStore
+from app.workflow import nodes
+
+EMBED_LATENCY = 0.08
+CONTROL_PLANE_LATENCY = 0.15
+QUERY_LATENCY = 0.25
+
+
+class FakeEmbeddings:
+    async def aembed_query(self, text: str) -> list[float]:
+        await asyncio.sleep(EMBED_LATENCY)
+        return [0.0] * 8
+
+    def embed_query(self, text: str) -> list[float]:
+        time.sleep(EMBED_LATENCY)
+        return [0.0] * 8
+
+
+class FakeEmbeddingService:
+    def __init__(self, *args, **kwargs):
+        pass
+
+    def get_dimension(self) -> int:
+        return 8
+
+    def get_embeddings_model(self):
+        return FakeEmbeddings()
+
+
+class FakePineconeCollection:
+    def similarity_search(self, query: str, k: int = 5):
+        time.sleep(EMBED_LATENCY + QUERY_LATENCY)
+        return []
+
+    def similarity_search_by_vector_with_score(self, embedding: list[float], k: int = 5):
+        time.sleep(QUERY_LATENCY)
+        return []
+
+
+class FakeVectorStore(VectorStore):
+    """Real async wrappers over blocking fake SDK calls."""
+
+    def collection_exists(self, collection_name: str) -> bool:
+        time.sleep(CONTROL_PLANE_LATENCY)
+        return True
+
+    def get_or_create_collection(self, collection_name: str, embeddings=None):
+        return FakePineconeCollection()
+
+
+class BlockingVectorStore(FakeVectorStore):
+    """Pre-async behaviour: SDK calls made directly on the event loop."""
+
+    async def acollection_exists(self, collection_name: str) -> bool:
+        return self.collection_exists(collection_name)
+
+    async def asimilarity_search(self, collection_name, query, embeddings=None, k=5):
+        return self.get_or_create_collection(collection_name).similarity_search(query, k=k)
+
+
+async def probe_health(client: httpx.AsyncClient, stop: asyncio.Event) -> list[float]:
+    latencies = []
+    while not stop.is_set():
+        start = time.perf_counter()
+        await client.get("/api/health/")
+        latencies.append((time.perf_counter() - start) * 1000)
+        await asyncio.sleep(0.01)
+    return latencies
+
+
+async def run_scenario(num_queries: int, vector_store_cls) -> list[float]:
+    nodes.EmbeddingService = FakeEmbeddingService
+    nodes.get_vector_store = vector_store_cls
+    state = {
+        "query": "What is the refund policy?",
+        "node_configs": {"knowledgeBase": {"collection_name": "bench"}},
+    }
+
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+        stop = asyncio.Event()
+        prober = asyncio.create_task(probe_health(client, stop))
+        await asyncio.gather(*(nodes.knowledge_base_node(state) for _ in range(num_queries)))
+        stop.set()
+        return await prober
+
+
+def summarize(label: str, latencies: list[float]):
+    if len(latencies) < 2:
+        print(f"{label:<22} samples={len(latencies)} max={max(latencies, default=0):.1f}ms")
+        return
+    p99 = statistics.quantiles(latencies, n=100)[98]
+    print(
+        f"{label:<22} samples={len(latencies):<5} "
+        f"p50={statistics.median(latencies):7.1f}ms p99={p99:7.1f}ms max={max(latencies):7.1f}ms"
+    )
+
+
+async def main(num_queries: int):
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+        stop = asyncio.Event()
+        prober = asyncio.create_task(probe_health(client, stop))
+        await asyncio.sleep(1.0)
+        stop.set()
+        summarize("idle", await prober)
+
+    summarize(f"async KB x{num_queries}", await run_scenario(num_queries, FakeVectorStore))
+    summarize(f"blocking KB x{num_queries}", await run_scenario(num_queries, BlockingVectorStore))
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--queries", type=int, default=50)
+    args = parser.parse_args()
+    asyncio.run(main(args.queries))
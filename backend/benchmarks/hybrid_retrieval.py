@@ -0,0 +1,121 @@
+"""
+Benchmark: vector vs. hybrid retrieval on identifier and natural-language queries.
+
+The corpus is the large-PDF fixture's chunks plus troubleshooting notes that
+differ only in their error code (ERR-4000 ... ERR-4199). Embeddings are a
+deterministic stand-in that, like real embedding models, barely separate
+codes: a hashed bag of the alphabetic words, ignoring digits. Each query
+embedding call sleeps for a fixed API latency and is counted.
+
+For each mode, reports hit@5 (the note with the queried code, or the chunk
+a natural-language query was taken from, is retrieved), embedding calls and
+per-query latency.
+
+Usage (from backend/):
+    python -m benchmarks.hybrid_retrieval [--queries 100] [--latency 0.08]
+"""
+import argparse
+import asyncio
+import random
+import re
+import statistics
+import tempfile
+import time
+import zlib
+
+import numpy as np
+
+from app.core.executor import shutdown_executor
+from app.services import hybrid_search as hybrid
+from app.services.document_processor import DocumentProcessor
+from app.services.lexical_index import LexicalIndexStore
+from app.services.local_vector_store import LocalVectorStore
+from app.services.retrieval_cache import retrieval_cache
+from benchmarks.fixtures.large_pdf import large_pdf
+
+DIMENSION = 256
+COLLECTION = "bench"
+SERVICES = ("billing", "search", "upload", "auth", "export")
+
+
+def embed(text: str) -> list[float]:
+    vector = np.zeros(DIMENSION, dtype=np.float32)
+    for word in re.findall(r"[a-z]+", text.lower()):
+        vector[zlib.crc32(word.encode()) % DIMENSION] += 1
+    return vector.tolist()
+
+
+class FakeEmbeddings:
+    model = "fake"
+
+    def __init__(self, latency: float):
+        self.latency = latency
+        self.calls = 0
+
+    async def aembed_query(self, text: str) -> list[float]:
+        self.calls += 1
+        await asyncio.sleep(self.latency)
+        return embed(text)
+
+
+def corpus(rng: random.Random) -> list[dict]:
+    chunks = [doc.page_content for doc in DocumentProcessor(workers=1).iter_chunks(str(large_pdf(50)))]
+    chunks += [
+        f"Troubleshooting note: error code ERR-{4000 + i} is raised when the {rng.choice(SERVICES)} "
+        f"service times out. Resolution: restart the {rng.choice(SERVICES)} worker and retry the request."
+        for i in range(200)
+    ]
+    return [{"hash": str(i), "page_content": text, "metadata": {}} for i, text in enumerate(chunks)]
+
+
+async def main(num_queries: int, latency: float):
+    rng = random.Random(0)
+    chunks = corpus(rng)
+    codes = [rng.randrange(200) for _ in range(num_queries)]
+    prose = [rng.randrange(len(chunks) - 200) for _ in range(num_queries)]
+    workloads = {
+        "identifier": [(f"ERR-{4000 + code}", chunks[-200 + code]["page_content"]) for code in codes],
+        "natural": [
+            (" ".join(chunks[i]["page_content"].split()[5:17]), chunks[i]["page_content"]) for i in prose
+        ],
+    }
+
+    with tempfile.TemporaryDirectory() as tmp:
+        store = LocalVectorStore(path=tmp)
+        store.upsert_vectors(
+            COLLECTION,
+            [chunk["hash"] for chunk in chunks],
+            [embed(chunk["page_content"]) for chunk in chunks],
+            [{"text": chunk["page_content"]} for chunk in chunks]
+        )
+        hybrid.lexical_indexes = LexicalIndexStore(f"{tmp}/lexical")
+        hybrid.lexical_indexes.build(COLLECTION, chunks)
+        print(f"{len(chunks)} chunks, {num_queries} queries per workload, embedding latency {latency * 1000:.0f} ms")
+
+        for workload, queries in workloads.items():
+            for mode in ("vector", "hybrid"):
+                retrieval_cache._embeddings.clear()
+                retrieval_cache.invalidate_collection(COLLECTION)
+                embeddings = FakeEmbeddings(latency)
+                hits, latencies, used = 0, [], set()
+                for query, expected in queries:
+                    start = time.perf_counter()
+                    docs, info = await hybrid.hybrid_search(store, [COLLECTION], query, embeddings, k=5, mode=mode)
+                    latencies.append((time.perf_counter() - start) * 1000)
+                    hits += any(doc.page_content == expected for doc in docs)
+                    used.add(info["mode"])
+                print(
+                    f"{workload:10s} {mode:6s}  hit@5 {hits / len(queries):5.2f}  "
+                    f"embedding calls {embeddings.calls:4d}  p50 {statistics.median(latencies):6.1f} ms  "
+                    f"(paths: {', '.join(sorted(used))})"
+                )
+    LocalVectorStore._collections.clear()
+    shutdown_executor()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--queries", type=int, default=100)
+    parser.add_argument("--latency", type=float, default=0.08)
+    args = parser.parse_args()
+    asyncio.run(main(args.queries, args.latency))
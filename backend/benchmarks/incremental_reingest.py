@@ -0,0 +1,174 @@
+"""
+Benchmark: full re-ingestion vs. incremental replacement of an edited document.
+
+Ingests the large-PDF fixture, then applies a new version with a few edited
+pages in two ways:
+
+    full         - what delete + re-upload did: wipe the namespace, parse,
+                   embed and upsert every chunk again
+    incremental  - build_replacement + apply_replacement in place: diff
+                   chunk hashes, embed only added chunks, upsert them and
+                   delete the removed ids
+
+Embeddings and Pinecone are in-memory fakes with fixed per-request latency.
+
+Usage (from backend/):
+    python -m benchmarks.incremental_reingest [--pages 300] [--edits 3]
+"""
+import argparse
+import asyncio
+import shutil
+import tempfile
+import time
+from pathlib import Path
+
+from app.core.executor import shutdown_executor
+from app.ingestion import pipeline, replace
+from app.services.embedding_scheduler import EmbeddingScheduler
+from app.services.lexical_index import LexicalIndexStore
+from benchmarks.fixtures.large_pdf import large_pdf
+
+EMBED_LATENCY = 0.2
+INDEX_LATENCY = 0.05
+COLLECTION = "bench"
+
+
+class FakeEmbeddings:
+    def __init__(self):
+        self.texts = 0
+
+    async def aembed_documents(self, texts: list[str]) -> list[list[float]]:
+        await asyncio.sleep(EMBED_LATENCY)
+        self.texts += len(texts)
+        return [[float(len(text)), 0.0] for text in texts]
+
+
+class FakeEmbeddingService:
+    def __init__(self):
+        self.embeddings = FakeEmbeddings()
+        self.scheduler = EmbeddingScheduler(self.embeddings, max_concurrency=4)
+
+    def get_embeddings_model(self):
+        return self.embeddings
+
+    def get_dimension(self) -> int:
+        return 2
+
+    def get_scheduler(self) -> EmbeddingScheduler:
+        return self.scheduler
+
+
+class FakeVectorStore:
+    namespaces: dict = {}
+
+    def __init__(self, *args, **kwargs):
+        pass
+
+    def upsert_vectors(self, collection_name, ids, vectors, metadatas):
+        time.sleep(INDEX_LATENCY)
+        self.namespaces.setdefault(collection_name, {}).update(zip(ids, vectors))
+        return ids
+
+    def list_ids(self, collection_name):
+        time.sleep(INDEX_LATENCY)
+        return list(self.namespaces.get(collection_name, {}))
+
+    def fetch_vectors(self, collection_name, ids, batch_size=100):
+        stored = self.namespaces.get(collection_name, {})
+        return {i: (stored[i], {}) for i in ids if i in stored}
+
+    def delete_vectors(self, collection_name, ids, batch_size=1000):
+        time.sleep(INDEX_LATENCY)
+        for vector_id in ids:
+            self.namespaces.get(collection_name, {}).pop(vector_id, None)
+
+    def delete_collection(self, collection_name):
+        self.namespaces.pop(collection_name, None)
+
+
+async def full_ingest(path: str, service: FakeEmbeddingService) -> int:
+    store = FakeVectorStore()
+    store.delete_collection(COLLECTION)
+    pipeline.parse_document(path)
+
+    async def on_progress(done, total):
+        pass
+
+    async def on_vectors(chunks, vectors):
+        pipeline.upsert_chunks(COLLECTION, chunks, vectors, store, 100)
+
+    count = await pipeline.embed_chunks(path, service.get_scheduler(), on_progress, on_vectors)
+    pipeline.remove_artifacts(path)
+    return count
+
+
+async def incremental(workdir: Path, new_version: Path, service: FakeEmbeddingService) -> dict:
+    async def on_batch():
+        pass
+
+    upload = workdir / "upload.pdf"
+    shutil.copy(new_version, upload)
+    replace.lexical_indexes = LexicalIndexStore(str(workdir / "lexical"))
+    store = FakeVectorStore()
+    summary = await replace.build_replacement(
+        store,
+        service,
+        str(upload),
+        old_collection=COLLECTION,
+        target=COLLECTION,
+        batch_size=100,
+        on_batch=on_batch
+    )
+    await replace.apply_replacement(store, str(upload), COLLECTION, 100)
+    replace.remove_replacement_artifacts(str(upload))
+    return summary
+
+
+async def main(pages: int, edits: int):
+    edited_pages = tuple(range(pages // 2, pages // 2 + edits))
+    v1, v2 = large_pdf(pages), large_pdf(pages, edited_pages)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        workdir = Path(tmp)
+        shutil.copy(v1, workdir / "v1.pdf")
+        shutil.copy(v2, workdir / "v2-full.pdf")
+
+        await full_ingest(str(workdir / "v1.pdf"), FakeEmbeddingService())
+        print(f"v1 ingested: {len(FakeVectorStore.namespaces[COLLECTION])} vectors ({pages} pages, {edits} edited)")
+
+        service = FakeEmbeddingService()
+        start = time.perf_counter()
+        await full_ingest(str(workdir / "v2-full.pdf"), service)
+        full_time = time.perf_counter() - start
+        print(f"full         {full_time:7.2f}s  embedded {service.embeddings.texts} chunks")
+
+        FakeVectorStore.namespaces.clear()
+        await full_ingest(str(workdir / "v1.pdf"), FakeEmbeddingService())
+
+        service = FakeEmbeddingService()
+        start = time.perf_counter()
+        summary = await incremental(workdir, v2, service)
+        incremental_time = time.perf_counter() - start
+        print(f"incremental  {incremental_time:7.2f}s  embedded {service.embeddings.texts} chunks  {summary}")
+
+        # Both paths parse the new version; report the embed/index work separately.
+        start = time.perf_counter()
+        pipeline.parse_document(str(workdir / "upload.pdf"))
+        parse_time = time.perf_counter() - start
+        pipeline.remove_artifacts(str(workdir / "upload.pdf"))
+
+    print(f"time saved:                  {(1 - incremental_time / full_time) * 100:.1f}%")
+    print(
+        f"embed/index time saved:      "
+        f"{(1 - (incremental_time - parse_time) / (full_time - parse_time)) * 100:.1f}%  "
+        f"(parsing {parse_time:.2f}s in both)"
+    )
+    shutdown_executor()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--pages", type=int, default=300)
+    parser.add_argument("--edits", type=int, default=3)
+    args = parser.parse_args()
+    asyncio.run(main(args.pages, args.edits))
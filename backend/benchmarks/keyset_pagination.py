@@ -0,0 +1,127 @@
+"""
+Benchmark: paging a long chat history with keyset cursors vs. OFFSET.
+
+Seeds an in-memory SQLite database (requires httpx and aiosqlite) with one
+session holding N messages and pages through GET /api/chat/messages/{id}
+in-process by following X-Next-Cursor, checking that the pages add up to the
+full history in order. It then times fetching the first and the last page
+with a cursor and with the equivalent LIMIT/OFFSET query, and shows the
+query plan of the keyset query.
+
+Usage (from backend/):
+    python -m benchmarks.keyset_pagination [--messages 50000] [--page-size 50]
+"""
+import argparse
+import asyncio
+import time
+import uuid
+from datetime import datetime, timedelta
+
+import httpx
+from fastapi import Response
+from sqlalchemy import insert, select, text
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+
+from app.api.pagination import NEXT_CURSOR_HEADER, PageParams, encode_cursor, fetch_page
+from app.core.database import Base, get_db
+from app.main import app
+from app.models.database import ChatMessage, ChatSession, User, Workflow
+
+
+async def seed(sessionmaker, messages: int) -> tuple[uuid.UUID, list[uuid.UUID]]:
+    async with sessionmaker() as db:
+        user = User(email="bench@example.com", username="bench", hashed_password="x")
+        workflow = Workflow(name="bench", nodes=[], edges=[], user=user)
+        session = ChatSession(workflow=workflow)
+        db.add(session)
+        await db.commit()
+        start = datetime(2024, 1, 1)
+        # Pairs of messages share a timestamp, so ties are broken by id
+        rows = [
+            {
+                "id": uuid.uuid4(),
+                "session_id": session.id,
+                "role": "user" if i % 2 == 0 else "assistant",
+                "content": f"message {i}",
+                "created_at": start + timedelta(seconds=i // 2),
+            }
+            for i in range(messages)
+        ]
+        await db.execute(insert(ChatMessage), rows)
+        await db.commit()
+        ordered = sorted(rows, key=lambda row: (row["created_at"], str(row["id"])))
+        return session.id, [row["id"] for row in ordered]
+
+
+async def timed(db, query, repeat: int = 20) -> float:
+    start = time.perf_counter()
+    for _ in range(repeat):
+        (await db.execute(query)).all()
+    return (time.perf_counter() - start) / repeat * 1000
+
+
+async def main(messages: int, page_size: int):
+    engine = create_async_engine("sqlite+aiosqlite://")
+    sessionmaker = async_sessionmaker(engine, expire_on_commit=False)
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
+    session_id, expected = await seed(sessionmaker, messages)
+
+    async def override_get_db():
+        async with sessionmaker() as db:
+            yield db
+
+    app.dependency_overrides[get_db] = override_get_db
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+        seen, pages, cursor = [], 0, None
+        start = time.perf_counter()
+        while True:
+            params = {"limit": page_size, **({"cursor": cursor} if cursor else {})}
+            response = await client.get(f"/api/chat/messages/{session_id}", params=params)
+            response.raise_for_status()
+            seen += [uuid.UUID(message["id"]) for message in response.json()]
+            pages += 1
+            cursor = response.headers.get(NEXT_CURSOR_HEADER)
+            if not cursor:
+                break
+        elapsed = time.perf_counter() - start
+        invalid = await client.get(f"/api/chat/messages/{session_id}", params={"cursor": "not-a-cursor"})
+    app.dependency_overrides.clear()
+    print(
+        f"{messages} messages, {pages} pages of {page_size}: {elapsed * 1000 / pages:.2f} ms per page over HTTP, "
+        f"complete and in order: {seen == expected}, bad cursor -> {invalid.status_code}"
+    )
+
+    async with sessionmaker() as db:
+        base = select(ChatMessage.id, ChatMessage.created_at).where(ChatMessage.session_id == session_id)
+        ordered = base.order_by(ChatMessage.created_at, ChatMessage.id)
+        last = (await db.execute(
+            select(ChatMessage.created_at).where(ChatMessage.id == expected[-page_size - 1])
+        )).scalar_one()
+        page = PageParams(cursor=encode_cursor(last, expected[-page_size - 1]), limit=page_size)
+        start = time.perf_counter()
+        for _ in range(20):
+            rows = await fetch_page(db, base, ChatMessage.created_at, ChatMessage.id, page, Response(), descending=False)
+        keyset_last = (time.perf_counter() - start) / 20 * 1000
+        assert [row.id for row in rows] == expected[-page_size:]
+
+        first = await timed(db, ordered.limit(page_size))
+        offset_last = await timed(db, ordered.limit(page_size).offset(messages - page_size))
+        print(f"first page            {first:7.2f} ms")
+        print(f"last page, keyset     {keyset_last:7.2f} ms")
+        print(f"last page, OFFSET     {offset_last:7.2f} ms")
+        plan = await db.execute(text(
+            "EXPLAIN QUERY PLAN SELECT id FROM chat_messages WHERE session_id = :s "
+            "AND (created_at, id) > (:c, :i) ORDER BY created_at, id LIMIT 51"
+        ), {"s": session_id.hex, "c": last, "i": expected[-page_size - 1].hex})
+        print("keyset plan:", "; ".join(row[-1] for row in plan))
+    await engine.dispose()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--messages", type=int, default=50000)
+    parser.add_argument("--page-size", type=int, default=50)
+    args = parser.parse_args()
+    asyncio.run(main(args.messages, args.page_size))
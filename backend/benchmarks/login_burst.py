@@ -0,0 +1,123 @@
+"""
+Load test: /api/health latency during a burst of logins.
+
+Runs the app in-process against an in-memory SQLite database (requires httpx
+and aiosqlite). While N concurrent POST /api/auth/login requests verify a
+bcrypt hash, /api/health is probed continuously: first with hashing in the
+password pool, then with the old behaviour of calling bcrypt on the event
+loop. Probe latency is measured from when each check was due, so time spent
+waiting for a blocked event loop is included. The seeded hash uses a lower
+cost than BCRYPT_ROUNDS, so the first login also shows the transparent rehash.
+
+Usage (from backend/):
+    python -m benchmarks.login_burst [--logins 20]
+"""
+import argparse
+import asyncio
+import statistics
+import time
+
+import httpx
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+
+from app.api.routes import auth
+from app.core.database import Base, get_db
+from app.core.executor import shutdown_executor
+from app.core.security import pwd_context
+from app.main import app
+from app.models.database import User
+
+EMAIL = "bench@example.com"
+PASSWORD = "correct horse battery staple"
+
+
+async def blocking_verify(plain_password: str, hashed_password: str):
+    """Pre-pool behaviour: bcrypt runs on the event loop."""
+    return pwd_context.verify_and_update(plain_password, hashed_password)
+
+
+async def probe_health(client: httpx.AsyncClient, stop: asyncio.Event) -> list[float]:
+    """Health check every 10 ms; latency counts from when it was due, so loop stalls show."""
+    latencies = []
+    due = time.perf_counter()
+    while not stop.is_set():
+        await client.get("/api/health/")
+        latencies.append((time.perf_counter() - due) * 1000)
+        due = time.perf_counter() + 0.01
+        await asyncio.sleep(0.01)
+    return latencies
+
+
+async def burst(client: httpx.AsyncClient, logins: int) -> tuple[list[float], float]:
+    stop = asyncio.Event()
+    prober = asyncio.create_task(probe_health(client, stop))
+    await asyncio.sleep(0.05)
+    start = time.perf_counter()
+    responses = await asyncio.gather(*(
+        client.post("/api/auth/login", json={"email": EMAIL, "password": PASSWORD})
+        for _ in range(logins)
+    ))
+    elapsed = time.perf_counter() - start
+    stop.set()
+    assert all(response.status_code == 200 for response in responses)
+    return await prober, elapsed
+
+
+def summarize(label: str, latencies: list[float], elapsed: float = None):
+    p99 = statistics.quantiles(latencies, n=100, method="inclusive")[98] if len(latencies) > 1 else max(latencies)
+    burst_time = f"  burst {elapsed * 1000:7.0f} ms" if elapsed is not None else ""
+    print(
+        f"{label:<18} samples={len(latencies):<4} p50={statistics.median(latencies):7.1f}ms "
+        f"p99={p99:7.1f}ms max={max(latencies):7.1f}ms{burst_time}"
+    )
+
+
+async def main(logins: int):
+    engine = create_async_engine("sqlite+aiosqlite://")
+    sessionmaker = async_sessionmaker(engine, expire_on_commit=False)
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
+    rounds = pwd_context.to_dict()["bcrypt__rounds"]
+    async with sessionmaker() as db:
+        db.add(User(
+            email=EMAIL,
+            username="bench",
+            hashed_password=pwd_context.hash(PASSWORD, rounds=max(4, rounds - 2))
+        ))
+        await db.commit()
+
+    async def override_get_db():
+        async with sessionmaker() as session:
+            yield session
+
+    app.dependency_overrides[get_db] = override_get_db
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+        await client.post("/api/auth/login", json={"email": EMAIL, "password": PASSWORD})
+        async with sessionmaker() as db:
+            stored = (await db.execute(select(User.hashed_password))).scalar_one()
+        print(f"bcrypt cost {rounds}, seeded hash cost {rounds - 2}, after first login cost {stored.split('$')[2]}")
+
+        stop = asyncio.Event()
+        prober = asyncio.create_task(probe_health(client, stop))
+        await asyncio.sleep(0.5)
+        stop.set()
+        summarize("idle", await prober)
+
+        summarize(f"pooled x{logins}", *await burst(client, logins))
+        pooled = auth.averify_and_update_password
+        auth.averify_and_update_password = blocking_verify
+        summarize(f"on-loop x{logins}", *await burst(client, logins))
+        auth.averify_and_update_password = pooled
+
+    app.dependency_overrides.clear()
+    await engine.dispose()
+    shutdown_executor()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--logins", type=int, default=20)
+    args = parser.parse_args()
+    asyncio.run(main(args.logins))
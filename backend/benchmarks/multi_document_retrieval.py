@@ -0,0 +1,94 @@
+"""
+Benchmark: knowledge-base retrieval latency vs. number of workflow documents.
+
+Compares searching each document's namespace one after another with
+VectorBackend.asearch_collections (concurrent searches, merged top-k, per
+request deadline). The vector backend is a fake with a fixed per-query
+latency; one namespace can be made slow to show the deadline dropping it.
+
+Usage (from backend/):
+    python -m benchmarks.multi_document_retrieval [--latency 0.05] [--timeout 0.5]
+"""
+import argparse
+import asyncio
+import heapq
+import itertools
+import random
+import time
+
+from langchain_core.documents import Document
+
+from app.core.config import get_settings
+from app.core.executor import shutdown_executor
+from app.services.vector_backend import VectorBackend
+
+SLOW = "slow"
+_queries = itertools.count()
+
+
+class FakeEmbeddings:
+    async def aembed_query(self, query: str) -> list[float]:
+        return [random.random() for _ in range(8)]
+
+
+class FakeBackend(VectorBackend):
+    """Blocking per-namespace search with fixed latency, like a Pinecone query."""
+
+    def __init__(self, latency: float):
+        super().__init__(embeddings=FakeEmbeddings())
+        self.latency = latency
+
+    def similarity_search_by_vector_with_score(self, collection_name, embedding, k=5):
+        time.sleep(self.latency * (40 if collection_name == SLOW else 1))
+        return [
+            (Document(page_content=f"{collection_name}-{i}", metadata={}), random.random())
+            for i in range(k)
+        ]
+
+    def upsert_vectors(self, *args, **kwargs): ...
+    def list_ids(self, *args, **kwargs): ...
+    def fetch_vectors(self, *args, **kwargs): ...
+    def delete_vectors(self, *args, **kwargs): ...
+    def delete_collection(self, *args, **kwargs): ...
+    def collection_exists(self, *args, **kwargs): ...
+
+
+async def sequential(store: FakeBackend, names: list[str], k: int) -> list[Document]:
+    docs = []
+    for name in names:
+        docs.extend(await store.asimilarity_search(name, f"query {next(_queries)}", k=k))
+    return heapq.nlargest(k, docs, key=lambda doc: doc.metadata["score"])
+
+
+async def main(latency: float, timeout: float, k: int):
+    store = FakeBackend(latency)
+    print(f"per-namespace latency {latency * 1000:.0f} ms, blocking pool {get_settings().blocking_pool_size} threads")
+    for count in (1, 4, 16, 32, 64):
+        names = [f"doc{i}" for i in range(count)]
+
+        start = time.perf_counter()
+        await sequential(store, names, k)
+        sequential_ms = (time.perf_counter() - start) * 1000
+
+        start = time.perf_counter()
+        docs, dropped = await store.asearch_collections(names, f"query {next(_queries)}", k=k, timeout=timeout)
+        concurrent_ms = (time.perf_counter() - start) * 1000
+        print(f"{count:3d} documents  sequential {sequential_ms:8.1f} ms  concurrent {concurrent_ms:7.1f} ms  top-{len(docs)}")
+
+    names = [f"doc{i}" for i in range(15)] + [SLOW]
+    start = time.perf_counter()
+    docs, dropped = await store.asearch_collections(names, f"query {next(_queries)}", k=k, timeout=timeout)
+    print(
+        f"with one slow namespace ({latency * 40 * 1000:.0f} ms), deadline {timeout * 1000:.0f} ms: "
+        f"{(time.perf_counter() - start) * 1000:.1f} ms, dropped {dropped}, top-{len(docs)}"
+    )
+    shutdown_executor()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--latency", type=float, default=0.05)
+    parser.add_argument("--timeout", type=float, default=0.5)
+    parser.add_argument("--k", type=int, default=5)
+    args = parser.parse_args()
+    asyncio.run(main(args.latency, args.timeout, args.k))
@@ -0,0 +1,74 @@
+"""
+Benchmark the workflow transitive reduction against the previous per-edge BFS.
+
+Usage (from backend/):
+    python -m benchmarks.transitive_reduction
+"""
+import random
+import time
+
+from app.workflow.topology import transitive_reduction
+
+
+def naive_reduction(adjacency: dict) -> dict:
+    """Per-edge BFS reduction used by WorkflowGraphBuilder before the bitset engine."""
+    pruned_adj = {k: list(v) for k, v in adjacency.items()}
+
+    def has_path(start, end, current_adj):
+        queue = [start]
+        visited = set()
+        while queue:
+            node = queue.pop(0)
+            if node == end:
+                return True
+            if node in visited:
+                continue
+            visited.add(node)
+            queue.extend(current_adj.get(node, []))
+        return False
+
+    for source in list(adjacency.keys()):
+        for target in list(adjacency[source]):
+            if target in pruned_adj.get(source, []):
+                pruned_adj[source].remove(target)
+                if not has_path(source, target, pruned_adj):
+                    pruned_adj[source].append(target)
+    return pruned_adj
+
+
+def random_dag(num_nodes: int, edge_factor: int = 3, seed: int = 0) -> dict:
+    """Random DAG with roughly edge_factor * num_nodes forward edges."""
+    rng = random.Random(seed)
+    nodes = [f"node_{i}" for i in range(num_nodes)]
+    adjacency = {}
+    for _ in range(edge_factor * num_nodes):
+        a, b = sorted(rng.sample(range(num_nodes), 2))
+        adjacency.setdefault(nodes[a], [])
+        if nodes[b] not in adjacency[nodes[a]]:
+            adjacency[nodes[a]].append(nodes[b])
+    return adjacency
+
+
+def timed(fn, adjacency: dict, repeat: int) -> tuple[float, dict]:
+    start = time.perf_counter()
+    for _ in range(repeat):
+        result = fn(adjacency)
+    return (time.perf_counter() - start) / repeat, result
+
+
+def main():
+    print(f"{'nodes':>6} {'edges':>6} {'bitset (ms)':>12} {'naive (ms)':>12} {'speedup':>8}")
+    for num_nodes in (10, 100, 1000):
+        adjacency = random_dag(num_nodes)
+        edge_count = sum(len(targets) for targets in adjacency.values())
+        repeat = 50 if num_nodes < 1000 else 3
+
+        fast, fast_result = timed(transitive_reduction, adjacency, repeat)
+        slow, slow_result = timed(naive_reduction, adjacency, 1 if num_nodes >= 1000 else repeat)
+
+        assert {k: set(v) for k, v in fast_result.items()} == {k: set(v) for k, v in slow_result.items()}
+        print(f"{num_nodes:>6} {edge_count:>6} {fast * 1000:>12.3f} {slow * 1000:>12.3f} {slow / fast:>7.1f}x")
+
+
+if __name__ == "__main__":
+    main()
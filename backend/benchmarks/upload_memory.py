@@ -0,0 +1,80 @@
+"""
+Benchmark: peak memory while storing a large upload.
+
+Writes a synthetic PDF of the requested size, wraps it in an UploadFile the
+way Starlette hands spooled uploads to the route, and measures peak Python
+heap allocation (tracemalloc) for save_upload versus the old
+read-everything-then-write approach.
+
+Usage (from backend/):
+    python -m benchmarks.upload_memory [--size-mb 500] [--skip-baseline]
+"""
+import argparse
+import asyncio
+import os
+import tempfile
+import time
+import tracemalloc
+from pathlib import Path
+
+from starlette.datastructures import UploadFile
+
+from app.core.config import get_settings
+from app.core.executor import shutdown_executor
+from app.ingestion.upload import save_upload
+
+
+def make_pdf(path: Path, size_mb: int):
+    block = b"%% filler stream content for upload benchmark\n" * 1024
+    with open(path, "wb") as f:
+        f.write(b"%PDF-1.4\n")
+        remaining = size_mb * 1024 * 1024
+        while remaining > 0:
+            f.write(block[:remaining])
+            remaining -= len(block)
+        f.write(b"\n%%EOF\n")
+
+
+async def read_all(upload: UploadFile, destination: Path):
+    content = await upload.read()
+    with open(destination, "wb") as f:
+        f.write(content)
+
+
+async def streamed(upload: UploadFile, destination: Path):
+    await save_upload(upload, destination, max_bytes=0, chunk_size=get_settings().upload_chunk_size)
+
+
+async def measure(label: str, source: Path, workdir: Path, store):
+    with open(source, "rb") as f:
+        upload = UploadFile(file=f, filename="bench.pdf", size=source.stat().st_size)
+        destination = workdir / f"{label}.pdf"
+        tracemalloc.start()
+        start = time.perf_counter()
+        await store(upload, destination)
+        elapsed = time.perf_counter() - start
+        _, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+    destination.unlink()
+    print(f"{label:<10} peak={peak / 1024 / 1024:8.1f} MB  time={elapsed:6.2f}s")
+
+
+async def main(size_mb: int, skip_baseline: bool):
+    with tempfile.TemporaryDirectory() as tmp:
+        workdir = Path(tmp)
+        source = workdir / "source.pdf"
+        make_pdf(source, size_mb)
+        print(f"upload size: {os.path.getsize(source) / 1024 / 1024:.0f} MB")
+
+        await measure("streamed", source, workdir, streamed)
+        if not skip_baseline:
+            await measure("read-all", source, workdir, read_all)
+    shutdown_executor()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--size-mb", type=int, default=500)
+    parser.add_argument("--skip-baseline", action="store_true")
+    args = parser.parse_args()
+    asyncio.run(main(args.size_mb, args.skip_baseline))
@@ -0,0 +1,97 @@
+"""
+Benchmark: recall vs. latency of the local vector store.
+
+Loads clustered synthetic embeddings into two LocalVectorStore collections:
+one below the HNSW threshold (exact NumPy search) and one above it (HNSW).
+Queries are noisy copies of stored vectors. Reports, for each ef_search,
+recall@k of HNSW against the exact results and per-query latency, then
+reopens the HNSW collection from its files and checks the results match.
+
+Usage (from backend/):
+    python -m benchmarks.vector_recall [--vectors 10000] [--dim 384] [--queries 200] [--k 10]
+"""
+import argparse
+import statistics
+import tempfile
+import time
+
+import numpy as np
+
+from app.core.config import get_settings
+from app.services.local_vector_store import LocalVectorStore
+
+EF_SEARCH = (16, 32, 64, 128, 256)
+BATCH = 500
+
+
+def clustered(n: int, dim: int, clusters: int, rng: np.random.Generator) -> np.ndarray:
+    centers = rng.normal(size=(clusters, dim))
+    return (centers[rng.integers(0, clusters, n)] + rng.normal(size=(n, dim))).astype(np.float32)
+
+
+def load(store: LocalVectorStore, collection: str, vectors: np.ndarray) -> float:
+    start = time.perf_counter()
+    for offset in range(0, len(vectors), BATCH):
+        batch = vectors[offset:offset + BATCH]
+        ids = [str(offset + i) for i in range(len(batch))]
+        store.upsert_vectors(collection, ids, batch, [{"text": vector_id} for vector_id in ids])
+    return time.perf_counter() - start
+
+
+def run_queries(store: LocalVectorStore, collection: str, queries: np.ndarray, k: int) -> tuple[list, list]:
+    results, latencies = [], []
+    for query in queries:
+        start = time.perf_counter()
+        hits = store.search_rows(collection, query, k)
+        latencies.append((time.perf_counter() - start) * 1000)
+        results.append([vector_id for _, vector_id in hits])
+    return results, latencies
+
+
+def describe(latencies: list[float]) -> str:
+    p95 = sorted(latencies)[int(len(latencies) * 0.95) - 1]
+    return f"p50 {statistics.median(latencies):7.2f} ms  p95 {p95:7.2f} ms"
+
+
+def main(n: int, dim: int, num_queries: int, k: int, clusters: int):
+    rng = np.random.default_rng(0)
+    vectors = clustered(n, dim, clusters, rng)
+    queries = vectors[rng.integers(0, n, num_queries)] + 0.5 * rng.normal(size=(num_queries, dim)).astype(np.float32)
+    settings = get_settings()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        settings.local_hnsw_min_vectors = n + 1
+        exact_store = LocalVectorStore(path=tmp)
+        exact_build = load(exact_store, "exact", vectors)
+
+        settings.local_hnsw_min_vectors = 0
+        hnsw_store = LocalVectorStore(path=tmp)
+        hnsw_build = load(hnsw_store, "hnsw", vectors)
+        print(f"{n} vectors x {dim} dims, {clusters} clusters, {num_queries} queries, k={k}")
+        print(f"load: exact {exact_build:.1f}s, hnsw {hnsw_build:.1f}s (m={settings.local_hnsw_m}, ef_construction={settings.local_hnsw_ef_construction})")
+
+        truth, latencies = run_queries(exact_store, "exact", queries, k)
+        print(f"exact            recall 1.000  {describe(latencies)}")
+
+        for ef in EF_SEARCH:
+            hnsw_store._ef_search = ef
+            found, latencies = run_queries(hnsw_store, "hnsw", queries, k)
+            recall = statistics.mean(len(set(a) & set(b)) / k for a, b in zip(found, truth))
+            print(f"hnsw ef={ef:<4}      recall {recall:.3f}  {describe(latencies)}")
+
+        LocalVectorStore._collections.clear()
+        reopened = LocalVectorStore(path=tmp)
+        reopened._ef_search = hnsw_store._ef_search
+        print(f"reopened from disk, same results: {run_queries(reopened, 'hnsw', queries, k)[0] == found}")
+        LocalVectorStore._collections.clear()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--vectors", type=int, default=10000)
+    parser.add_argument("--dim", type=int, default=384)
+    parser.add_argument("--queries", type=int, default=200)
+    parser.add_argument("--k", type=int, default=10)
+    parser.add_argument("--clusters", type=int, default=100)
+    args = parser.parse_args()
+    main(args.vectors, args.dim, args.queries, args.k, args.clusters)
@@ -0,0 +1,44 @@
+"""
+Alembic environment.
+
+init_db passes its own connection in config.attributes["connection"]; the
+alembic CLI connects with the application's engine (DATABASE_URL and its SSL
+settings).
+"""
+import asyncio
+from logging.config import fileConfig
+
+from alembic import context
+
+from app.core.database import Base, engine
+import app.models.database  # noqa: F401  registers the models on Base.metadata
+
+config = context.config
+if config.config_file_name is not None and config.attributes.get("connection") is None:
+    fileConfig(config.config_file_name)
+
+target_metadata = Base.metadata
+
+
+def run_migrations(connection):
+    context.configure(connection=connection, target_metadata=target_metadata)
+    with context.begin_transaction():
+        context.run_migrations()
+
+
+async def run_migrations_online():
+    if engine is None:
+        raise RuntimeError("DATABASE_URL is not set")
+    async with engine.connect() as connection:
+        await connection.run_sync(run_migrations)
+    await engine.dispose()
+
+
+if context.is_offline_mode():
+    context.configure(url=str(engine.url) if engine is not None else None, target_metadata=target_metadata, literal_binds=True)
+    with context.begin_transaction():
+        context.run_migrations()
+elif config.attributes.get("connection") is not None:
+    run_migrations(config.attributes["connection"])
+else:
+    asyncio.run(run_migrations_online())
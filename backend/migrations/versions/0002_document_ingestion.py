@@ -0,0 +1,75 @@
+"""Document ingestion queue, content dedup and replacement columns; listing indexes
+
+Revision ID: 0002
+Revises: 0001
+Create Date: 2026-10-17
+
+Columns and indexes that already exist are skipped: earlier releases asked
+for some of them to be added by hand.
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision: str = "0002"
+down_revision: Union[str, None] = "0001"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def document_columns() -> list[sa.Column]:
+    """New columns of documents (fresh objects: a Column belongs to one table)."""
+    return [
+        sa.Column("size_bytes", sa.BigInteger(), nullable=True),
+        sa.Column("content_hash", sa.String(64), nullable=True),
+        sa.Column("ref_count", sa.Integer(), nullable=False, server_default="1"),
+        # Documents ingested before the queue existed are ready.
+        sa.Column("status", sa.String(20), nullable=False, server_default="ready"),
+        sa.Column("progress", sa.Integer(), nullable=False, server_default="0"),
+        sa.Column("error", sa.Text(), nullable=True),
+        sa.Column("attempts", sa.Integer(), nullable=False, server_default="0"),
+        sa.Column("locked_at", sa.DateTime(), nullable=True),
+        sa.Column("updated_at", sa.DateTime(), nullable=True),
+        sa.Column("embedding_provider", sa.String(50), nullable=True),
+        sa.Column("embedding_model", sa.String(100), nullable=True),
+        sa.Column("embedding_api_key", sa.Text(), nullable=True),
+        sa.Column("replacement_path", sa.String(512), nullable=True),
+        sa.Column("replacement_filename", sa.String(255), nullable=True),
+        sa.Column("replacement_hash", sa.String(64), nullable=True),
+        sa.Column("replacement_size", sa.BigInteger(), nullable=True),
+        sa.Column("replacement_collection", sa.String(255), nullable=True),
+    ]
+
+
+# (name, table, columns)
+INDEXES = [
+    ("ix_documents_collection_name", "documents", ["collection_name"]),
+    ("ix_documents_content_hash", "documents", ["content_hash"]),
+    ("ix_documents_status", "documents", ["status"]),
+    ("ix_documents_workflow_id_created_at", "documents", ["workflow_id", "created_at"]),
+    ("ix_workflows_user_id_updated_at", "workflows", ["user_id", "updated_at"]),
+    ("ix_chat_sessions_workflow_id_created_at", "chat_sessions", ["workflow_id", "created_at"]),
+    ("ix_chat_messages_session_id_created_at", "chat_messages", ["session_id", "created_at"]),
+]
+
+
+def upgrade() -> None:
+    inspector = sa.inspect(op.get_bind())
+    existing = {column["name"] for column in inspector.get_columns("documents")}
+    for column in document_columns():
+        if column.name not in existing:
+            op.add_column("documents", column)
+
+    for name, table, columns in INDEXES:
+        if name not in {index["name"] for index in inspector.get_indexes(table)}:
+            op.create_index(name, table, columns)
+
+
+def downgrade() -> None:
+    for name, table, _ in reversed(INDEXES):
+        op.drop_index(name, table_name=table)
+    with op.batch_alter_table("documents") as batch:
+        for column in reversed(document_columns()):
+            batch.drop_column(column.name)
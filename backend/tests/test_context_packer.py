@@ -0,0 +1,26 @@
+from app.services.context_packer import dedupe_chunks
+
+
+def test_replacement_is_checked_against_later_chunks():
+    a = "A" * 50 + "B" * 50
+    b = "B" * 50 + "C" * 50
+    c = "X" * 40 + "A" * 50 + "B" * 50 + "C" * 50
+    chunks = [{"text": a, "score": 0.9}, {"text": b, "score": 0.8}, {"text": c, "score": 0.7}]
+
+    kept, dropped = dedupe_chunks(chunks)
+
+    assert [chunk["text"] for chunk in kept] == [c]
+    assert kept[0]["score"] == 0.9
+    assert dropped == 2
+
+
+def test_replacement_trims_overlap_with_later_chunks():
+    a = "A" * 50
+    b = "B" * 50 + "D" * 40
+    c = "A" * 50 + "B" * 50
+    chunks = [{"text": a, "score": 0.9}, {"text": b, "score": 0.8}, {"text": c, "score": 0.7}]
+
+    kept, dropped = dedupe_chunks(chunks)
+
+    assert [chunk["text"] for chunk in kept] == [c, "D" * 40]
+    assert dropped == 1
@@ -0,0 +1,50 @@
+import asyncio
+
+import pytest
+
+from app.services.embedding_scheduler import EmbeddingScheduler
+
+
+class SlowEmbeddings:
+    """Blocks every request until released, then returns one-dimensional vectors."""
+
+    def __init__(self):
+        self.started = asyncio.Event()
+        self.finish = asyncio.Event()
+
+    async def aembed_documents(self, texts):
+        self.started.set()
+        await self.finish.wait()
+        return [[float(len(text))] for text in texts]
+
+
+class FailingEmbeddings:
+    async def aembed_documents(self, texts):
+        raise ValueError("bad request")
+
+
+def test_cancelled_batch_releases_its_slot():
+    async def scenario():
+        embeddings = SlowEmbeddings()
+        scheduler = EmbeddingScheduler(embeddings, max_concurrency=1)
+        task = asyncio.create_task(scheduler.embed(["a", "b"]))
+        await embeddings.started.wait()
+        task.cancel()
+        await asyncio.gather(task, return_exceptions=True)
+        assert scheduler._in_flight == 0
+
+        embeddings.finish.set()
+        return await asyncio.wait_for(scheduler.embed(["abc"]), timeout=1)
+
+    assert asyncio.run(scenario()) == [[3.0]]
+
+
+def test_failed_batch_releases_its_slot():
+    async def scenario():
+        scheduler = EmbeddingScheduler(FailingEmbeddings(), max_concurrency=2)
+        for _ in range(3):
+            with pytest.raises(ValueError):
+                await asyncio.wait_for(scheduler.embed(["a"]), timeout=1)
+        return scheduler._in_flight
+
+    assert asyncio.run(scenario()) == 0
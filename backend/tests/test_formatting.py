@@ -0,0 +1,14 @@
+from app.services.formatting import format_markdown
+
+
+def test_code_fences_are_left_untouched():
+    code = "```python\n* not a bullet\nName:\n\n\n\nprint(1)\n```"
+    assert format_markdown(f"Intro\n{code}\n\n\n\nAfter") == f"Intro\n{code}\n\nAfter"
+
+
+def test_only_label_lines_are_bolded_and_keep_their_colon():
+    text = "Summary:\nAll good.\nHere is the code:\n```\nx = 1\n```\nSteps to reproduce:\n* run it"
+    assert format_markdown(text) == (
+        "**Summary:**\n\nAll good.\nHere is the code:\n```\nx = 1\n```\n"
+        "\n**Steps to reproduce:**\n\n- run it"
+    )
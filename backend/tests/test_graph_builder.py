@@ -0,0 +1,22 @@
+from app.workflow.cache import topology_hash
+from app.workflow.graph import WorkflowGraphBuilder
+
+
+def workflow(use_web_search):
+    nodes = [
+        {"id": "q", "type": "userQuery", "data": {"config": {}}},
+        {"id": "llm", "type": "llmEngine", "data": {"config": {"use_web_search": use_web_search}}},
+        {"id": "out", "type": "output", "data": {"config": {}}},
+    ]
+    edges = [{"source": "q", "target": "llm"}, {"source": "llm", "target": "out"}]
+    return nodes, edges
+
+
+def test_web_search_node_only_when_the_llm_searches_the_web():
+    builder = WorkflowGraphBuilder()
+    without = builder.build_from_config(*workflow(False)).get_graph().nodes
+    with_search = builder.build_from_config(*workflow(True)).get_graph().nodes
+
+    assert "llm__web_search" not in without
+    assert "llm__web_search" in with_search
+    assert topology_hash(*workflow(False)) != topology_hash(*workflow(True))
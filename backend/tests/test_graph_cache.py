@@ -0,0 +1,23 @@
+from app.workflow.cache import CompiledGraphCache
+
+
+def topology(n):
+    return [{"id": f"node-{n}", "type": "llmEngine"}], []
+
+
+def test_workflow_index_drops_evicted_graphs():
+    cache = CompiledGraphCache(maxsize=2)
+    for n in range(50):
+        cache.get_or_build(*topology(n), build=lambda nodes, edges: object(), workflow_id=f"wf-{n % 5}")
+
+    assert sum(len(keys) for keys in cache._keys_by_workflow.values()) == 2
+    assert len(cache._workflows_by_key) == 2
+
+
+def test_invalidate_drops_the_workflows_graphs():
+    cache = CompiledGraphCache(maxsize=4)
+    graph = cache.get_or_build(*topology(1), build=lambda nodes, edges: object(), workflow_id="wf")
+    cache.invalidate("wf")
+
+    assert cache.get_or_build(*topology(1), build=lambda nodes, edges: object()) is not graph
+    assert cache._keys_by_workflow == {} and cache._workflows_by_key == {}
@@ -0,0 +1,34 @@
+import asyncio
+import uuid
+
+from app.ingestion.worker import IngestionWorkerPool
+
+
+def test_worker_survives_a_failing_job():
+    async def scenario():
+        pool = IngestionWorkerPool(workers=1, poll_interval=0.01)
+        jobs = [uuid.uuid4(), uuid.uuid4()]
+        queue = list(jobs)
+        processed = []
+        done = asyncio.Event()
+
+        async def claim_job():
+            return queue.pop(0) if queue else None
+
+        async def process(document_id):
+            if document_id == jobs[0]:
+                raise ConnectionError("database went away")
+            processed.append(document_id)
+            done.set()
+
+        pool._claim_job = claim_job
+        pool._process = process
+        worker = asyncio.create_task(pool._run_worker(0))
+        try:
+            await asyncio.wait_for(done.wait(), timeout=1)
+        finally:
+            worker.cancel()
+        return processed, jobs
+
+    processed, jobs = asyncio.run(scenario())
+    assert processed == [jobs[1]]
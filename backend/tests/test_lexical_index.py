@@ -0,0 +1,49 @@
+import asyncio
+
+from langchain_core.documents import Document
+
+from app.services import hybrid_search as hybrid
+from app.services.lexical_index import LexicalIndexStore
+
+
+def chunks(*texts):
+    return [{"hash": str(n), "page_content": text, "metadata": {"n": n}} for n, text in enumerate(texts)]
+
+
+def test_open_index_reads_its_own_version_after_rebuild(tmp_path):
+    store = LexicalIndexStore(str(tmp_path))
+    store.build("docs", chunks("short", "order SKU-1234 shipped"))
+    index = store.get("docs")
+    (_, number), = index.search("SKU-1234", k=1)
+
+    store.build("docs", chunks("a much longer first chunk that shifts every byte offset", "unrelated"))
+
+    assert index.read([number])[0]["page_content"] == "order SKU-1234 shipped"
+    assert store.get("docs") is not index
+
+
+class RecordingVectorStore:
+    def __init__(self):
+        self.searched = []
+
+    async def asearch_collections(self, collection_names, query, embeddings, k, timeout=None):
+        self.searched.append(list(collection_names))
+        return [Document(page_content="from vectors", metadata={})], []
+
+
+def test_fast_path_skipped_when_a_collection_has_no_lexical_index(tmp_path, monkeypatch):
+    store = LexicalIndexStore(str(tmp_path))
+    store.build("indexed", chunks("order SKU-1234 shipped"))
+    monkeypatch.setattr(hybrid, "lexical_indexes", store)
+    vector_store = RecordingVectorStore()
+
+    def search(collections):
+        return asyncio.run(hybrid.hybrid_search(vector_store, collections, "SKU-1234", None, k=2, mode="hybrid"))
+
+    docs, info = search(["indexed"])
+    assert info["mode"] == "lexical" and vector_store.searched == []
+
+    docs, info = search(["indexed", "legacy"])
+    assert info["mode"] == "hybrid"
+    assert vector_store.searched == [["indexed", "legacy"]]
+    assert {doc.page_content for doc in docs} == {"order SKU-1234 shipped", "from vectors"}
@@ -0,0 +1,57 @@
+import uuid
+
+import pytest
+from alembic import command
+from alembic.autogenerate import compare_metadata
+from alembic.migration import MigrationContext
+from sqlalchemy import create_engine, inspect, text
+
+from app.core.database import BASELINE_REVISION, Base, alembic_config, migrate
+import app.models.database  # noqa: F401
+
+
+@pytest.fixture
+def engine(tmp_path):
+    engine = create_engine(f"sqlite:///{tmp_path / 'db.sqlite'}")
+    yield engine
+    engine.dispose()
+
+
+def schema_differences(connection) -> list:
+    # Column types are not compared: SQLite reflects UUID columns as NUMERIC.
+    context = MigrationContext.configure(connection, opts={"compare_type": False})
+    return compare_metadata(context, Base.metadata)
+
+
+def test_fresh_database_matches_the_models(engine):
+    with engine.begin() as connection:
+        migrate(connection)
+        assert schema_differences(connection) == []
+
+
+def test_database_from_before_migrations_is_upgraded(engine):
+    with engine.begin() as connection:
+        # What create_all left behind: the baseline tables, no version table.
+        command.upgrade(alembic_config(connection), BASELINE_REVISION)
+        connection.execute(text("DROP TABLE alembic_version"))
+        # Some columns were added by hand, as earlier releases asked.
+        connection.execute(text("ALTER TABLE documents ADD COLUMN content_hash VARCHAR(64)"))
+        connection.execute(text(
+            "INSERT INTO users (id, email, username, hashed_password) VALUES (:id, 'a@b', 'a', 'x')"
+        ), {"id": uuid.uuid4().hex})
+        user_id = connection.execute(text("SELECT id FROM users")).scalar()
+        connection.execute(text(
+            "INSERT INTO workflows (id, name, nodes, edges, user_id) VALUES (:id, 'w', '[]', '[]', :user)"
+        ), {"id": uuid.uuid4().hex, "user": user_id})
+        workflow_id = connection.execute(text("SELECT id FROM workflows")).scalar()
+        connection.execute(text(
+            "INSERT INTO documents (id, workflow_id, filename, file_path, collection_name) "
+            "VALUES (:id, :workflow, 'a.pdf', 'uploads/a.pdf', 'workflow_a')"
+        ), {"id": uuid.uuid4().hex, "workflow": workflow_id})
+
+    with engine.begin() as connection:
+        migrate(connection)
+        assert schema_differences(connection) == []
+        row = connection.execute(text("SELECT status, ref_count, attempts FROM documents")).one()
+        assert tuple(row) == ("ready", 1, 0)
+        assert "ix_documents_content_hash" in {index["name"] for index in inspect(connection).get_indexes("documents")}
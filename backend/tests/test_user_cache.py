@@ -0,0 +1,36 @@
+import uuid
+
+from app.models.database import User
+from app.services.user_cache import UserCache
+
+
+def make_user():
+    return User(id=uuid.uuid4(), email="a@example.com", username="a", is_active=True)
+
+
+def test_lookup_racing_an_invalidation_is_not_stored():
+    cache = UserCache(maxsize=4)
+    user = make_user()
+    token = cache.generation(user.id)
+    cache.invalidate(user.id)
+    cache.set(user, token)
+    assert cache.get(user.id) is None
+
+    cache.set(user, cache.generation(user.id))
+    assert cache.get(user.id).email == "a@example.com"
+
+
+def test_invalidation_bookkeeping_stays_bounded():
+    cache = UserCache(maxsize=4)
+    raced = make_user()
+    token = cache.generation(raced.id)
+    cache.invalidate(raced.id)
+
+    for _ in range(100):
+        cache.generation(uuid.uuid4())
+        cache.invalidate(uuid.uuid4())
+    assert len(cache._invalidated) == 4
+
+    # Its invalidation was pruned, but the stale lookup is still refused.
+    cache.set(raced, token)
+    assert cache.get(raced.id) is None
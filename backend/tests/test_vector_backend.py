@@ -0,0 +1,85 @@
+import asyncio
+import threading
+import uuid
+
+from langchain_core.documents import Document
+
+from app.core.config import get_settings
+from app.services.vector_backend import VectorBackend
+
+
+class QueryEmbeddings:
+    model = "test"
+
+    async def aembed_query(self, query):
+        return [1.0, 0.0]
+
+
+class StuckBackend(VectorBackend):
+    """Every search blocks its thread until released; counts searches started."""
+
+    def __init__(self):
+        super().__init__(QueryEmbeddings(), 2)
+        self.release = threading.Event()
+        self.started = 0
+        self._lock = threading.Lock()
+
+    def similarity_search_by_vector_with_score(self, collection_name, embedding, k=5):
+        with self._lock:
+            self.started += 1
+        self.release.wait(5)
+        return [(Document(page_content=collection_name), 1.0)]
+
+    def upsert_vectors(self, collection_name, ids, vectors, metadatas):
+        pass
+
+    def list_ids(self, collection_name):
+        return []
+
+    def fetch_vectors(self, collection_name, ids, batch_size=100):
+        return {}
+
+    def delete_vectors(self, collection_name, ids, batch_size=1000):
+        pass
+
+    def delete_collection(self, collection_name, embeddings=None):
+        pass
+
+    def collection_exists(self, collection_name):
+        return True
+
+
+def test_searches_past_the_deadline_hold_at_most_the_concurrency_limit():
+    settings = get_settings()
+    backend = StuckBackend()
+    collections = [f"c-{uuid.uuid4().hex}" for _ in range(settings.blocking_pool_size * 2)]
+
+    async def request(names):
+        return await backend.asearch_collections(names, f"q {uuid.uuid4()}", k=5, timeout=0.2)
+
+    async def scenario():
+        # Two concurrent requests share the one process-wide limit.
+        half = len(collections) // 2
+        results = await asyncio.gather(request(collections[:half]), request(collections[half:]))
+        await asyncio.sleep(0.2)
+        return results
+
+    try:
+        results = asyncio.run(scenario())
+        assert all(docs == [] for docs, _ in results)
+        assert sorted(name for _, dropped in results for name in dropped) == sorted(collections)
+        assert backend.started == settings.retrieval_concurrency < settings.blocking_pool_size
+    finally:
+        backend.release.set()
+
+
+def test_search_results_do_not_mutate_backend_documents():
+    stored = Document(page_content="chunk", metadata={"source": "a.pdf"})
+
+    class SharedBackend(StuckBackend):
+        def similarity_search_by_vector_with_score(self, collection_name, embedding, k=5):
+            return [(stored, 0.5)]
+
+    docs = SharedBackend().similarity_search_by_vector("c", [1.0, 0.0])
+    assert docs[0].metadata == {"source": "a.pdf", "score": 0.5}
+    assert stored.metadata == {"source": "a.pdf"}
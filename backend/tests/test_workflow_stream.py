@@ -0,0 +1,29 @@
+import asyncio
+from types import SimpleNamespace
+
+from app.workflow.graph import WorkflowGraphBuilder
+
+
+class FakeGraph:
+    """Replays a refine call in the output node after the LLM Engine's answer."""
+
+    async def astream_events(self, state, version):
+        for node_id, content in [("llm", "Hel"), ("llm", "lo"), ("out", "**Hello**")]:
+            yield {
+                "event": "on_chat_model_stream",
+                "name": "ChatOpenAI",
+                "metadata": {"langgraph_node": node_id},
+                "data": {"chunk": SimpleNamespace(content=content)},
+            }
+
+
+def test_only_llm_engine_tokens_are_streamed(monkeypatch):
+    builder = WorkflowGraphBuilder()
+    monkeypatch.setattr(builder, "get_compiled", lambda *args, **kwargs: FakeGraph())
+    nodes = [{"id": "llm", "type": "llmEngine"}, {"id": "out", "type": "output"}]
+
+    async def collect():
+        return [event async for event in builder.stream(nodes, [], "hi", {})]
+
+    tokens = [event for event in asyncio.run(collect()) if event["event"] == "token"]
+    assert [(event["node"], event["content"]) for event in tokens] == [("llm", "Hel"), ("llm", "lo")]
@@ -57,11 +57,8 @@ function KnowledgeBaseNode({ id, data, selected }) {
             });
 
             toast.loading('Building embeddings...', { id: loadingToast });
-            await documentApi.buildEmbeddings({
-                workflow_id: workflowId,
-                embedding_provider: getEmbeddingProvider(embeddingModel),
-                embedding_model: embeddingModel,
-                api_key: apiKey
+            await documentApi.waitUntilReady(response.id, (status) => {
+                toast.loading(`Building embeddings (${status.status}, ${status.progress}%)...`, { id: loadingToast });
             });
 
             toast.success('File uploaded and embeddings created!', { id: loadingToast });
@@ -86,11 +83,8 @@ function KnowledgeBaseNode({ id, data, selected }) {
         const loadingToast = toast.loading('Building embeddings...');
 
         try {
-            await documentApi.buildEmbeddings({
-                workflow_id: workflowId,
-                embedding_provider: getEmbeddingProvider(embeddingModel),
-                embedding_model: embeddingModel,
-                api_key: apiKey
+            await documentApi.waitUntilReady(uploadedFile.id, (status) => {
+                toast.loading(`Building embeddings (${status.status}, ${status.progress}%)...`, { id: loadingToast });
             });
             toast.success('Embeddings built successfully!', { id: loadingToast });
         } catch (error) {
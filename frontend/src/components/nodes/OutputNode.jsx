@@ -1,10 +1,11 @@
 import { Handle, Position, useReactFlow } from '@xyflow/react';
-import { FileOutput, Settings } from 'lucide-react';
+import { FileOutput, Settings, ChevronDown } from 'lucide-react';
 import { useState, useEffect, useCallback } from 'react';
 
 function OutputNode({ id, data, selected }) {
     const { setNodes } = useReactFlow();
     const [formattingPrompt, setFormattingPrompt] = useState(data?.config?.formatting_prompt || '');
+    const [formatMode, setFormatMode] = useState(data?.config?.format_mode || 'llm');
 
     const updateNodeData = useCallback(() => {
         setNodes(nodes => nodes.map(node => {
@@ -15,19 +16,20 @@ function OutputNode({ id, data, selected }) {
                         ...node.data,
                         config: {
                             ...node.data.config,
-                            formatting_prompt: formattingPrompt
+                            formatting_prompt: formattingPrompt,
+                            format_mode: formatMode
                         }
                     }
                 };
             }
             return node;
         }));
-    }, [setNodes, id, formattingPrompt]);
+    }, [setNodes, id, formattingPrompt, formatMode]);
 
     useEffect(() => {
         const timer = setTimeout(updateNodeData, 500);
         return () => clearTimeout(timer);
-    }, [formattingPrompt, updateNodeData]);
+    }, [formattingPrompt, formatMode, updateNodeData]);
 
     return (
         <div className={`w-[280px] bg-white rounded-2xl border border-gray-200 shadow-lg overflow-visible relative ${selected ? 'border-gray-300 shadow-xl' : ''}`}>
@@ -41,6 +43,21 @@ function OutputNode({ id, data, selected }) {
                 <span className="text-xs text-black">Format the final response</span>
             </div>
             <div className="p-4 pb-6">
+                <div className="mb-3">
+                    <label className="block text-xs font-medium text-gray-700 mb-1.5">Formatting</label>
+                    <div className="relative">
+                        <select
+                            value={formatMode}
+                            onChange={(e) => setFormatMode(e.target.value)}
+                            className="w-full px-3 py-2.5 border border-gray-200 rounded-lg text-xs text-gray-700 bg-white appearance-none pr-8 focus:outline-none focus:border-gray-300 cursor-pointer"
+                        >
+                            <option value="llm">Refine with LLM</option>
+                            <option value="markdown">Markdown cleanup (no LLM call)</option>
+                            <option value="passthrough">None</option>
+                        </select>
+                        <ChevronDown size={14} className="absolute right-2.5 top-1/2 -translate-y-1/2 text-gray-400 pointer-events-none" />
+                    </div>
+                </div>
                 <div className="mb-1">
                     <label className="block text-xs font-medium text-gray-400 mb-1.5 uppercase">Final Result</label>
                     <div className="w-full px-3 py-2.5 border border-gray-100 rounded-lg text-xs text-gray-400 bg-gray-50 italic">
@@ -38,11 +38,24 @@ api.interceptors.response.use(
     }
 );
 
+// Listing endpoints return one page at a time; follow X-Next-Cursor to the end
+const getAllPages = async (url, params = {}) => {
+    const items = [];
+    let cursor = null;
+    do {
+        const response = await api.get(url, {
+            params: cursor ? { ...params, cursor } : params,
+        });
+        items.push(...response.data);
+        cursor = response.headers['x-next-cursor'];
+    } while (cursor);
+    return items;
+};
+
 // Workflow API
 export const workflowApi = {
     list: async () => {
-        const response = await api.get('/workflows/');
-        return response.data;
+        return getAllPages('/workflows/');
     },
 
     get: async (id) => {
@@ -84,14 +97,31 @@ export const documentApi = {
 
     list: async (workflowId = null) => {
         const params = workflowId ? { workflow_id: workflowId } : {};
-        const response = await api.get('/documents/', { params });
-        return response.data;
+        return getAllPages('/documents/', params);
     },
 
     delete: async (id) => {
         const response = await api.delete(`/documents/${id}`);
         return response.data;
     },
+
+    status: async (id) => {
+        const response = await api.get(`/documents/${id}/status`);
+        return response.data;
+    },
+
+    // Poll ingestion status until the document is ready or has failed
+    waitUntilReady: async (id, onProgress, intervalMs = 1500) => {
+        for (;;) {
+            const status = await documentApi.status(id);
+            if (status.status === 'ready') return status;
+            if (status.status === 'failed') {
+                throw new Error(status.error || 'Document ingestion failed');
+            }
+            if (onProgress) onProgress(status);
+            await new Promise((resolve) => setTimeout(resolve, intervalMs));
+        }
+    },
 };
 
 // Chat API
@@ -102,13 +132,11 @@ export const chatApi = {
     },
 
     getSessions: async (workflowId) => {
-        const response = await api.get(`/chat/sessions/${workflowId}`);
-        return response.data;
+        return getAllPages(`/chat/sessions/${workflowId}`);
     },
 
     getMessages: async (sessionId) => {
-        const response = await api.get(`/chat/messages/${sessionId}`);
-        return response.data;
+        return getAllPages(`/chat/messages/${sessionId}`);
     },
 };
 